@@ -0,0 +1,75 @@
+// assets/spacex_clientside.js
+// Callbacks de spacex_dash_app.py que se ejecutan en el navegador (modo clientside).
+// Los datos llegan una sola vez en el dcc.Store 'launch-data' (ver client_payload).
+
+(function () {
+    // Primera posición con values[i] >= x (o > x con strict)
+    function bound(values, x, strict) {
+        var lo = 0, hi = values.length;
+        while (lo < hi) {
+            var mid = (lo + hi) >> 1;
+            if (values[mid] < x || (strict && values[mid] === x)) { lo = mid + 1; } else { hi = mid; }
+        }
+        return lo;
+    }
+
+    function emptyScatter(store) {
+        return {data: [], layout: JSON.parse(JSON.stringify(store.scatter_layout))};
+    }
+
+    function pie(site, store) {
+        if (!store) { return window.dash_clientside.no_update; }
+        // null al vaciar el desplegable: tarta vacía, como en el servidor
+        if (!Object.prototype.hasOwnProperty.call(store.pies, site)) { return store.empty_pie; }
+        return store.pies[site];
+    }
+
+    function scatter(site, range, store) {
+        if (!store) { return window.dash_clientside.no_update; }
+        if (site !== store.all_sites && !Object.prototype.hasOwnProperty.call(store.partitions, site)) {
+            return emptyScatter(store);
+        }
+        var sites = site === store.all_sites ? store.sites : [site];
+        var traces = [], byBooster = {}, points = 0, maxSize = 0;
+
+        sites.forEach(function (name) {
+            var part = store.partitions[name];
+            if (!part) { return; }
+            // Particiones ordenadas por carga: el rango son dos búsquedas binarias
+            var lo = bound(part.payload, range[0], false);
+            var hi = bound(part.payload, range[1], true);
+            for (var i = lo; i < hi; i++) {
+                var code = part.booster[i];
+                var trace = byBooster[code];
+                if (!trace) {
+                    trace = byBooster[code] = {x: [], y: [], customdata: [], name: store.boosters[code]};
+                    traces.push(trace);
+                }
+                trace.x.push(part.payload[i]);
+                trace.y.push(part.cls[i]);
+                trace.customdata.push(name);
+                if (part.payload[i] > maxSize) { maxSize = part.payload[i]; }
+                points++;
+            }
+        });
+
+        // Mismo aspecto que px.scatter(color="BoosterVersion", size="PayloadMass")
+        var type = points > store.webgl_points ? "scattergl" : "scatter";
+        var sizeref = maxSize / (store.size_max * store.size_max);
+        var data = traces.map(function (t, k) {
+            var color = store.colorway[k % store.colorway.length];
+            return {
+                type: type, mode: "markers", name: t.name, legendgroup: t.name, showlegend: true,
+                x: t.x, y: t.y, customdata: t.customdata,
+                marker: {color: color, size: t.x, sizemode: "area", sizeref: sizeref, symbol: "circle"},
+                hovertemplate: "BoosterVersion=" + t.name + "<br>PayloadMass=%{x}<br>Class=%{y}"
+                    + "<br>LaunchSite=%{customdata}<extra></extra>"
+            };
+        });
+        return {data: data, layout: JSON.parse(JSON.stringify(store.scatter_layout))};
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        spacex: {pie: pie, scatter: scatter}
+    });
+})();
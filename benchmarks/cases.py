@@ -0,0 +1,223 @@
+# benchmarks/cases.py
+"""
+Rutas calientes medidas por el suite de benchmarks.
+
+Cada caso tiene un `setup(env)` (fuera de la medición) que devuelve el
+callable a medir. `env` es el diccionario de rutas de `datasets.build_scaled`
+más `workdir` (directorio temporal del caso).
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import shutil
+import sys
+from unittest import mock
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "spacex_project.settings")
+
+from scripts import datastore, preprocessing
+
+
+@contextlib.contextmanager
+def use_datasets(env):
+    """Apunta el datastore y las cachés en disco a los datasets escalados de `env`."""
+    saved_csv = {name: spec["csv"] for name, spec in datastore.DATASETS.items()}
+    saved_dirs = datastore.CACHE_DIR, datastore.SHARED_DIR, preprocessing.SPLIT_CACHE_DIR
+    for name in saved_csv:
+        datastore.DATASETS[name]["csv"] = env[name]
+    datastore.CACHE_DIR = os.path.join(env["workdir"], "columnar")
+    datastore.SHARED_DIR = os.path.join(env["workdir"], "shared")
+    preprocessing.SPLIT_CACHE_DIR = os.path.join(env["workdir"], "splits")
+    try:
+        yield
+    finally:
+        for name, csv in saved_csv.items():
+            datastore.DATASETS[name]["csv"] = csv
+        datastore.CACHE_DIR, datastore.SHARED_DIR, preprocessing.SPLIT_CACHE_DIR = saved_dirs
+
+
+def _quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _load_script(name, filename):
+    # Scripts cuyo nombre empieza por número (2_generate_dataset.py)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BASE_DIR, "scripts", filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# === 1. Dashboard Django ===
+def setup_load_metrics(env):
+    from spacexdash.cube import cube_cache
+    from spacexdash.metrics import load_metrics
+    datastore.materialize(env["launches"])      # la copia columnar ya existe en producción
+
+    def run():
+        # Incluye la construcción del cubo (una vez por versión del CSV)
+        cube_cache.clear()
+        return load_metrics(env["launches"])
+    return run
+
+
+def setup_cube_queries(env):
+    from spacexdash.cube import get_cube
+    cube = get_cube(env["launches"])            # cubo ya construido: solo consultas
+    sites, years = cube.values("LaunchSite"), cube.values("year")
+
+    def run():
+        for site in sites:
+            cube.query(["year"], {"LaunchSite": site})
+            cube.query(["Orbit", "Outcome"], {"LaunchSite": site, "year": years[-5:]})
+        cube.query(["payload_bucket"])
+    return run
+
+
+def setup_launch_sites_map(env):
+    import django
+    django.setup()
+    from asgiref.sync import async_to_sync
+    from django.test import RequestFactory
+    from spacexdash import views
+    from spacexdash.http_cache import page_cache
+
+    request = RequestFactory().get("/map/")
+    datastore.materialize(env["launch_geo"])
+
+    def run():
+        # Construcción en frío: la caché por versión se vacía en cada repetición
+        views.map_cache.clear()
+        page_cache.clear()
+        with mock.patch.object(views, "CSV_MAP", env["launch_geo"]):
+            return async_to_sync(views.launch_sites_map)(request)
+    return run
+
+
+def setup_launches_api(env):
+    import django
+    django.setup()
+    from django.test import RequestFactory
+    from spacexdash import views
+
+    # Vista inicial, zoom sobre Florida y vuelta al mundo entero
+    factory = RequestFactory()
+    requests = [factory.get("/api/launches/", {"bbox": bbox, "zoom": zoom}) for bbox, zoom in [
+        ("-180,-60,180,75", 3), ("-84,26,-78,31", 7), ("-80.7,28.4,-80.5,28.7", 12), ("-540,-85,540,85", 0),
+    ]]
+    datastore.materialize(env["launch_geo"])
+
+    def run():
+        # Incluye la construcción de la rejilla (una vez por versión del CSV)
+        views.grid_cache.clear()
+        with mock.patch.object(views, "CSV_MAP", env["launch_geo"]):
+            return [views.launches_api(request) for request in requests]
+    return run
+
+
+# === 2. Dash ===
+def setup_dash_callbacks(env):
+    import spacex_dash_app as dash_app
+    from spacexdash.launch_index import ALL_SITES
+
+    _, index, _ = dash_app.current_data()       # segmento compartido ya publicado
+
+    def run():
+        # Incluye la construcción del índice y las figuras (una vez por versión del CSV)
+        dash_app.index_cache.clear()
+        dash_app.pie_figure.cache_clear()
+        dash_app.scatter_figure.cache_clear()
+        lo, hi = float(index.payload_min), float(index.payload_max)
+        for site in [ALL_SITES] + list(index.sites):
+            dash_app.update_pie_chart(site)
+            dash_app.update_scatter(site, [lo, hi])
+            dash_app.update_scatter(site, [lo, (lo + hi) / 2])
+    return run
+
+
+def setup_dash_client_payload(env):
+    import spacex_dash_app as dash_app
+    from plotly.io.json import to_json_plotly
+    from spacexdash.launch_index import LaunchIndex
+
+    df = datastore.load_dataset("launches", columns=dash_app.INDEX_COLUMNS)
+    _, _, cube = dash_app.current_data()
+
+    def run():
+        # Lo que el modo clientside envía con cada versión del CSV
+        index = LaunchIndex(df)
+        dash_app.pie_figure.cache_clear()
+        return len(to_json_plotly(dash_app.client_payload(index, cube)))
+    return run
+
+
+# === 3. Datos y pipeline ===
+def setup_generate_dataset(env):
+    generate = _load_script("generate_dataset", "2_generate_dataset.py")
+    return lambda: generate.build_dataset(*generate.load_raw(env["raw_dir"]))
+
+
+def setup_preprocess_cold(env):
+    def run():
+        shutil.rmtree(preprocessing.SPLIT_CACHE_DIR, ignore_errors=True)
+        return preprocessing.load_and_preprocess()
+    return run
+
+
+def setup_preprocess_warm(env):
+    preprocessing.load_and_preprocess()
+    return preprocessing.load_and_preprocess
+
+
+def _trained_model(env):
+    from pipeline import train_model
+    X_train, _, y_train, _, preprocessor = preprocessing.load_and_preprocess()
+    return train_model.build_pipeline(preprocessor, train_model.BEST_PARAMS).fit(X_train, y_train)
+
+
+def setup_train(env):
+    from pipeline import train_model
+    X_train, _, y_train, _, preprocessor = preprocessing.load_and_preprocess()
+    return lambda: train_model.build_pipeline(preprocessor, train_model.BEST_PARAMS).fit(X_train, y_train)
+
+
+def setup_predict_single(env):
+    model = _trained_model(env)
+    _, X_test, _, _, _ = preprocessing.load_and_preprocess()
+    rows = [X_test.iloc[[i % len(X_test)]] for i in range(100)]
+
+    def run():
+        for row in rows:                        # 100 peticiones de una fila
+            model.predict(row)
+    return run
+
+
+def setup_predict_batch(env):
+    import joblib
+    from pipeline import predict
+
+    model_path = os.path.join(env["workdir"], "model.joblib")
+    joblib.dump(_trained_model(env), model_path)
+    output = os.path.join(env["workdir"], "predictions.csv")
+    return lambda: _quiet(predict.predict_batch, env["clean"], output, model_path,
+                          chunksize=50_000, workers=2)
+
+
+CASES = {
+    "metrics.load_metrics": setup_load_metrics,
+    "cube.queries": setup_cube_queries,
+    "views.launch_sites_map": setup_launch_sites_map,
+    "views.launches_api": setup_launches_api,
+    "dash.callbacks": setup_dash_callbacks,
+    "dash.client_payload": setup_dash_client_payload,
+    "generate_dataset.build": setup_generate_dataset,
+    "preprocessing.load_and_preprocess.cold": setup_preprocess_cold,
+    "preprocessing.load_and_preprocess.warm": setup_preprocess_warm,
+    "train_model.fit": setup_train,
+    "predict.single": setup_predict_single,
+    "predict.batch": setup_predict_batch,
+}
@@ -0,0 +1,41 @@
+# benchmarks/datasets.py
+"""
+Datasets escalados para los benchmarks: N veces el histórico real.
+
+Se generan con scripts/synthetic_data.py (perfil ajustado a data/processed/,
+semilla fija), así que dos ejecuciones con la misma escala miden exactamente
+los mismos datos. Cada escala se genera una sola vez en el directorio de trabajo.
+"""
+import json
+import os
+
+from scripts import synthetic_data
+
+SEED = synthetic_data.SEED
+
+_profile = None
+
+
+def profile():
+    global _profile
+    if _profile is None:
+        _profile = synthetic_data.fit_profile()
+    return _profile
+
+
+def real_launch_count():
+    return profile()["launches"]["rows"]
+
+
+def build_scaled(scale, workdir, seed=SEED):
+    """Rutas de los datasets a `scale`× en `workdir/x<scale>/` (se generan si no existen)."""
+    root = os.path.join(workdir, f"x{scale}")
+    manifest_path = os.path.join(root, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    paths = {"root": root, **synthetic_data.generate(root, scale, seed, profile=profile())}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(paths, f, indent=2)
+    return paths
@@ -0,0 +1,144 @@
+# benchmarks/run.py
+"""
+Suite de benchmarks de las rutas calientes del proyecto.
+
+    python benchmarks/run.py                       # 1x 10x 100x 1000x, compara con la línea base
+    python benchmarks/run.py --scales 1 10 --cases predict
+    python benchmarks/run.py --update-baseline     # fija la línea base actual
+
+Mide tiempo (mejor de N repeticiones) y pico de memoria (tracemalloc, solo
+el proceso principal) por caso y escala. Sale con código 1 si algún caso
+empeora más allá del umbral respecto a benchmarks/baselines.json, o si no
+hay línea base para comparar (salvo con --update-baseline).
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.cases import CASES, use_datasets
+from benchmarks.datasets import build_scaled, real_launch_count
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINES_PATH = os.path.join(BENCH_DIR, "baselines.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.json")
+
+DEFAULT_SCALES = [1, 10, 100, 1000]
+# Por debajo de este tiempo las diferencias son ruido del sistema
+MIN_TIME_S = 0.005
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    # Ejecución aparte para la memoria: tracemalloc ralentiza la medición de tiempo
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"time_s": round(min(times), 6), "peak_mb": round(peak / 2**20, 3)}
+
+
+def run_suite(scales, case_names, repeat, workdir):
+    results = {}
+    for scale in scales:
+        env = dict(build_scaled(scale, os.path.join(workdir, "data")))
+        for name in case_names:
+            env["workdir"] = os.path.join(workdir, "cases", f"x{scale}", name)
+            os.makedirs(env["workdir"], exist_ok=True)
+            with use_datasets(env):
+                fn = CASES[name](env)
+                # Escalas grandes: menos repeticiones
+                result = measure(fn, repeat if scale < 100 else 1)
+            results.setdefault(name, {})[str(scale)] = result
+            print(f"   {name:<42} {scale:>5}x  {result['time_s']:>10.4f}s  {result['peak_mb']:>10.2f} MB",
+                  flush=True)
+    return results
+
+
+def compare(results, baselines, threshold, mem_threshold):
+    """Regresiones (caso, escala, métrica, base, actual) y (caso, escala) sin línea base."""
+    regressions, missing = [], []
+    for name, by_scale in results.items():
+        for scale, current in by_scale.items():
+            base = baselines.get(name, {}).get(scale)
+            if base is None:
+                missing.append((name, scale))
+                continue
+            if current["time_s"] > max(base["time_s"] * (1 + threshold), base["time_s"] + MIN_TIME_S):
+                regressions.append((name, scale, "time_s", base["time_s"], current["time_s"]))
+            if current["peak_mb"] > base["peak_mb"] * (1 + mem_threshold) + 0.5:
+                regressions.append((name, scale, "peak_mb", base["peak_mb"], current["peak_mb"]))
+    return regressions, missing
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas calientes a varias escalas.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--cases", nargs="+", default=None,
+                        help="Filtra casos por subcadena (p. ej. predict dash)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Regresión de tiempo tolerada (0.25 = +25%%)")
+    parser.add_argument("--mem-threshold", type=float, default=0.25)
+    parser.add_argument("--baseline", default=BASELINES_PATH)
+    parser.add_argument("--update-baseline", "--save-baseline", dest="update_baseline", action="store_true",
+                        help="Guarda los resultados como línea base en lugar de compararlos")
+    parser.add_argument("--workdir", default=None, help="Directorio para los datasets escalados (reutilizable)")
+    args = parser.parse_args()
+
+    case_names = [n for n in CASES if not args.cases or any(c in n for c in args.cases)]
+    print(f"📏 Escala 1x = {real_launch_count()} lanzamientos · {len(case_names)} casos · escalas {args.scales}")
+
+    with tempfile.TemporaryDirectory(prefix="spacex-bench-") as tmp:
+        results = run_suite(args.scales, case_names, args.repeat, args.workdir or tmp)
+    write_json(RESULTS_PATH, results)
+
+    if args.update_baseline:
+        baselines = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baselines = json.load(f)
+        for name, by_scale in results.items():
+            baselines.setdefault(name, {}).update(by_scale)
+        write_json(args.baseline, baselines)
+        print(f"✅ Línea base guardada en {args.baseline}")
+        return
+
+    # Sin línea base no hay puerta: falla en lugar de pasar en silencio
+    if not os.path.exists(args.baseline):
+        print(f"\n❌ Sin línea base ({args.baseline}): genérala en esta máquina con --update-baseline")
+        sys.exit(1)
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions, missing = compare(results, json.load(f), args.threshold, args.mem_threshold)
+    if missing:
+        print("\n❌ Sin línea base (ejecuta con --update-baseline):")
+        for name, scale in missing:
+            print(f"   {name} @ {scale}x")
+    if regressions:
+        print("\n❌ Regresiones:")
+        for name, scale, metric, base, current in regressions:
+            print(f"   {name} @ {scale}x · {metric}: {base} → {current}")
+    if missing or regressions:
+        sys.exit(1)
+    print("\n✅ Sin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
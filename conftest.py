@@ -0,0 +1,10 @@
+# Configuración de Django para ejecutar los tests de las apps con pytest
+# (con `python manage.py test` no hace falta)
+import os
+
+import django
+from django.test.utils import setup_test_environment
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "spacex_project.settings")
+django.setup()
+setup_test_environment()
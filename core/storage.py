@@ -0,0 +1,16 @@
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class ManifestFallbackStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage que no rompe las páginas sin collectstatic.
+
+    Con el manifiesto de staticfiles/ las URL llevan el hash del contenido.
+    Sin él (collectstatic sin ejecutar), {% static %} devuelve el nombre sin
+    hash en lugar de lanzar ValueError. collectstatic sigue generando el
+    manifiesto: no pasa por `stored_name`.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
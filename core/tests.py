@@ -1,3 +1,58 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
 
-# Create your tests here.
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.http import Http404
+
+from core import views
+from core.storage import ManifestFallbackStorage
+
+
+class StaticAssetTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        os.makedirs(os.path.join(self.root, "images"))
+        for name in ("images/logo.png", "images/logo.0123456789ab.png"):
+            with open(os.path.join(self.root, name), "wb") as f:
+                f.write(b"png")
+        with open(os.path.join(self.root, "staticfiles.json"), "w", encoding="utf-8") as f:
+            json.dump({"paths": {"images/logo.png": "images/logo.0123456789ab.png"}, "version": "1.1"}, f)
+        views.static_manifest_cache.clear()
+        self.addCleanup(views.static_manifest_cache.clear)
+        settings = override_settings(STATIC_ROOT=self.root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get(self, path):
+        return views.static_asset(RequestFactory().get(f"/static/{path}"), path)
+
+    def test_serves_hashed_files_from_the_manifest(self):
+        response = self.get("images/logo.0123456789ab.png")
+        self.assertEqual(b"".join(response.streaming_content), b"png")
+        self.assertEqual(response["Cache-Control"], views.IMMUTABLE_CACHE_CONTROL)
+
+    def test_anything_else_is_404(self):
+        for path in ["images/logo.png", "staticfiles.json", "../settings.py", "images/"]:
+            with self.assertRaises(Http404, msg=path):
+                self.get(path)
+
+    def test_without_collectstatic_nothing_is_served(self):
+        os.remove(os.path.join(self.root, "staticfiles.json"))
+        with self.assertRaises(Http404):
+            self.get("images/logo.0123456789ab.png")
+
+
+@override_settings(DEBUG=False)
+class ManifestFallbackStorageTests(SimpleTestCase):
+    def test_urls_are_hashed_only_with_a_manifest(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = ManifestFallbackStorage(location=root, base_url="/static/")
+            self.assertEqual(storage.url("images/logo.png"), "/static/images/logo.png")
+
+            with open(os.path.join(root, "staticfiles.json"), "w", encoding="utf-8") as f:
+                json.dump({"paths": {"images/logo.png": "images/logo.0123456789ab.png"}, "version": "1.1"}, f)
+            storage = ManifestFallbackStorage(location=root, base_url="/static/")
+            self.assertEqual(storage.url("images/logo.png"), "/static/images/logo.0123456789ab.png")
@@ -1,28 +1,93 @@
+import json
+import os
+from django.conf import settings
+from django.http import FileResponse, Http404
 from django.shortcuts import render
+from spacexdash.cache import VersionedCache, dataset_version
+from spacexdash.http_cache import template_files, versioned_page
 
+# Ranking generado por pipeline/compare_models.py
+LEADERBOARD_PATH = os.path.join(settings.BASE_DIR, "reports", "model_comparison.json")
+leaderboard_cache = VersionedCache("model_leaderboard")
+static_manifest_cache = VersionedCache("static_manifest")
+
+# Páginas estáticas: una hora en el navegador y después revalidación por ETag
+PAGE_CACHE_CONTROL = "public, max-age=3600"
+# Estáticos con hash en el nombre: cualquier cambio cambia la URL
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def template_version(template):
+    return lambda: dataset_version(*template_files(template))
+
+@versioned_page(template_version('core/home.html'), PAGE_CACHE_CONTROL)
 def home(request):
     return render(request, 'core/home.html')
 
+@versioned_page(template_version('core/resumen.html'), PAGE_CACHE_CONTROL)
 def resumen(request):
     return render(request, 'core/resumen.html')
 
+@versioned_page(template_version('core/data_collection.html'), PAGE_CACHE_CONTROL)
 def data_collection(request):
     return render(request, 'core/data_collection.html')
 
+@versioned_page(template_version('core/eda.html'), PAGE_CACHE_CONTROL)
 def eda(request):
     return render(request, 'core/eda.html')
 
+@versioned_page(template_version('core/data_wrangling.html'), PAGE_CACHE_CONTROL)
 def data_wrangling(request):
     return render(request, 'core/data_wrangling.html')
 
+@versioned_page(template_version('core/modeling.html'), PAGE_CACHE_CONTROL)
 def modeling(request):
     return render(request, 'core/modeling.html')
 
-def model_comparison(request):
-    return render(request, 'core/model_comparison.html')
+def load_leaderboard():
+    try:
+        with open(LEADERBOARD_PATH, encoding="utf-8") as f:
+            return json.load(f).get("models") or None
+    except (FileNotFoundError, ValueError):
+        return None
+
+def model_comparison_version():
+    return dataset_version(LEADERBOARD_PATH, *template_files('core/model_comparison.html'))
 
+@versioned_page(model_comparison_version)
+def model_comparison(request):
+    # Sin leaderboard (pipeline sin ejecutar) la plantilla muestra la tabla estática
+    leaderboard = leaderboard_cache.get_or_build(
+        "models", dataset_version(LEADERBOARD_PATH), load_leaderboard
+    )
+    return render(request, 'core/model_comparison.html', {"leaderboard": leaderboard})
 
+def static_manifest_path():
+    return os.path.join(settings.STATIC_ROOT, "staticfiles.json")
 
 
+def load_static_manifest():
+    """Ficheros con hash publicados por collectstatic: {nombre con hash: ruta absoluta}."""
+    try:
+        with open(static_manifest_path(), encoding="utf-8") as f:
+            paths = json.load(f)["paths"]
+    except FileNotFoundError:
+        return {}
+    return {hashed: os.path.join(settings.STATIC_ROOT, hashed) for hashed in paths.values()}
 
 
+def static_asset(request, path):
+    # Respaldo sin DEBUG cuando ni whitenoise ni el servidor web sirven /static/.
+    # Solo responde a los nombres con hash del manifiesto (una búsqueda en un
+    # dict, nunca una ruta arbitraria de STATIC_ROOT); el resto es 404
+    files = static_manifest_cache.get_or_build(
+        "manifest", dataset_version(static_manifest_path()), load_static_manifest
+    )
+    full_path = files.get(path)
+    if full_path is None:
+        raise Http404(path)
+    try:
+        response = FileResponse(open(full_path, "rb"))
+    except FileNotFoundError:
+        raise Http404(path)
+    response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
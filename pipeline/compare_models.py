@@ -0,0 +1,134 @@
+import sys, os
+import argparse
+import importlib
+import json
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score, recall_score
+
+# ✅ Ensure Python can find scripts/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.preprocessing import build_preprocessor, materialize_split, open_split, split_frame
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models.json")
+LEADERBOARD_PATH = os.path.join(BASE_DIR, "reports", "model_comparison.json")
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["models"]
+
+
+def make_estimator(spec):
+    """Estimator from its dotted path (e.g. "sklearn.svm.SVC") and params."""
+    module_name, class_name = spec["estimator"].rsplit(".", 1)
+    cls = getattr(importlib.import_module(module_name), class_name)
+    return cls(**spec.get("params", {}))
+
+
+# --- Step 1: One preprocessed matrix, shared by every worker ---
+def materialize_matrix(test_size=0.2, random_state=42):
+    """Fit the preprocessor once and save the transformed train/test matrices next to the split."""
+    path = materialize_split(test_size, random_state)
+    files = {name: os.path.join(path, f"matrix_{name}.npy") for name in ("train", "test")}
+    if all(os.path.exists(p) for p in files.values()):
+        return files
+
+    split = open_split(test_size, random_state)
+    X, _ = split_frame(split)
+    preprocessor = build_preprocessor().fit(X.iloc[split["train_idx"]])
+    for name, idx in (("train", split["train_idx"]), ("test", split["test_idx"])):
+        matrix = np.ascontiguousarray(preprocessor.transform(X.iloc[idx]), dtype=np.float64)
+        tmp = f"{files[name]}.{uuid.uuid4().hex}.tmp.npy"
+        np.save(tmp, matrix)
+        os.replace(tmp, files[name])
+    return files
+
+
+# --- Step 2: Fit + score one model (runs in a worker process) ---
+def evaluate_model(spec, files, test_size=0.2, random_state=42):
+    split = open_split(test_size, random_state)
+    X_train = np.load(files["train"], mmap_mode="r")
+    X_test = np.load(files["test"], mmap_mode="r")
+    y = np.asarray(split["y"])
+    y_train, y_test = y[split["train_idx"]], y[split["test_idx"]]
+
+    model = make_estimator(spec)
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    recall_fail, recall_success = recall_score(y_test, y_pred, labels=[0, 1], average=None,
+                                               zero_division=0)
+    return {
+        "name": spec["name"],
+        "estimator": spec["estimator"],
+        "params": spec.get("params", {}),
+        "accuracy": round(float(accuracy_score(y_test, y_pred)), 4),
+        "f1": round(float(f1_score(y_test, y_pred, zero_division=0)), 4),
+        "recall_fail": round(float(recall_fail), 4),
+        "recall_success": round(float(recall_success), 4),
+        "fit_time_ms": round(fit_time * 1000, 2),
+        "predict_time_ms": round(predict_time * 1000, 2),
+        "peak_memory_mb": round(peak / 2**20, 3),
+    }
+
+
+def compare(specs, workers=None, test_size=0.2, random_state=42):
+    files = materialize_matrix(test_size, random_state)
+    with ProcessPoolExecutor(max_workers=workers or min(len(specs), os.cpu_count() or 1)) as pool:
+        futures = [pool.submit(evaluate_model, spec, files, test_size, random_state) for spec in specs]
+        results = [f.result() for f in futures]
+
+    # --- Step 3: Rank (accuracy, then F1, then fit time) ---
+    results.sort(key=lambda r: (-r["accuracy"], -r["f1"], r["fit_time_ms"]))
+    for rank, row in enumerate(results, start=1):
+        row["rank"] = rank
+    return results
+
+
+def write_leaderboard(results, path=LEADERBOARD_PATH, test_size=0.2, random_state=42):
+    leaderboard = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "split": {"test_size": test_size, "random_state": random_state},
+        "models": results,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(leaderboard, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and score every configured model in parallel.")
+    parser.add_argument("--config", default=CONFIG_PATH)
+    parser.add_argument("--output", default=LEADERBOARD_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    specs = load_config(args.config)
+    start = time.perf_counter()
+    results = compare(specs, workers=args.workers)
+    write_leaderboard(results, args.output)
+
+    print(f"🏁 {len(results)} models compared in {time.perf_counter() - start:.1f}s")
+    print(pd.DataFrame(results)[["rank", "name", "accuracy", "f1", "fit_time_ms",
+                                 "predict_time_ms", "peak_memory_mb"]].to_string(index=False))
+    print(f"✅ Leaderboard saved at {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Compile the fitted preprocessing + RandomForest pipeline into flat NumPy arrays.
+
+    python pipeline/compiled_forest.py export   # models/random_forest_compiled.npz
+    python pipeline/compiled_forest.py bench    # latency vs. model.predict
+
+The compiled predictor reproduces the ColumnTransformer (StandardScaler +
+OneHotEncoder + passthrough) and walks all trees at once with vectorized
+gathers, so a single-row prediction costs a handful of NumPy calls instead
+of sklearn's per-call validation and per-tree dispatch.
+
+That only pays off for small requests: the rows x trees gathers lose to
+sklearn's per-tree traversal beyond a few hundred rows (~15x slower at 100k
+rows). `GatedForest` serves up to COMPILED_MAX_ROWS rows compiled and hands
+larger batches to the sklearn pipeline.
+"""
+import sys, os
+import argparse
+import json
+import time
+import joblib
+import numpy as np
+import pandas as pd
+
+# ✅ Ensure Python can find scripts/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "random_forest_model.joblib")
+COMPILED_PATH = os.path.join(BASE_DIR, "models", "random_forest_compiled.npz")
+
+# Largest request served by the compiled forest (bench: 1 row 0.7 ms vs 18 ms,
+# 128 rows 5 ms vs 23 ms, 1,024 rows 59 ms vs 34 ms)
+COMPILED_MAX_ROWS = 128
+
+
+def compile_pipeline(pipeline):
+    """Return a dict of flat arrays (+ JSON metadata) describing `pipeline`."""
+    preprocessor = pipeline.named_steps["preprocessor"]
+    forest = pipeline.named_steps["classifier"]
+
+    # --- Step 1: Preprocessing constants ---
+    numeric, numeric_out, mean, scale = [], [], [], []
+    categorical = {}            # column -> {category: output column}
+    passthrough = []            # (column, output column)
+    col = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if isinstance(transformer, str) and transformer == "drop":
+            continue
+        columns = list(columns)
+        kind = type(transformer).__name__ if not isinstance(transformer, str) else transformer
+        # Fitted ColumnTransformers store "passthrough" as an identity FunctionTransformer
+        if kind == "FunctionTransformer" and transformer.func is None:
+            kind = "passthrough"
+        if kind == "StandardScaler":
+            numeric += columns
+            numeric_out += list(range(col, col + len(columns)))
+            mean += list(transformer.mean_ if transformer.mean_ is not None else np.zeros(len(columns)))
+            scale += list(transformer.scale_ if transformer.scale_ is not None else np.ones(len(columns)))
+            col += len(columns)
+        elif kind == "OneHotEncoder":
+            if transformer.drop_idx_ is not None:
+                raise ValueError("OneHotEncoder(drop=...) is not supported")
+            for column, cats in zip(columns, transformer.categories_):
+                categorical[column] = {str(c): col + i for i, c in enumerate(cats)}
+                col += len(cats)
+        elif kind == "passthrough":
+            passthrough += [(c, col + i) for i, c in enumerate(columns)]
+            col += len(columns)
+        else:
+            raise ValueError(f"Unsupported transformer in '{name}': {kind}")
+
+    # --- Step 2: Pack every tree into one set of node arrays ---
+    trees = [est.tree_ for est in forest.estimators_]
+    sizes = np.array([t.node_count for t in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    left, right, feature, threshold, missing_left, value = [], [], [], [], [], []
+    for tree, root in zip(trees, roots):
+        idx = np.arange(tree.node_count) + root
+        is_leaf = tree.children_left == -1
+        # Leaves point to themselves so every row can take max_depth steps
+        left.append(np.where(is_leaf, idx, tree.children_left + root))
+        right.append(np.where(is_leaf, idx, tree.children_right + root))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        # NaN follows the branch learned by sklearn (or its larger child if
+        # no missing values were seen in training)
+        missing_left.append(np.where(is_leaf, 0, tree.missing_go_to_left).astype(bool))
+        v = tree.value[:, 0, :]
+        total = v.sum(axis=1, keepdims=True)
+        total[total == 0] = 1
+        value.append(v / total)
+
+    meta = {
+        "n_features": col,
+        "numeric": numeric,
+        "numeric_out": numeric_out,
+        "categorical": categorical,
+        "passthrough": passthrough,
+        "classes": [c.item() if hasattr(c, "item") else c for c in forest.classes_],
+        "max_depth": int(max(t.max_depth for t in trees)),
+    }
+    return {
+        "meta": np.array(json.dumps(meta)),
+        "mean": np.asarray(mean, dtype=np.float64),
+        "scale": np.asarray(scale, dtype=np.float64),
+        "roots": roots.astype(np.int64),
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "missing_left": np.concatenate(missing_left),
+        "value": np.concatenate(value).astype(np.float64),
+    }
+
+
+class CompiledForest:
+    """Vectorized predictor over the arrays produced by `compile_pipeline`."""
+
+    def __init__(self, arrays):
+        meta = json.loads(str(arrays["meta"]))
+        self.n_features = meta["n_features"]
+        self.numeric = meta["numeric"]
+        self.numeric_out = meta["numeric_out"]
+        self.categorical = meta["categorical"]
+        self.passthrough = meta["passthrough"]
+        self.classes_ = np.asarray(meta["classes"])
+        self.max_depth = meta["max_depth"]
+        self.mean = arrays["mean"]
+        self.scale = arrays["scale"]
+        self.roots = arrays["roots"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.missing_left = arrays["missing_left"]
+        self.value = arrays["value"]
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        return cls(compile_pipeline(pipeline))
+
+    @classmethod
+    def load(cls, path=COMPILED_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({k: data[k] for k in data.files})
+
+    def save(self, path=COMPILED_PATH):
+        meta = {
+            "n_features": self.n_features,
+            "numeric": self.numeric,
+            "numeric_out": self.numeric_out,
+            "categorical": self.categorical,
+            "passthrough": self.passthrough,
+            "classes": self.classes_.tolist(),
+            "max_depth": self.max_depth,
+        }
+        np.savez(path, meta=np.array(json.dumps(meta)), mean=self.mean, scale=self.scale,
+                 roots=self.roots, left=self.left, right=self.right, feature=self.feature,
+                 threshold=self.threshold, missing_left=self.missing_left, value=self.value)
+
+    def transform(self, data):
+        """DataFrame, dict of columns or list of row dicts -> model matrix."""
+        if isinstance(data, list):
+            data = {k: [row[k] for row in data] for k in data[0]} if data else {}
+        n = len(data[self.numeric[0]]) if self.numeric else len(next(iter(data.values())))
+        X = np.zeros((n, self.n_features), dtype=np.float64)
+
+        if self.numeric:
+            num = np.column_stack([np.asarray(data[c], dtype=np.float64) for c in self.numeric])
+            X[:, self.numeric_out] = (num - self.mean) / self.scale
+        rows = np.arange(n)
+        for column, lookup in self.categorical.items():
+            # Unknown categories get code -1 and stay all-zero (handle_unknown="ignore")
+            values = np.asarray(data[column]).astype(str)
+            codes = pd.Categorical(values, categories=list(lookup)).codes
+            known = codes >= 0
+            X[rows[known], min(lookup.values()) + codes[known]] = 1.0
+        for column, out in self.passthrough:
+            X[:, out] = np.asarray(data[column], dtype=np.float64)
+        return X
+
+    def predict_proba(self, data, block_size=8192):
+        # sklearn trees compare float32 features against float64 thresholds
+        X = self.transform(data).astype(np.float32)
+        out = np.empty((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        # Rows x trees node matrix, processed in blocks to bound memory
+        for start in range(0, X.shape[0], block_size):
+            Xb = X[start:start + block_size]
+            node = np.broadcast_to(self.roots, (Xb.shape[0], len(self.roots))).copy()
+            rows = np.arange(Xb.shape[0])[:, None]
+            for _ in range(self.max_depth):
+                x = Xb[rows, self.feature[node]]
+                go_left = (x <= self.threshold[node]) | (np.isnan(x) & self.missing_left[node])
+                node = np.where(go_left, self.left[node], self.right[node])
+            out[start:start + block_size] = self.value[node].mean(axis=1)
+        return out
+
+    def predict(self, data):
+        return self.classes_[self.predict_proba(data).argmax(axis=1)]
+
+
+class GatedForest:
+    """sklearn pipeline that answers small requests with its compiled forest."""
+
+    def __init__(self, pipeline, max_rows=COMPILED_MAX_ROWS):
+        self.pipeline = pipeline
+        self.compiled = CompiledForest.from_pipeline(pipeline)
+        self.max_rows = max_rows
+        self.classes_ = pipeline.classes_
+
+    def _model(self, X):
+        return self.compiled if len(X) <= self.max_rows else self.pipeline
+
+    def predict_proba(self, X):
+        return self._model(X).predict_proba(X)
+
+    def predict(self, X):
+        return self._model(X).predict(X)
+
+
+def export(model_path=MODEL_PATH, output_path=COMPILED_PATH):
+    pipeline = joblib.load(model_path)
+    compiled = CompiledForest.from_pipeline(pipeline)
+    compiled.save(output_path)
+    print(f"✅ Compiled {len(compiled.roots)} trees ({len(compiled.left):,} nodes) -> {output_path}")
+    return compiled
+
+
+def _time_per_call(fn, args_list, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for args in args_list:
+            fn(args)
+        best = min(best, (time.perf_counter() - start) / len(args_list))
+    return best
+
+
+def bench(model_path=MODEL_PATH, n_single=200, repeats=3):
+    from scripts.preprocessing import load_and_preprocess
+
+    pipeline = joblib.load(model_path)
+    compiled = CompiledForest.from_pipeline(pipeline)
+    X_train, X_test, _, _, _ = load_and_preprocess()
+    X = pd.concat([X_train, X_test], ignore_index=True)
+
+    # --- Step 1: Equivalence ---
+    same_pred = np.array_equal(pipeline.predict(X), compiled.predict(X))
+    max_diff = np.abs(pipeline.predict_proba(X) - compiled.predict_proba(X)).max()
+    print(f"🔎 Same predictions: {same_pred} · max |Δproba|: {max_diff:.2e}")
+
+    # --- Step 2: Single-row latency ---
+    frames = [X.iloc[[i % len(X)]] for i in range(n_single)]
+    records = [X.iloc[[i % len(X)]].to_dict("records") for i in range(n_single)]
+    t_sk = _time_per_call(pipeline.predict, frames, repeats)
+    t_df = _time_per_call(compiled.predict, frames, repeats)
+    t_rec = _time_per_call(compiled.predict, records, repeats)
+
+    # --- Step 3: Batch latency ---
+    big = pd.concat([X] * max(1, 100_000 // len(X)), ignore_index=True)
+    t_sk_batch = _time_per_call(pipeline.predict, [big], repeats)
+    t_cf_batch = _time_per_call(compiled.predict, [big], repeats)
+
+    print("\n📊 Latency")
+    print(f"single row · sklearn pipeline      : {t_sk * 1e3:8.3f} ms")
+    print(f"single row · compiled (DataFrame)  : {t_df * 1e3:8.3f} ms  ({t_sk / t_df:.1f}x)")
+    print(f"single row · compiled (dict)       : {t_rec * 1e3:8.3f} ms  ({t_sk / t_rec:.1f}x)")
+    print(f"batch {len(big):,} rows · sklearn     : {t_sk_batch:8.3f} s")
+    print(f"batch {len(big):,} rows · compiled    : {t_cf_batch:8.3f} s  ({t_sk_batch / t_cf_batch:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the RF pipeline to NumPy arrays.")
+    parser.add_argument("command", choices=["export", "bench"])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--output", default=COMPILED_PATH)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export(args.model, args.output)
+    else:
+        bench(args.model)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import sys, os
 import joblib
-import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.figure import Figure
 from sklearn.metrics import classification_report, confusion_matrix
 from datetime import datetime
 
@@ -10,42 +10,57 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from scripts.preprocessing import load_and_preprocess
 
-# --- Step 1: Load test data ---
-X_train, X_test, y_train, y_test, preprocessor = load_and_preprocess()
-
-# --- Step 2: Load the saved model ---
-model_path = os.path.join("models", "random_forest_model.joblib")
-model = joblib.load(model_path)
-print(f"✅ Loaded model from {model_path}")
-
-# --- Step 3: Evaluate on test set ---
-y_pred = model.predict(X_test)
-report = classification_report(y_test, y_pred)
-
-# --- Step 4: Save classification report ---
-os.makedirs("reports", exist_ok=True)
-report_path = os.path.join("reports", "evaluation.txt")
-with open(report_path, "w") as f:
-    f.write(f"Evaluation Report - {datetime.now()}\n\n")
-    f.write(report)
-
-print(f"📄 Evaluation report saved at {report_path}")
-
-# --- Step 5: Confusion Matrix ---
-cm = confusion_matrix(y_test, y_pred)
-
-plt.figure(figsize=(6,5))
-sns.heatmap(cm, annot=True, fmt="d", cmap="Blues",
-            xticklabels=["Fail", "Success"],
-            yticklabels=["Fail", "Success"])
-plt.xlabel("Predicted")
-plt.ylabel("Actual")
-plt.title("Confusion Matrix - Random Forest (Loaded Model)")
-plt.tight_layout()
-
-# Save confusion matrix as image
-cm_path = os.path.join("reports", "evaluation_confusion_matrix.png")
-plt.savefig(cm_path)
-plt.close()
-
-print(f"📊 Confusion matrix saved at {cm_path}")
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "random_forest_model.joblib")
+REPORT_PATH = os.path.join(BASE_DIR, "reports", "evaluation.txt")
+CM_PATH = os.path.join(BASE_DIR, "reports", "evaluation_confusion_matrix.png")
+
+
+def save_confusion_matrix(cm, path, cmap, title):
+    # Figure API (no pyplot global state): safe to call from several threads
+    fig = Figure(figsize=(6, 5))
+    ax = fig.subplots()
+    sns.heatmap(cm, annot=True, fmt="d", cmap=cmap,
+                xticklabels=["Fail", "Success"],
+                yticklabels=["Fail", "Success"], ax=ax)
+    ax.set_xlabel("Predicted")
+    ax.set_ylabel("Actual")
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def evaluate(model, X_test, y_test, report_path=REPORT_PATH, cm_path=CM_PATH):
+    # --- Step 3: Evaluate on test set ---
+    y_pred = model.predict(X_test)
+    report = classification_report(y_test, y_pred)
+
+    # --- Step 4: Save classification report ---
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w") as f:
+        f.write(f"Evaluation Report - {datetime.now()}\n\n")
+        f.write(report)
+
+    print(f"📄 Evaluation report saved at {report_path}")
+
+    # --- Step 5: Confusion Matrix ---
+    cm = confusion_matrix(y_test, y_pred)
+    save_confusion_matrix(cm, cm_path, "Blues", "Confusion Matrix - Random Forest (Loaded Model)")
+
+    print(f"📊 Confusion matrix saved at {cm_path}")
+    return report
+
+
+def main():
+    # --- Step 1: Load test data ---
+    X_train, X_test, y_train, y_test, preprocessor = load_and_preprocess()
+
+    # --- Step 2: Load the saved model ---
+    model = joblib.load(MODEL_PATH)
+    print(f"✅ Loaded model from {MODEL_PATH}")
+
+    evaluate(model, X_test, y_test)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,136 @@
 import sys, os
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import joblib
+import numpy as np
 import pandas as pd
 
 # ✅ Ensure Python can find scripts/
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-# --- Step 1: Load saved model ---
-model_path = os.path.join("models", "random_forest_model.joblib")
-model = joblib.load(model_path)
-print(f"✅ Loaded model from {model_path}")
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "random_forest_model.joblib")
+PREDICTIONS_PATH = os.path.join(BASE_DIR, "data", "predictions.csv")
+FEATURES = ["flight", "payload", "orbit", "site", "gridfins", "reused", "legs"]
+RESULT_LABELS = np.array(["❌ Fail 💥", "✅ Success 🚀"])
 
-# --- Step 2: Example batch of new data ---
-new_data = pd.DataFrame([
-    {"flight": 130, "payload": 5500, "orbit": "LEO", "site": "KSC LC-39A", "gridfins": True,  "reused": True,  "legs": True},
-    {"flight": 5,   "payload": 8000, "orbit": "GTO", "site": "CCSFS SLC 40", "gridfins": False, "reused": False, "legs": False},
-    {"flight": 50,  "payload": 3000, "orbit": "ISS", "site": "VAFB SLC 4E", "gridfins": True,  "reused": False, "legs": True},
-])
 
-print("\n🔎 New data for prediction:")
-print(new_data)
+def label_results(predictions):
+    """Vectorized 0/1 -> human readable label."""
+    return RESULT_LABELS[(np.asarray(predictions) == 1).astype(int)]
 
-# --- Step 3: Predict ---
-predictions = model.predict(new_data)
 
-# --- Step 4: Interpret results ---
-results = ["✅ Success 🚀" if p == 1 else "❌ Fail 💥" for p in predictions]
+# --- Example mode: score a small in-memory batch ---
+def predict_examples(model=None, model_path=MODEL_PATH, output_path=PREDICTIONS_PATH):
+    # --- Step 1: Load saved model (unless one is passed in memory) ---
+    if model is None:
+        model = joblib.load(model_path)
+        print(f"✅ Loaded model from {model_path}")
 
-print("\n📊 Prediction results:")
-for i, res in enumerate(results):
-    print(f"Launch {i+1}: {res}")
+    # --- Step 2: Example batch of new data ---
+    new_data = pd.DataFrame([
+        {"flight": 130, "payload": 5500, "orbit": "LEO", "site": "KSC LC-39A", "gridfins": True,  "reused": True,  "legs": True},
+        {"flight": 5,   "payload": 8000, "orbit": "GTO", "site": "CCSFS SLC 40", "gridfins": False, "reused": False, "legs": False},
+        {"flight": 50,  "payload": 3000, "orbit": "ISS", "site": "VAFB SLC 4E", "gridfins": True,  "reused": False, "legs": True},
+    ])
 
-# --- Step 5: Save results to CSV ---
-output_df = new_data.copy()
-output_df["prediction"] = predictions
-output_df["result"] = results
+    print("\n🔎 New data for prediction:")
+    print(new_data)
 
-os.makedirs("data", exist_ok=True)
-output_path = os.path.join("data", "predictions.csv")
-output_df.to_csv(output_path, index=False)
+    # --- Step 3: Predict ---
+    predictions = model.predict(new_data)
 
-print(f"\n💾 Predictions saved to {output_path}")
+    # --- Step 4: Interpret results ---
+    results = label_results(predictions)
+
+    print("\n📊 Prediction results:")
+    for i, res in enumerate(results):
+        print(f"Launch {i+1}: {res}")
+
+    # --- Step 5: Save results to CSV ---
+    output_df = new_data.copy()
+    output_df["prediction"] = predictions
+    output_df["result"] = results
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    output_df.to_csv(output_path, index=False)
+
+    print(f"\n💾 Predictions saved to {output_path}")
+
+
+# --- Batch mode: stream a large file through a process pool ---
+_worker_model = None
+
+
+def _init_worker(model_path):
+    # Each worker deserializes the model exactly once
+    global _worker_model
+    _worker_model = joblib.load(model_path)
+
+
+def _score_chunk(chunk, header):
+    predictions = _worker_model.predict(chunk[FEATURES])
+    chunk["prediction"] = predictions
+    chunk["result"] = label_results(predictions)
+    # Serialize in the worker so the parent only writes bytes
+    return len(chunk), chunk.to_csv(index=False, header=header)
+
+
+def iter_chunks(input_path, chunksize):
+    if input_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunksize)
+
+
+def predict_batch(input_path, output_path, model_path=MODEL_PATH, chunksize=100_000, workers=None):
+    workers = workers or os.cpu_count() or 1
+    # At most two chunks queued per worker -> bounded memory, ordered output
+    max_pending = 2 * workers
+    rows = 0
+    start = time.perf_counter()
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path,)) as pool, \
+            open(output_path, "w", encoding="utf-8", newline="") as out:
+        pending = deque()
+        for i, chunk in enumerate(iter_chunks(input_path, chunksize)):
+            pending.append(pool.submit(_score_chunk, chunk, i == 0))
+            if len(pending) >= max_pending:
+                n, text = pending.popleft().result()
+                out.write(text)
+                rows += n
+        while pending:
+            n, text = pending.popleft().result()
+            out.write(text)
+            rows += n
+
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"💾 {rows:,} predictions saved to {output_path}")
+    print(f"⏱️ {elapsed:.2f}s · {rate:,.0f} rows/sec · {workers} workers · chunks of {chunksize:,}")
+    return rows, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score launches with the trained model.")
+    parser.add_argument("--input", help="CSV/Parquet file to score in batch mode")
+    parser.add_argument("--output", default=PREDICTIONS_PATH)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.input:
+        predict_batch(args.input, args.output, args.model, args.chunksize, args.workers)
+    else:
+        predict_examples(model_path=args.model, output_path=args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import sys, os
+import argparse
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import joblib
+
+# ✅ Ensure Python can find scripts/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.datastore import BASE_DIR, DATASETS
+from scripts.preprocessing import load_and_preprocess
+from pipeline import evaluate_model, predict, train_model, validate_model
+
+STATE_PATH = os.path.join(BASE_DIR, "data", "cache", "pipeline_state.json")
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLEAN_CSV = DATASETS["clean"]["csv"]
+PREPROCESSING_PY = os.path.join(BASE_DIR, "scripts", "preprocessing.py")
+
+
+class PipelineContext:
+    """Data and model shared in memory by every stage of one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._model = None
+        self._hashes = {}
+
+    def data(self):
+        with self._lock:
+            if self._data is None:
+                self._data = load_and_preprocess()
+            return self._data
+
+    def model(self):
+        # Fitted by `train` in this run, or loaded once from disk if train was skipped
+        with self._lock:
+            if self._model is None:
+                self._model = joblib.load(train_model.MODEL_PATH)
+                print(f"✅ Loaded model from {train_model.MODEL_PATH}")
+            return self._model
+
+    def set_model(self, model):
+        with self._lock:
+            self._model = model
+
+    def file_hash(self, path, block_size=1 << 20):
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if key in self._hashes:
+                return self._hashes[key]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        with self._lock:
+            self._hashes[key] = digest.hexdigest()
+        return self._hashes[key]
+
+
+# --- Stages: each one receives the shared context ---
+def run_train(ctx):
+    ctx.set_model(train_model.train(*ctx.data()))
+
+
+def run_evaluate(ctx):
+    _, X_test, _, y_test, _ = ctx.data()
+    evaluate_model.evaluate(ctx.model(), X_test, y_test)
+
+
+def run_predict(ctx):
+    predict.predict_examples(model=ctx.model())
+
+
+def run_validate(ctx):
+    validate_model.validate(ctx.model())
+
+
+STAGES = {
+    "train": {
+        "after": [],
+        "inputs": [CLEAN_CSV, PREPROCESSING_PY, os.path.join(PIPELINE_DIR, "train_model.py")],
+        "outputs": [train_model.MODEL_PATH],
+        "run": run_train,
+    },
+    "evaluate": {
+        "after": ["train"],
+        "inputs": [train_model.MODEL_PATH, CLEAN_CSV, PREPROCESSING_PY,
+                   os.path.join(PIPELINE_DIR, "evaluate_model.py")],
+        "outputs": [evaluate_model.REPORT_PATH, evaluate_model.CM_PATH],
+        "run": run_evaluate,
+    },
+    "predict": {
+        "after": ["train"],
+        "inputs": [train_model.MODEL_PATH, os.path.join(PIPELINE_DIR, "predict.py")],
+        "outputs": [predict.PREDICTIONS_PATH],
+        "run": run_predict,
+    },
+    "validate": {
+        "after": ["train"],
+        "inputs": [train_model.MODEL_PATH, validate_model.VALIDATION_PATH,
+                   os.path.join(PIPELINE_DIR, "validate_model.py")],
+        "outputs": [validate_model.REPORT_PATH, validate_model.CM_PATH,
+                    validate_model.PREDICTIONS_PATH],
+        "run": run_validate,
+    },
+}
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+class PipelineRunner:
+    def __init__(self, stages=STAGES, state_path=STATE_PATH, force=False, workers=3):
+        self.stages = stages
+        self.state_path = state_path
+        self.force = force
+        self.workers = workers
+        self.ctx = PipelineContext()
+        self.state = load_state(state_path)
+        self._state_lock = threading.Lock()
+
+    def inputs_hash(self, stage):
+        digest = hashlib.sha256()
+        for path in stage["inputs"]:
+            digest.update(path.encode("utf-8"))
+            digest.update(self.ctx.file_hash(path).encode("utf-8"))
+        return digest.hexdigest()
+
+    def run_stage(self, name):
+        stage = self.stages[name]
+        # Hashed when the stage becomes ready, i.e. after its parents wrote their outputs
+        digest = self.inputs_hash(stage)
+        outputs_exist = all(os.path.exists(p) for p in stage["outputs"])
+        if not self.force and outputs_exist and self.state.get(name) == digest:
+            print(f"⏭️  {name}: inputs unchanged, skipped")
+            return "skipped", 0.0
+
+        print(f"▶️  {name}")
+        start = time.perf_counter()
+        stage["run"](self.ctx)
+        elapsed = time.perf_counter() - start
+        with self._state_lock:
+            self.state[name] = digest
+            save_state(self.state, self.state_path)
+        return "ran", elapsed
+
+    def run(self):
+        pending = dict(self.stages)
+        results = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                # Independent stages (evaluate/predict/validate) start together
+                for name in [n for n, s in pending.items() if all(d in results for d in s["after"])]:
+                    running[pool.submit(self.run_stage, name)] = name
+                    del pending[name]
+                if not running:
+                    raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run train → evaluate/predict/validate in one process.")
+    parser.add_argument("--force", action="store_true", help="Run every stage even if its inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = PipelineRunner(force=args.force, workers=args.workers).run()
+
+    print("\n🧭 Pipeline summary:")
+    for name in STAGES:
+        status, elapsed = results[name]
+        print(f"   {name:<9} {status:<8} {elapsed:6.2f}s")
+    print(f"⏱️ Total wall time: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
 import sys, os
+import argparse
+import time
 import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
 from sklearn.pipeline import Pipeline
 
 # ✅ Ensure Python can find the scripts/ folder
@@ -9,34 +16,179 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from scripts.preprocessing import load_and_preprocess
 
-# --- Step 1: Load data ---
-X_train, X_test, y_train, y_test, preprocessor = load_and_preprocess()
-
-# --- Step 2: Define the final model (best hyperparameters) ---
-rf_final = RandomForestClassifier(
-    n_estimators=200,
-    max_depth=10,
-    min_samples_split=2,
-    class_weight="balanced",
-    random_state=42
-)
-
-# --- Step 3: Build pipeline (preprocessor + model) ---
-final_pipeline = Pipeline(steps=[
-    ("preprocessor", preprocessor),
-    ("classifier", rf_final)
-])
-
-# --- Step 4: Train model ---
-final_pipeline.fit(X_train, y_train)
-
-# --- Step 5: Evaluate quickly on test ---
-y_pred = final_pipeline.predict(X_test)
-print("📊 Classification Report (Final RF):")
-print(classification_report(y_test, y_pred))
-
-# --- Step 6: Save model ---
-os.makedirs("models", exist_ok=True)
-model_path = os.path.join("models", "random_forest_model.joblib")
-joblib.dump(final_pipeline, model_path)
-print(f"✅ Model saved at {model_path}")
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "random_forest_model.joblib")
+SEARCH_REPORT_PATH = os.path.join(BASE_DIR, "reports", "hyperparameter_search.csv")
+
+# Best hyperparameters found in notebooks/5_random_forest_classifier.ipynb
+BEST_PARAMS = {
+    "n_estimators": 200,
+    "max_depth": 10,
+    "min_samples_split": 2,
+    "class_weight": "balanced",
+}
+
+# Same space as the notebook's GridSearchCV
+PARAM_GRID = {
+    "n_estimators": [100, 200, 300],
+    "max_depth": [None, 5, 10, 20],
+    "min_samples_split": [2, 5, 10],
+    "class_weight": [None, "balanced"],
+}
+
+
+def build_pipeline(preprocessor, params, random_state=42):
+    return Pipeline(steps=[
+        ("preprocessor", preprocessor),
+        ("classifier", RandomForestClassifier(random_state=random_state, **params))
+    ])
+
+
+# --- Search: one preprocessor fit per fold, warm_start over n_estimators ---
+def transform_folds(X, y, preprocessor, cv):
+    """Fit the ColumnTransformer once per fold and keep the transformed arrays."""
+    y = np.asarray(y)
+    folds = []
+    for train_idx, val_idx in cv.split(X, y):
+        prep = clone(preprocessor).fit(X.iloc[train_idx])
+        folds.append((
+            prep.transform(X.iloc[train_idx]), y[train_idx],
+            prep.transform(X.iloc[val_idx]), y[val_idx],
+        ))
+    return folds
+
+
+def score_group(params, n_estimators, fold, fold_id, random_state=42):
+    """Grow one forest with warm_start and score it at every n_estimators step."""
+    X_tr, y_tr, X_val, y_val = fold
+    clf = RandomForestClassifier(warm_start=True, random_state=random_state, **params)
+    rows = []
+    fit_time = 0.0
+    for n in sorted(n_estimators):
+        clf.set_params(n_estimators=n)
+        start = time.perf_counter()
+        clf.fit(X_tr, y_tr)             # only the new trees are fitted
+        fit_time += time.perf_counter() - start
+        rows.append({
+            **params, "n_estimators": n, "fold": fold_id,
+            "score": accuracy_score(y_val, clf.predict(X_val)),
+            "fit_time": fit_time,       # cumulative: cost of a cold fit with n trees
+        })
+    return rows
+
+
+def candidate_groups(param_grid, n_iter=None, random_state=42):
+    """(params without n_estimators, n_estimators steps) for each warm-started forest.
+
+    `n_iter` counts full candidates, n_estimators included: the random draws
+    are grouped by the other parameters, so each forest only grows through
+    the sizes that were sampled for it and the search fits exactly `n_iter`
+    candidates per fold.
+    """
+    if not n_iter:
+        rest = {k: v for k, v in param_grid.items() if k != "n_estimators"}
+        return [(params, sorted(param_grid["n_estimators"])) for params in ParameterGrid(rest)]
+
+    n_iter = min(n_iter, len(ParameterGrid(param_grid)))
+    groups = {}
+    for candidate in ParameterSampler(param_grid, n_iter=n_iter, random_state=random_state):
+        n = candidate.pop("n_estimators")
+        key = tuple(sorted(candidate.items(), key=lambda item: item[0]))
+        groups.setdefault(key, (candidate, []))[1].append(n)
+    return [(params, sorted(steps)) for params, steps in groups.values()]
+
+
+def rank_results(rows):
+    # None -> "None" so max_depth / class_weight group cleanly and keep their ints
+    df = pd.DataFrame([{k: "None" if v is None else v for k, v in row.items()} for row in rows])
+    keys = [c for c in PARAM_GRID if c in df.columns]
+    table = (
+        df.groupby(keys, sort=False)
+        .agg(mean_test_score=("score", "mean"), std_test_score=("score", "std"),
+             mean_fit_time=("fit_time", "mean"))
+        .reset_index()
+    )
+    table["rank_test_score"] = table["mean_test_score"].rank(method="min", ascending=False).astype(int)
+    return table.sort_values(["rank_test_score", "mean_fit_time"]).reset_index(drop=True)
+
+
+def params_from_row(row):
+    params = {k: (None if row[k] == "None" else row[k]) for k in PARAM_GRID}
+    params["n_estimators"] = int(params["n_estimators"])
+    if params["max_depth"] is not None:
+        params["max_depth"] = int(params["max_depth"])
+    params["min_samples_split"] = int(params["min_samples_split"])
+    return params
+
+
+def search(X_train, y_train, preprocessor, param_grid=PARAM_GRID, n_iter=None, cv=5,
+           n_jobs=-1, random_state=42):
+    splitter = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    folds = transform_folds(X_train, y_train, preprocessor, splitter)
+    groups = candidate_groups(param_grid, n_iter, random_state)
+    n_candidates = sum(len(steps) for _, steps in groups)
+    print(f"🔎 {n_candidates} candidates x {cv} folds "
+          f"({len(groups) * cv} warm-started forests)")
+
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(score_group)(params, steps, fold, i, random_state)
+        for params, steps in groups
+        for i, fold in enumerate(folds)
+    )
+    return rank_results([row for rows in results for row in rows])
+
+
+def train(X_train, X_test, y_train, y_test, preprocessor, params=BEST_PARAMS, model_path=MODEL_PATH):
+    # --- Step 3: Build pipeline (preprocessor + model) ---
+    final_pipeline = build_pipeline(preprocessor, params)
+
+    # --- Step 4: Train model ---
+    final_pipeline.fit(X_train, y_train)
+
+    # --- Step 5: Evaluate quickly on test ---
+    y_pred = final_pipeline.predict(X_test)
+    print("📊 Classification Report (Final RF):")
+    print(classification_report(y_test, y_pred))
+
+    # --- Step 6: Save model ---
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    joblib.dump(final_pipeline, model_path)
+    print(f"✅ Model saved at {model_path}")
+    return final_pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the RandomForest launch classifier.")
+    parser.add_argument("--search", action="store_true",
+                        help="Tune hyperparameters with cross-validation before training")
+    parser.add_argument("--n-iter", type=int, default=None,
+                        help="Random search: evaluate N candidates (n_estimators included) "
+                             "instead of the full grid")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--report", default=SEARCH_REPORT_PATH)
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    # --- Step 1: Load data ---
+    X_train, X_test, y_train, y_test, preprocessor = load_and_preprocess()
+
+    # --- Step 2: Choose hyperparameters (fixed, or ranked search) ---
+    params = BEST_PARAMS
+    if args.search:
+        start = time.perf_counter()
+        ranking = search(X_train, y_train, preprocessor, n_iter=args.n_iter, cv=args.cv,
+                         n_jobs=args.n_jobs)
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        ranking.to_csv(args.report, index=False)
+        print(f"⏱️ Search finished in {time.perf_counter() - start:.1f}s")
+        print(ranking.head(10).to_string(index=False))
+        print(f"✅ Ranked results saved at {args.report}")
+        params = params_from_row(ranking.iloc[0])
+        print(f"🏆 Best parameters: {params}")
+
+    train(X_train, X_test, y_train, y_test, preprocessor, params, args.model)
+
+
+if __name__ == "__main__":
+    main()
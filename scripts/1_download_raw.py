@@ -1,19 +1,89 @@
 import os
-import pandas as pd
-import requests
+import sys
+import argparse
+import asyncio
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scripts.http_fetch import Fetcher
+from scripts.raw_store import RawDatasetWriter, has_columnar
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
-os.makedirs(RAW_DIR, exist_ok=True)
 
-API = "https://api.spacexdata.com/v4"
-endpoints = ["launches", "rockets", "launchpads", "payloads", "cores"]
+API = os.environ.get("SPACEX_API", "https://api.spacexdata.com/v4")
+
+# Colecciones grandes -> paginadas vía /query; pequeñas -> GET condicional
+ENDPOINTS = {
+    "launches": {"paginate": True, "sort": {"flight_number": "asc"}},
+    "payloads": {"paginate": True, "sort": None},
+    "cores": {"paginate": True, "sort": None},
+    "rockets": {"paginate": False},
+    "launchpads": {"paginate": False},
+}
+# Páginas en vuelo por colección paginada
+PAGE_WORKERS = 4
+
+
+async def _single_page(body):
+    yield json.loads(body)
+
+
+async def download_endpoint(fetcher, api, endpoint, raw_dir, page_workers=PAGE_WORKERS):
+    """Descarga un endpoint y lo publica en data/raw/<endpoint>/ página a página."""
+    spec = ENDPOINTS[endpoint]
+    url = f"{api}/{endpoint}"
+
+    if spec["paginate"]:
+        pages = fetcher.iter_pages(f"{url}/query", sort=spec.get("sort"), workers=page_workers)
+    else:
+        if not has_columnar(endpoint, raw_dir):
+            fetcher.forget(url)
+        body = await fetcher.get(url)
+        if body is None:
+            return endpoint, "sin cambios (304)"
+        pages = _single_page(body)
+
+    # Parquet en un hilo: el event loop sigue atendiendo al resto de descargas
+    writer = RawDatasetWriter(endpoint, raw_dir)
+    try:
+        async for docs in pages:
+            await asyncio.to_thread(writer.write, docs)
+    except BaseException:
+        writer.abort()
+        raise
+    changed = await asyncio.to_thread(writer.commit)
+    return endpoint, f"{writer.rows} registros" + ("" if changed else " (idéntico, no se reescribe)")
+
+
+async def download_all(api, raw_dir, endpoints=None, page_workers=PAGE_WORKERS):
+    """Descarga `endpoints` (todos por defecto) a la vez; devuelve [(endpoint, estado)]."""
+    endpoints = list(endpoints or ENDPOINTS)
+    paginated = sum(ENDPOINTS[e]["paginate"] for e in endpoints)
+    # Una conexión por petición que puede estar en vuelo a la vez
+    concurrency = paginated * page_workers + len(endpoints) - paginated
+    async with Fetcher(concurrency=concurrency) as fetcher:
+        results = await asyncio.gather(*(download_endpoint(fetcher, api, e, raw_dir, page_workers)
+                                         for e in endpoints))
+    fetcher.save_validators()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Descarga los endpoints de la API v4 de SpaceX a data/raw/")
+    parser.add_argument("--api", default=API)
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--page-workers", type=int, default=PAGE_WORKERS,
+                        help="páginas de /query en vuelo por colección")
+    args = parser.parse_args()
+
+    os.makedirs(args.raw_dir, exist_ok=True)
+    print(f"📥 Descargando {', '.join(ENDPOINTS)}...")
+    for endpoint, status in asyncio.run(download_all(args.api, args.raw_dir, page_workers=args.page_workers)):
+        print(f"   {endpoint}: {status}")
+
+    print(f"✅ Datos guardados en {args.raw_dir}")
 
-for endpoint in endpoints:
-    print(f"📥 Descargando {endpoint}...")
-    url = f"{API}/{endpoint}"
-    data = requests.get(url).json()
-    df = pd.json_normalize(data)
-    df.to_csv(os.path.join(RAW_DIR, f"{endpoint}_raw.csv"), index=False)
 
-print("✅ Datos guardados en data/raw/")
+if __name__ == "__main__":
+    main()
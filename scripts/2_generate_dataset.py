@@ -1,124 +1,368 @@
 import os
+import io
+import sys
+import argparse
 import pandas as pd
+import numpy as np
 import ast
+import hashlib
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scripts.raw_store import current_version, has_columnar, raw_fingerprint, read_manifest, read_raw
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
-os.makedirs(PROCESSED_DIR, exist_ok=True)
-
-# === 1. Cargar datos crudos ===
-launches = pd.read_csv(os.path.join(RAW_DIR, "launches_raw.csv"))
-rockets = pd.read_csv(os.path.join(RAW_DIR, "rockets_raw.csv"))
-pads = pd.read_csv(os.path.join(RAW_DIR, "launchpads_raw.csv"))
-payloads = pd.read_csv(os.path.join(RAW_DIR, "payloads_raw.csv"))
-
-# === 2. Filtrar solo Falcon 9 ===
-if "name" in rockets.columns:
-    falcon9_ids = rockets.loc[rockets["name"].str.contains("Falcon 9", case=False), "id"]
-else:
-    falcon9_ids = rockets["id"]  # seguridad, si cambia el nombre
-launches = launches[launches["rocket"].isin(falcon9_ids)]
-
-# === 3. FlightNumber y Date ===
-launches["FlightNumber"] = launches["flight_number"]
-launches["Date"] = pd.to_datetime(launches["date_utc"]).dt.date
-
-# === 4. Booster Version ===
-rockets_name_col = "name" if "name" in rockets.columns else rockets.columns[0]
-launches = launches.merge(
-    rockets[["id", rockets_name_col]],
-    left_on="rocket", right_on="id", how="left"
-).rename(columns={rockets_name_col: "BoosterVersion"})
-if "id" in launches.columns:
-    launches = launches.drop(columns=["id"])
-if "BoosterVersion" not in launches.columns:
-    launches["BoosterVersion"] = None
-
-# === 5. Payload info ===
-launches["payload_id"] = launches["payloads"].apply(
-    lambda x: ast.literal_eval(x)[0] if pd.notnull(x) and x != "[]" else None
-)
-payloads_cols = ["id"]
-if "mass_kg" in payloads.columns:
-    payloads_cols.append("mass_kg")
-if "orbit" in payloads.columns:
-    payloads_cols.append("orbit")
-launches = launches.merge(
-    payloads[payloads_cols],
-    left_on="payload_id", right_on="id", how="left"
-)
-if "mass_kg" in launches.columns:
-    launches = launches.rename(columns={"mass_kg": "PayloadMass"})
-else:
-    launches["PayloadMass"] = None
-if "orbit" in launches.columns:
-    launches = launches.rename(columns={"orbit": "Orbit"})
-else:
-    launches["Orbit"] = None
-if "id" in launches.columns:
-    launches = launches.drop(columns=["id"])
-
-# === 6. Launch Site ===
-pads_cols = ["id"]
-for col in ["name", "latitude", "longitude"]:
-    if col in pads.columns:
-        pads_cols.append(col)
-launches = launches.merge(
-    pads[pads_cols],
-    left_on="launchpad", right_on="id", how="left"
-)
-if "name" in launches.columns:
-    launches = launches.rename(columns={"name": "LaunchSite"})
-else:
-    launches["LaunchSite"] = None
-if "latitude" in launches.columns:
-    launches = launches.rename(columns={"latitude": "Latitude"})
-else:
-    launches["Latitude"] = None
-if "longitude" in launches.columns:
-    launches = launches.rename(columns={"longitude": "Longitude"})
-else:
-    launches["Longitude"] = None
-if "id" in launches.columns:
-    launches = launches.drop(columns=["id"])
-
-# === 7. Core data ===
-def get_core_data(core_str):
-    try:
-        cores_list = ast.literal_eval(core_str)
-        return cores_list[0] if isinstance(cores_list, list) and len(cores_list) > 0 else {}
-    except:
-        return {}
-
-launches["core_data"] = launches["cores"].apply(get_core_data)
-launches["GridFins"] = launches["core_data"].apply(lambda x: x.get("gridfins", None))
-launches["Reused"] = launches["core_data"].apply(lambda x: x.get("reused", None))
-launches["Legs"] = launches["core_data"].apply(lambda x: x.get("legs", None))
-launches["LandingPad"] = launches["core_data"].apply(lambda x: x.get("landpad", None))
-launches["Block"] = launches["core_data"].apply(lambda x: x.get("block", None))
-launches["ReusedCount"] = launches["core_data"].apply(lambda x: x.get("reuse_count", None))
-launches["Serial"] = launches["core_data"].apply(lambda x: x.get("core", None))
-launches["Outcome"] = launches["core_data"].apply(
-    lambda x: f"{'True' if x.get('landing_success') else 'False'} {x.get('landing_type', 'Unknown')}"
-)
-launches["Class"] = launches["core_data"].apply(lambda x: 1 if x.get("landing_success") else 0)
-launches["Flights"] = launches["ReusedCount"].apply(lambda x: x + 1 if pd.notnull(x) else 1)
-
-# === 8. Columnas finales ===
-final_cols = [
+WATERMARK_PATH = os.path.join(PROCESSED_DIR, "dataset_part_2.watermark.json")
+
+# Si cambia cualquiera de estas tablas hay que reconstruir todo
+DIMENSION_TABLES = ["rockets", "launchpads", "payloads"]
+
+# Campos del primer core -> columnas del dataset
+CORE_COLUMNS = ["GridFins", "Reused", "Legs", "LandingPad", "Block", "ReusedCount", "Serial"]
+CORE_KEYS = ["gridfins", "reused", "legs", "landpad", "block", "reuse_count", "core"]
+
+# Tipos fijos de salida: un delta y una reconstrucción completa se escriben igual
+FLOAT_COLS = ["PayloadMass", "Flights", "Block", "ReusedCount", "Longitude", "Latitude"]
+
+FINAL_COLS = [
     "FlightNumber", "Date", "BoosterVersion", "PayloadMass", "Orbit", "LaunchSite",
     "Outcome", "Flights", "GridFins", "Reused", "Legs",
     "LandingPad", "Block", "ReusedCount", "Serial", "Longitude", "Latitude", "Class"
 ]
-for col in final_cols:
-    if col not in launches.columns:
-        launches[col] = None
 
-df_final = launches[final_cols]
+# repr de Python -> JSON. Los cores solo contienen ids, booleanos, números y
+# tipos de aterrizaje (sin texto libre), así que la traducción es segura; si
+# aparece cualquier comilla doble o escape se usa ast.literal_eval.
+_JSON_TOKENS = (("'", '"'), ("True", "true"), ("False", "false"), ("None", "null"))
+
+
+def parse_literal(text):
+    """Lista/dict serializado con str() -> objeto Python, vía json cuando es posible."""
+    if '"' not in text and "\\" not in text:
+        candidate = text
+        for old, new in _JSON_TOKENS:
+            candidate = candidate.replace(old, new)
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+    return ast.literal_eval(text)
+
+
+def first_core(value):
+    if isinstance(value, list):         # ya estructurado (p. ej. desde Parquet)
+        cores_list = value
+    else:
+        try:
+            cores_list = parse_literal(value)
+        except (ValueError, SyntaxError, TypeError):
+            return {}
+    return cores_list[0] if isinstance(cores_list, list) and len(cores_list) > 0 else {}
+
+
+def core_columns(cores):
+    """Una sola pasada sobre `cores` -> DataFrame con todos los campos del core."""
+    records = []
+    for core in map(first_core, cores):
+        get = core.get
+        records.append(
+            [get(k, None) for k in CORE_KEYS]
+            + [bool(get("landing_success")), get("landing_type", "Unknown")]
+        )
+    df = pd.DataFrame.from_records(
+        records, columns=CORE_COLUMNS + ["landing_success", "landing_type"]
+    )
+    df.index = cores.index
+
+    success = df.pop("landing_success").to_numpy(dtype=bool)
+    landing_type = df.pop("landing_type").astype(str)
+    return _derive_core_columns(df, success, landing_type)
+
+
+def core_columns_from_table(launch_ids, cores_table):
+    """Igual que `core_columns`, pero desde la tabla hija launches_cores (sin parsear texto)."""
+    first = cores_table[cores_table["core_index"] == 0].drop_duplicates("launch_id").set_index("launch_id")
+    aligned = first.reindex(launch_ids.to_numpy())
+    has_core = launch_ids.isin(first.index).to_numpy()
+
+    df = pd.DataFrame(index=launch_ids.index)
+    for key, col in zip(CORE_KEYS, CORE_COLUMNS):
+        values = aligned[key].to_numpy(dtype=object) if key in aligned.columns else None
+        df[col] = values
+        if values is not None:
+            df[col] = df[col].where(df[col].notna(), None).infer_objects()
+
+    if "landing_success" in aligned.columns:
+        success = aligned["landing_success"].eq(True).to_numpy()
+    else:
+        success = np.zeros(len(df), dtype=bool)
+    if "landing_type" in aligned.columns:
+        landing_type = aligned["landing_type"].astype(object).where(aligned["landing_type"].notna(), None)
+        landing_type = landing_type.astype(str).to_numpy()
+    else:
+        landing_type = np.full(len(df), "None", dtype=object)
+    # Sin core -> el diccionario vacío de antes: tipo "Unknown"
+    landing_type = np.where(has_core, landing_type, "Unknown")
+    return _derive_core_columns(df, success, pd.Series(landing_type, index=df.index))
+
+
+def _derive_core_columns(df, success, landing_type):
+    df["Outcome"] = np.where(success, "True ", "False ") + landing_type
+    df["Class"] = success.astype(int)
+    reused_count = pd.to_numeric(df["ReusedCount"], errors="coerce")
+    df["Flights"] = reused_count.add(1).fillna(1) if reused_count.notna().any() else 1
+    return df
+
+
+def payload_ids(payloads):
+    """Primer id de la lista de payloads de cada lanzamiento (vectorizado)."""
+    return payloads.str.extract(r"^\[\s*'([^']*)'", expand=False)
+
+
+def load_raw(raw_dir=None, version=None, parts=None):
+    """Tablas crudas; `parts` limita los lanzamientos (y sus hijas) a esas páginas."""
+    raw_dir = raw_dir or RAW_DIR
+    # === 1. Cargar datos crudos (Parquet de 1_download_raw.py, o CSV antiguos) ===
+    # Lanzamientos y sus tablas hijas de la misma versión publicada
+    version = version or current_version("launches", raw_dir)
+    launches = read_raw("launches", raw_dir, version=version, parts=parts)
+    rockets = read_raw("rockets", raw_dir)
+    pads = read_raw("launchpads", raw_dir)
+    payloads = read_raw("payloads", raw_dir)
+
+    if has_columnar("launches", raw_dir, version):
+        # Listas anidadas ya estructuradas en tablas hijas: nada que parsear
+        links = read_raw("launches_payloads", raw_dir, version=version, parts=parts) \
+            if has_columnar("launches_payloads", raw_dir, version) \
+            else pd.DataFrame(columns=["launch_id", "payload_index", "payload_id"])
+        first_payload = links[links["payload_index"] == 0].drop_duplicates("launch_id")
+        launches["payload_id"] = launches["id"].map(first_payload.set_index("launch_id")["payload_id"])
+
+        cores = read_raw("launches_cores", raw_dir, version=version, parts=parts) \
+            if has_columnar("launches_cores", raw_dir, version) \
+            else pd.DataFrame(columns=["launch_id", "core_index"])
+        launches = launches.assign(**core_columns_from_table(launches["id"], cores))
+    return launches, rockets, pads, payloads
+
+
+def build_dataset(launches, rockets, pads, payloads):
+    # === 2. Filtrar solo Falcon 9 ===
+    if "name" in rockets.columns:
+        falcon9_ids = rockets.loc[rockets["name"].str.contains("Falcon 9", case=False), "id"]
+    else:
+        falcon9_ids = rockets["id"]  # seguridad, si cambia el nombre
+    launches = launches[launches["rocket"].isin(falcon9_ids)].copy()
+
+    # === 3. FlightNumber y Date ===
+    launches["FlightNumber"] = launches["flight_number"]
+    launches["Date"] = pd.to_datetime(launches["date_utc"]).dt.date
+
+    # === 4. Booster Version ===
+    rockets_name_col = "name" if "name" in rockets.columns else rockets.columns[0]
+    launches = launches.merge(
+        rockets[["id", rockets_name_col]],
+        left_on="rocket", right_on="id", how="left"
+    ).rename(columns={rockets_name_col: "BoosterVersion"})
+    if "id" in launches.columns:
+        launches = launches.drop(columns=["id"])
+    if "BoosterVersion" not in launches.columns:
+        launches["BoosterVersion"] = None
+
+    # === 5. Payload info ===
+    if "payload_id" not in launches.columns:
+        launches["payload_id"] = payload_ids(launches["payloads"])
+    payloads_cols = ["id"]
+    if "mass_kg" in payloads.columns:
+        payloads_cols.append("mass_kg")
+    if "orbit" in payloads.columns:
+        payloads_cols.append("orbit")
+    launches = launches.merge(
+        payloads[payloads_cols],
+        left_on="payload_id", right_on="id", how="left"
+    )
+    if "mass_kg" in launches.columns:
+        launches = launches.rename(columns={"mass_kg": "PayloadMass"})
+    else:
+        launches["PayloadMass"] = None
+    if "orbit" in launches.columns:
+        launches = launches.rename(columns={"orbit": "Orbit"})
+    else:
+        launches["Orbit"] = None
+    if "id" in launches.columns:
+        launches = launches.drop(columns=["id"])
+
+    # === 6. Launch Site ===
+    pads_cols = ["id"]
+    for col in ["name", "latitude", "longitude"]:
+        if col in pads.columns:
+            pads_cols.append(col)
+    launches = launches.merge(
+        pads[pads_cols],
+        left_on="launchpad", right_on="id", how="left"
+    )
+    if "name" in launches.columns:
+        launches = launches.rename(columns={"name": "LaunchSite"})
+    else:
+        launches["LaunchSite"] = None
+    if "latitude" in launches.columns:
+        launches = launches.rename(columns={"latitude": "Latitude"})
+    else:
+        launches["Latitude"] = None
+    if "longitude" in launches.columns:
+        launches = launches.rename(columns={"longitude": "Longitude"})
+    else:
+        launches["Longitude"] = None
+    if "id" in launches.columns:
+        launches = launches.drop(columns=["id"])
+
+    # === 7. Core data (una sola pasada; ya calculado si viene de Parquet) ===
+    if "cores" in launches.columns:
+        launches = launches.assign(**core_columns(launches["cores"]))
+
+    # === 8. Columnas finales ===
+    for col in FINAL_COLS:
+        if col not in launches.columns:
+            launches[col] = None
+
+    df_final = launches[FINAL_COLS].copy()
+    df_final[FLOAT_COLS] = df_final[FLOAT_COLS].apply(pd.to_numeric, errors="coerce").astype(float)
+    return df_final
+
+
+# === Modo incremental ===
+def row_hashes(df):
+    """Hash del texto CSV de cada fila del dataset (Series indexada por FlightNumber)."""
+    lines = df.to_csv(index=False, header=False).splitlines()
+    digests = [hashlib.sha1(line.encode("utf-8")).hexdigest()[:16] for line in lines]
+    return pd.Series(digests, index=df["FlightNumber"].astype(str).to_numpy(), dtype=object)
+
+
+def launches_state(version):
+    """(huella, hashes por página) de los lanzamientos crudos; sin páginas si vienen de CSV."""
+    if version is None:
+        return raw_fingerprint("launches", RAW_DIR), None
+    manifest = read_manifest("launches", RAW_DIR, version)
+    return manifest.get("sha256"), manifest.get("part_hashes")
+
+
+def load_watermark(path=None):
+    path = path or WATERMARK_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_watermark(version, rows, dimensions, path=None):
+    """Estado tras escribir el dataset: versión cruda procesada y hash de cada fila escrita."""
+    path = path or WATERMARK_PATH
+    fingerprint, part_hashes = launches_state(version)
+    flights = pd.to_numeric(pd.Series(list(rows)), errors="coerce")
+    watermark = {
+        # Último FlightNumber del dataset: decide si un delta se puede añadir al final
+        "flight_number": int(flights.max()) if flights.notna().any() else None,
+        "launches_fingerprint": fingerprint,
+        "launches_parts": part_hashes,
+        "dimensions": dimensions,
+        "row_hashes": rows,
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(watermark, f)
+    os.replace(tmp, path)
+
+
+def dimension_fingerprints(raw_dir=None):
+    raw_dir = raw_dir or RAW_DIR
+    return {name: raw_fingerprint(name, raw_dir) for name in DIMENSION_TABLES}
+
+
+def full_build(output_path):
+    version = current_version("launches", RAW_DIR)
+    launches, rockets, pads, payloads = load_raw(version=version)
+    df_final = build_dataset(launches, rockets, pads, payloads)
+    df_final.to_csv(output_path, index=False)
+    save_watermark(version, row_hashes(df_final).to_dict(), dimension_fingerprints())
+    print(f"✅ Dataset procesado guardado en: {output_path} ({len(df_final)} filas, reconstrucción completa)")
+
+
+def incremental_build(output_path):
+    """Procesa solo las páginas de lanzamientos nuevas o modificadas desde el último watermark.
+
+    El watermark guarda el hash de cada página cruda de launches (del
+    manifiesto) y de cada fila escrita: solo se cargan las páginas cuyo hash
+    cambió, y de ellas solo se escriben las filas que cambian en el dataset.
+    Si cambian las tablas de dimensiones (rockets, launchpads, payloads), los
+    lanzamientos vienen de CSV o no hay watermark/dataset previo, hace una
+    reconstrucción completa. Los lanzamientos borrados del export crudo solo
+    desaparecen con --full.
+    """
+    watermark = load_watermark()
+    if watermark is None or "launches_parts" not in watermark or not os.path.exists(output_path):
+        print("ℹ️ Sin watermark previo: reconstrucción completa")
+        return full_build(output_path)
+
+    dimensions = dimension_fingerprints()
+    if dimensions != watermark["dimensions"]:
+        print("ℹ️ Cambiaron las tablas de dimensiones: reconstrucción completa")
+        return full_build(output_path)
+
+    version = current_version("launches", RAW_DIR)
+    fingerprint, part_hashes = launches_state(version)
+    if fingerprint == watermark["launches_fingerprint"]:
+        print("✅ Sin lanzamientos nuevos: dataset al día")
+        return
+    if part_hashes is None or watermark["launches_parts"] is None:
+        print("ℹ️ Lanzamientos crudos sin páginas (CSV): reconstrucción completa")
+        return full_build(output_path)
+
+    # Solo las páginas nuevas o con hash distinto; el resto ni se lee
+    previous_parts = watermark["launches_parts"]
+    parts = [i for i, h in enumerate(part_hashes) if i >= len(previous_parts) or previous_parts[i] != h]
+    launches, rockets, pads, payloads = load_raw(version=version, parts=parts)
+    delta = build_dataset(launches, rockets, pads, payloads)
+
+    # De esas páginas, solo las filas que cambian en el dataset
+    rows = watermark["row_hashes"]
+    current = row_hashes(delta)
+    delta = delta[[rows.get(k) != h for k, h in current.items()]]
+    rows.update(current.to_dict())
+
+    last = watermark["flight_number"]
+    if last is None or (delta["FlightNumber"] > last).all():
+        # Solo altas: se añaden al final sin leer ni reescribir el histórico
+        delta.to_csv(output_path, mode="a", header=False, index=False)
+    else:
+        # Upsert: se sustituyen las filas con el mismo FlightNumber. Se trabaja
+        # con el texto tal cual para no re-inferir (y reformatear) columnas.
+        read_text = lambda f: pd.read_csv(f, dtype=str, keep_default_na=False)
+        existing = read_text(output_path)
+        delta_text = read_text(io.StringIO(delta.to_csv(index=False)))
+        existing = existing[~existing["FlightNumber"].isin(delta_text["FlightNumber"])]
+        merged = pd.concat([existing, delta_text], ignore_index=True)
+        merged = merged.sort_values("FlightNumber", key=lambda s: pd.to_numeric(s), kind="stable")
+        merged.to_csv(output_path, index=False)
+
+    save_watermark(version, rows, dimensions)
+    print(f"✅ Dataset actualizado: {len(parts)} páginas nuevas/modificadas, {len(delta)} filas escritas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera data/processed/dataset_part_2.csv")
+    parser.add_argument("--full", action="store_true",
+                        help="reconstruir desde cero en lugar de procesar solo el delta")
+    args = parser.parse_args()
+
+    os.makedirs(PROCESSED_DIR, exist_ok=True)
+    # === 9. Guardar dataset procesado ===
+    output_path = os.path.join(PROCESSED_DIR, "dataset_part_2.csv")
+    if args.full:
+        full_build(output_path)
+    else:
+        incremental_build(output_path)
 
-# === 9. Guardar dataset procesado ===
-output_path = os.path.join(PROCESSED_DIR, "dataset_part_2.csv")
-df_final.to_csv(output_path, index=False)
 
-print(f"✅ Dataset procesado guardado en: {output_path}")
+if __name__ == "__main__":
+    main()
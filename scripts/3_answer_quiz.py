@@ -1,11 +1,10 @@
-import pandas as pd
-import os
+import sys, os
 
-# Ruta al CSV procesado
-DATA_PATH = os.path.join("data", "processed", "dataset_part_2.csv")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scripts.datastore import load_dataset
 
-# Cargar dataset
-df = pd.read_csv(DATA_PATH)
+# Cargar dataset (copia columnar de data/processed/dataset_part_2.csv)
+df = load_dataset("launches", columns=["BoosterVersion", "LaunchSite", "Class", "Orbit", "LandingPad"])
 
 # 🔹 Asegurar que BoosterVersion sea string
 df["BoosterVersion"] = df["BoosterVersion"].astype(str)
@@ -1,10 +1,14 @@
 # analyze_spacex.py
 # -*- coding: utf-8 -*-
+import os
 import sys
 import re
 from pathlib import Path
 import pandas as pd
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scripts.datastore import load_table
+
 # ---------- utils ----------
 def coalesce_col(df, *candidates):
     """Devuelve el nombre de la 1ª columna existente entre candidates."""
@@ -24,7 +28,7 @@ def contains_any(value, keys):
 
 # ---------- core ----------
 def load_df(csv_path: str) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
+    df = load_table(csv_path)
     # normalizaciones ligeras comunes
     # éxito
     col_success = coalesce_col(df, "is_success", "success", "launch_success")
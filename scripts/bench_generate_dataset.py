@@ -0,0 +1,110 @@
+# scripts/bench_generate_dataset.py
+"""
+Compara el parseo de cores/payloads de 2_generate_dataset.py con la versión
+anterior (ast.literal_eval + nueve .apply) sobre un export crudo sintético.
+
+Uso: python scripts/bench_generate_dataset.py [n_filas]
+"""
+import ast
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+_spec = importlib.util.spec_from_file_location("generate_dataset", os.path.join(HERE, "2_generate_dataset.py"))
+generate_dataset = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(generate_dataset)
+
+
+# --- Versión anterior (referencia) ---
+def legacy_payload_ids(payloads):
+    return payloads.apply(
+        lambda x: ast.literal_eval(x)[0] if pd.notnull(x) and x != "[]" else None
+    )
+
+
+def legacy_core_columns(cores):
+    def get_core_data(core_str):
+        try:
+            cores_list = ast.literal_eval(core_str)
+            return cores_list[0] if isinstance(cores_list, list) and len(cores_list) > 0 else {}
+        except:
+            return {}
+
+    out = pd.DataFrame(index=cores.index)
+    core_data = cores.apply(get_core_data)
+    out["GridFins"] = core_data.apply(lambda x: x.get("gridfins", None))
+    out["Reused"] = core_data.apply(lambda x: x.get("reused", None))
+    out["Legs"] = core_data.apply(lambda x: x.get("legs", None))
+    out["LandingPad"] = core_data.apply(lambda x: x.get("landpad", None))
+    out["Block"] = core_data.apply(lambda x: x.get("block", None))
+    out["ReusedCount"] = core_data.apply(lambda x: x.get("reuse_count", None))
+    out["Serial"] = core_data.apply(lambda x: x.get("core", None))
+    out["Outcome"] = core_data.apply(
+        lambda x: f"{'True' if x.get('landing_success') else 'False'} {x.get('landing_type', 'Unknown')}"
+    )
+    out["Class"] = core_data.apply(lambda x: 1 if x.get("landing_success") else 0)
+    out["Flights"] = out["ReusedCount"].apply(lambda x: x + 1 if pd.notnull(x) else 1)
+    return out
+
+
+# --- Export crudo sintético (mismo formato que pd.json_normalize -> to_csv) ---
+def synthetic_raw(n, seed=42):
+    rng = np.random.default_rng(seed)
+    hexid = lambda i: f"{i:024x}"
+    landing_types = np.array(["ASDS", "RTLS", "Ocean", None], dtype=object)
+    cores = []
+    for i in range(n):
+        if i % 50 == 0:
+            cores.append("[]")
+            continue
+        core = {
+            "core": hexid(rng.integers(1 << 40)) if i % 7 else None,
+            "flight": int(rng.integers(1, 15)),
+            "gridfins": bool(rng.integers(2)),
+            "legs": bool(rng.integers(2)),
+            "reused": bool(rng.integers(2)),
+            "landing_attempt": True,
+            "landing_success": [True, False, None][i % 3],
+            "landing_type": landing_types[i % 4],
+            "landpad": hexid(i % 5) if i % 5 else None,
+        }
+        if i % 3:
+            core["block"] = int(rng.integers(1, 6)) if i % 4 else None
+            core["reuse_count"] = int(rng.integers(0, 10))
+        cores.append(str([core]))
+    payloads = [str([hexid(10_000 + i)]) if i % 40 else "[]" for i in range(n)]
+    return pd.DataFrame({"cores": cores, "payloads": payloads})
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main(n):
+    raw = synthetic_raw(n)
+    cores_old, t_cores_old = timed(legacy_core_columns, raw["cores"])
+    cores_new, t_cores_new = timed(generate_dataset.core_columns, raw["cores"])
+    ids_old, t_ids_old = timed(legacy_payload_ids, raw["payloads"])
+    ids_new, t_ids_new = timed(generate_dataset.payload_ids, raw["payloads"])
+
+    # Mismo resultado tal y como se escribe a CSV
+    cols = list(cores_old.columns)
+    same_cores = cores_old[cols].to_csv(index=False) == cores_new[cols].to_csv(index=False)
+    same_ids = ids_old.to_csv(index=False) == ids_new.to_csv(index=False)
+
+    print(f"Filas: {n:,}")
+    print(f"cores    · anterior {t_cores_old:7.3f}s · nuevo {t_cores_new:7.3f}s · x{t_cores_old / t_cores_new:5.1f} · idéntico: {same_cores}")
+    print(f"payloads · anterior {t_ids_old:7.3f}s · nuevo {t_ids_new:7.3f}s · x{t_ids_old / t_ids_new:5.1f} · idéntico: {same_ids}")
+    if not (same_cores and same_ids):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
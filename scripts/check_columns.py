@@ -1,19 +1,16 @@
 import os
-import pandas as pd
+import sys
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scripts.raw_store import has_columnar, read_raw
 
-files = [
-    "launchpads_raw.csv",
-    "payloads_raw.csv",
-    "launches_raw.csv"
-]
+resources = ["launchpads", "payloads", "launches"]
+# Las tablas hijas solo existen en el formato Parquet
+child_tables = ["launches_cores", "launches_payloads"]
 
-for file in files:
-    print(f"\n=== 📂 {file} ===")
-    path = os.path.join(RAW_DIR, file)
-    df = pd.read_csv(path)
+for name in resources + [t for t in child_tables if has_columnar(t)]:
+    print(f"\n=== 📂 {name} ===")
+    df = read_raw(name)
     print("📌 Columnas:", df.columns.tolist())
     print("\n📄 Primeras filas:")
     print(df.head())
@@ -0,0 +1,261 @@
+# scripts/datastore.py
+"""
+Acceso a los datasets procesados a través de una copia columnar tipada.
+
+La primera lectura de un CSV lo materializa en Parquet (data/cache/columnar/)
+con fechas ya parseadas, numéricos coercionados y sitios/órbitas como
+categorías. Las siguientes lecturas cargan el Parquet, solo con las columnas
+pedidas. Si el CSV cambia (mtime/tamaño), el Parquet se regenera.
+
+Para los procesos web (varios workers de gunicorn, la app Dash) `attach`
+publica además cada versión como arrays .npy en data/cache/shared/ y los
+abre como memmaps de solo lectura: todos los workers comparten las mismas
+páginas del page cache en lugar de tener cada uno su copia del dataset.
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "columnar")
+SHARED_DIR = os.path.join(BASE_DIR, "data", "cache", "shared")
+
+# SPACEX_SHARED_DATA=0: cada proceso lee su propia copia desde el Parquet
+SHARED_ENABLED = os.environ.get("SPACEX_SHARED_DATA", "1") == "1"
+# Versiones anteriores del segmento que se conservan además de la actual
+KEEP_VERSIONS = 1
+
+_META_KEY = b"spacex_source"
+
+# Esquema de cada dataset procesado
+DATASETS = {
+    "launches": {
+        "csv": os.path.join(PROCESSED_DIR, "dataset_part_2.csv"),
+        "dates": ["Date"],
+        "numeric": ["FlightNumber", "PayloadMass", "Flights", "Block", "ReusedCount",
+                    "Longitude", "Latitude", "Class"],
+        "boolean": ["GridFins", "Reused", "Legs"],
+        "categorical": ["BoosterVersion", "Orbit", "LaunchSite", "Outcome", "LandingPad", "Serial"],
+    },
+    "launch_geo": {
+        "csv": os.path.join(PROCESSED_DIR, "spacex_launch_geo.csv"),
+        "dates": ["Date"],
+        "numeric": ["Flight Number", "Payload Mass (kg)", "class", "Lat", "Long"],
+        "boolean": [],
+        "categorical": ["Booster Version", "Launch Site", "Orbit", "Customer", "Landing Outcome"],
+    },
+    "clean": {
+        "csv": os.path.join(PROCESSED_DIR, "clean_dataset.csv"),
+        "dates": [],
+        "numeric": ["flight", "payload", "success"],
+        "boolean": ["gridfins", "reused", "legs"],
+        "categorical": ["orbit", "site"],
+    },
+}
+
+
+def _source_version(csv_path):
+    st = os.stat(csv_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _spec_for(csv_path):
+    csv_path = os.path.abspath(csv_path)
+    for spec in DATASETS.values():
+        if os.path.abspath(spec["csv"]) == csv_path:
+            return spec
+    return None
+
+
+def _dataset_key(csv_path):
+    csv_path = os.path.abspath(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    digest = hashlib.sha1(csv_path.encode("utf-8")).hexdigest()[:10]
+    return f"{stem}-{digest}"
+
+
+def _columnar_path(csv_path):
+    return os.path.join(CACHE_DIR, f"{_dataset_key(csv_path)}.parquet")
+
+
+def apply_types(df, spec):
+    """Fechas, numéricos, booleanos y categorías según el esquema del dataset."""
+    for col in spec.get("dates", []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in spec.get("numeric", []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in spec.get("boolean", []):
+        if col in df.columns:
+            df[col] = df[col].map({True: True, False: False, "True": True, "False": False}).astype("boolean")
+    for col in spec.get("categorical", []):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def materialize(csv_path):
+    """Ruta al Parquet tipado de `csv_path`, regenerándolo si está desactualizado."""
+    version = _source_version(csv_path)
+    path = _columnar_path(csv_path)
+    if os.path.exists(path):
+        meta = pq.read_schema(path).metadata or {}
+        if json.loads(meta.get(_META_KEY, b"{}")) == version:
+            return path
+
+    spec = _spec_for(csv_path) or {}
+    df = apply_types(pd.read_csv(csv_path), spec)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           _META_KEY: json.dumps(version).encode()})
+
+    # Escritura atómica: varios procesos pueden materializar a la vez
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def load_table(csv_path, columns=None):
+    """Lee `csv_path` a través de su copia columnar (solo las columnas pedidas)."""
+    try:
+        path = materialize(csv_path)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # CSV sin esquema conocido y con tipos mezclados: lectura directa
+        return pd.read_csv(csv_path, usecols=columns)
+    return pd.read_parquet(path, columns=columns)
+
+
+def load_dataset(name, columns=None):
+    """Dataset procesado por nombre: 'launches', 'launch_geo' o 'clean'."""
+    return load_table(DATASETS[name]["csv"], columns=columns)
+
+
+# === Segmento compartido: arrays .npy por versión, abiertos como memmap ===
+_segments = {}      # raíz del dataset -> (directorio de la versión, {columna: array})
+
+
+def _version_name(version):
+    return f"v{version['mtime_ns']}-{version['size']}"
+
+
+def _write_column(directory, stem, series):
+    """Guarda una columna como .npy; devuelve cómo reconstruirla."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == object:
+        cat = series.astype("category").cat
+        np.save(os.path.join(directory, f"{stem}.npy"), cat.codes.to_numpy())
+        return {"kind": "category", "files": [f"{stem}.npy"], "categories": cat.categories.tolist()}
+    if isinstance(dtype, pd.BooleanDtype):
+        np.save(os.path.join(directory, f"{stem}.npy"), series.to_numpy(dtype=bool, na_value=False))
+        np.save(os.path.join(directory, f"{stem}.mask.npy"), series.isna().to_numpy())
+        return {"kind": "boolean", "files": [f"{stem}.npy", f"{stem}.mask.npy"]}
+    np.save(os.path.join(directory, f"{stem}.npy"), series.to_numpy())
+    return {"kind": "array", "files": [f"{stem}.npy"]}
+
+
+def _prune(root, keep):
+    """Borra las versiones anteriores a `keep` salvo las KEEP_VERSIONS más recientes.
+
+    Los workers que aún tengan abierta una versión borrada conservan sus
+    memmaps (el fichero sigue mapeado hasta que lo sueltan); quien la
+    estuviera abriendo en ese momento reintenta con la nueva (ver `attach`).
+    """
+    versions = sorted((name for name in os.listdir(root) if name.startswith("v") and not name.endswith(".tmp")),
+                      key=lambda name: int(name[1:].split("-")[0]), reverse=True)
+    others = [name for name in versions if name != keep]
+    for name in others[KEEP_VERSIONS:]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def publish(csv_path):
+    """Publica la versión actual de `csv_path` como segmento compartido.
+
+    La versión sale del mtime/tamaño del CSV, así que todos los procesos
+    llegan al mismo directorio sin coordinarse. Devuelve ese directorio.
+    """
+    root = os.path.join(SHARED_DIR, _dataset_key(csv_path))
+    path = os.path.join(root, _version_name(_source_version(csv_path)))
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        df = pd.read_parquet(materialize(csv_path))
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp)
+        # Nombres de fichero por posición: las columnas tienen espacios y paréntesis
+        columns = {col: _write_column(tmp, f"c{i}", df[col]) for i, col in enumerate(df.columns)}
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"rows": len(df), "columns": columns}, f)
+
+        # Publicación atómica: otro worker pudo publicar la misma versión a la vez
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+        else:
+            _prune(root, os.path.basename(path))
+    return path
+
+
+def _open_segment(path):
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    arrays = {}
+    for col, info in meta["columns"].items():
+        # ndarray normal sobre el mapeo (np.memmap como subclase se propaga a los resultados)
+        data = [np.asarray(np.load(os.path.join(path, name), mmap_mode="r")) for name in info["files"]]
+        if info["kind"] == "category":
+            arrays[col] = pd.Categorical.from_codes(data[0], categories=info["categories"], validate=False)
+        elif info["kind"] == "boolean":
+            arrays[col] = pd.arrays.BooleanArray(data[0], data[1], copy=False)
+        else:
+            arrays[col] = data[0]
+    return arrays
+
+
+def attach(csv_path, columns=None):
+    """DataFrame de solo lectura sobre el segmento compartido de `csv_path`, sin copias.
+
+    Pedir las columnas aquí: seleccionarlas después (`df[[...]]`) las copia.
+    """
+    if not SHARED_ENABLED:
+        return load_table(csv_path, columns=columns)
+    for attempt in range(2):
+        try:
+            path = publish(csv_path)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return load_table(csv_path, columns=columns)
+
+        root = os.path.dirname(path)
+        opened = _segments.get(root)
+        if opened is not None and opened[0] == path:
+            break
+        try:
+            # Nueva versión: la anterior se libera cuando nadie use sus DataFrames
+            opened = _segments[root] = (path, _open_segment(path))
+            break
+        except FileNotFoundError:
+            # Otro proceso publicó una versión más nueva y podó esta mientras se abría
+            if attempt:
+                raise
+    arrays = opened[1]
+
+    names = list(arrays) if columns is None else list(columns)
+    missing = [name for name in names if name not in arrays]
+    if missing:
+        raise KeyError(f"{csv_path}: columnas inexistentes {missing}")
+    return pd.DataFrame({name: arrays[name] for name in names}, copy=False)
+
+
+def attach_dataset(name, columns=None):
+    """Como `load_dataset`, pero sobre el segmento compartido (ver `attach`)."""
+    return attach(DATASETS[name]["csv"], columns=columns)
+
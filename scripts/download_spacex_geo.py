@@ -1,18 +1,30 @@
-import requests
+import asyncio
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scripts.http_fetch import FetchError, Fetcher, download_file
 
 # URL oficial del CSV
-url = "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/IBM-DS0321EN-SkillsNetwork/datasets/spacex_launch_geo.csv"
+url = os.environ.get(
+    "SPACEX_GEO_URL",
+    "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/IBM-DS0321EN-SkillsNetwork/datasets/spacex_launch_geo.csv",
+)
 
 # Ruta donde quieres guardarlo
 save_path = os.path.join("data", "processed", "spacex_launch_geo.csv")
 
-# Descargar el archivo
-response = requests.get(url)
 
-if response.status_code == 200:
-    with open(save_path, "wb") as file:
-        file.write(response.content)
-    print(f"✅ Archivo descargado y guardado en: {save_path}")
-else:
-    print(f"❌ Error al descargar el archivo. Código de estado: {response.status_code}")
+
+async def download():
+    async with Fetcher(concurrency=1) as fetcher:
+        status = await download_file(fetcher, url, save_path)
+    fetcher.save_validators()
+    return status
+
+
+# Descargar el archivo (solo si cambió desde la última descarga)
+try:
+    print(f"✅ {save_path}: {asyncio.run(download())}")
+except FetchError as e:
+    print(f"❌ Error al descargar el archivo: {e}")
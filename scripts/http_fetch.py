@@ -0,0 +1,197 @@
+# scripts/http_fetch.py
+"""
+Motor de descarga asíncrono compartido por 1_download_raw.py y download_spacex_geo.py.
+
+- Una `aiohttp.ClientSession` por ejecución con un pool de `concurrency`
+  conexiones: como mucho esas peticiones en vuelo, y ninguna conexión se abre
+  para tirarla después (el resto espera a que quede una libre).
+- Timeouts y reintentos con backoff exponencial (429/5xx y errores de red),
+  respetando `Retry-After`.
+- Peticiones condicionales (ETag / Last-Modified): si el recurso no cambió
+  el servidor responde 304 y no se descarga ni se reescribe nada.
+- Paginación de colecciones grandes mediante el endpoint `/query` de la API
+  v4, con una ventana acotada de páginas en paralelo.
+
+Las páginas de `/query` son POST y la API no las sirve de forma condicional
+(ni ETag ni 304), así que no se cachean aquí: se descargan siempre y es el
+almacén crudo quien evita reescribirlas si el contenido no cambió
+(`RawDatasetWriter.commit`).
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import uuid
+
+import aiohttp
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VALIDATORS_PATH = os.path.join(BASE_DIR, "data", "cache", "http_validators.json")
+
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(sock_connect=5, sock_read=60)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_BACKOFF = 30
+
+
+class FetchError(Exception):
+    """Petición fallida tras agotar los reintentos (o con un estado no reintentable)."""
+
+    def __init__(self, method, url, reason):
+        super().__init__(f"{method} {url}: {reason}")
+        self.url = url
+        self.reason = reason
+
+
+class Fetcher:
+    """Cliente HTTP de una descarga. Usar como `async with Fetcher() as fetcher:`."""
+
+    def __init__(self, validators_path=None, timeout=DEFAULT_TIMEOUT, retries=4,
+                 backoff=0.5, concurrency=10):
+        self.validators_path = validators_path or VALIDATORS_PATH
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.concurrency = concurrency
+        self.session = None
+        self.validators = self._load_validators()
+
+    async def __aenter__(self):
+        # limit == limit_per_host: la concurrencia total cabe entera en el pool
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    # --- Validadores ETag / Last-Modified ---
+    def _load_validators(self):
+        try:
+            with open(self.validators_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_validators(self):
+        os.makedirs(os.path.dirname(self.validators_path), exist_ok=True)
+        tmp = f"{self.validators_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.validators, f, indent=2)
+        os.replace(tmp, self.validators_path)
+
+    def forget(self, url):
+        """Olvida los validadores de `url` (p. ej. si falta el fichero local)."""
+        self.validators.pop(url, None)
+
+    # --- Petición con reintentos ---
+    def _delay(self, attempt, retry_after=None):
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), MAX_BACKOFF)
+        return min(self.backoff * 2 ** attempt, MAX_BACKOFF)
+
+    async def _request(self, method, url, **kwargs):
+        """(estado, cabeceras, cuerpo) de la petición; reintenta 429/5xx y errores de red."""
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    body = await response.read()
+                    if response.status in RETRY_STATUSES and not last:
+                        await asyncio.sleep(self._delay(attempt, response.headers.get("Retry-After")))
+                        continue
+                    if response.status >= 400:
+                        raise FetchError(method, url, f"HTTP {response.status}")
+                    return response.status, response.headers, body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if last:
+                    raise FetchError(method, url, repr(e)) from e
+                await asyncio.sleep(self._delay(attempt))
+
+    async def get(self, url):
+        """GET condicional. Devuelve el cuerpo (bytes), o None si el recurso no cambió (304)."""
+        cached = self.validators.get(url, {})
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        status, response_headers, body = await self._request("GET", url, headers=headers)
+        if status == 304:
+            return None
+
+        validators = {}
+        if response_headers.get("ETag"):
+            validators["etag"] = response_headers["ETag"]
+        if response_headers.get("Last-Modified"):
+            validators["last_modified"] = response_headers["Last-Modified"]
+        if validators:
+            self.validators[url] = validators
+        else:
+            self.validators.pop(url, None)
+        return body
+
+    # --- Paginación vía /query ---
+    async def _query_page(self, url, query, page, limit, sort):
+        options = {"page": page, "limit": limit}
+        if sort:
+            options["sort"] = sort
+        _, _, body = await self._request("POST", url, json={"query": query, "options": options})
+        return json.loads(body)
+
+    async def iter_pages(self, url, query=None, limit=200, sort=None, workers=4):
+        """Documentos de todas las páginas, en orden, página a página."""
+        query = query or {}
+        first = await self._query_page(url, query, 1, limit, sort)
+        yield first["docs"]
+        total_pages = first.get("totalPages") or 1
+        if total_pages <= 1:
+            return
+
+        # Como mucho `workers` páginas en vuelo: memoria acotada
+        pages = iter(range(2, total_pages + 1))
+        pending = [asyncio.ensure_future(self._query_page(url, query, p, limit, sort))
+                   for p in itertools.islice(pages, workers)]
+        try:
+            while pending:
+                docs = (await pending.pop(0))["docs"]
+                nxt = next(pages, None)
+                if nxt is not None:
+                    pending.append(asyncio.ensure_future(self._query_page(url, query, nxt, limit, sort)))
+                yield docs
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def query_all(self, url, query=None, limit=200, sort=None, workers=4):
+        docs = []
+        async for page in self.iter_pages(url, query, limit, sort, workers):
+            docs.extend(page)
+        return docs
+
+
+def write_if_changed(path, content):
+    """Escribe `content` (bytes) de forma atómica solo si difiere del fichero actual."""
+    digest = hashlib.sha256(content).hexdigest()
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if hashlib.sha256(f.read()).hexdigest() == digest:
+                return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+    return True
+
+
+async def download_file(fetcher, url, save_path):
+    """Descarga condicional de un fichero. Devuelve 'sin cambios', 'actualizado' o 'idéntico'."""
+    if not os.path.exists(save_path):
+        fetcher.forget(url)
+    content = await fetcher.get(url)
+    if content is None:
+        return "sin cambios"
+    return "actualizado" if write_if_changed(save_path, content) else "idéntico"
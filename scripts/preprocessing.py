@@ -1,46 +1,220 @@
+import hashlib
+import json
 import os
+import shutil
+import threading
+import uuid
+
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
+from scripts.datastore import BASE_DIR, DATASETS, load_dataset
+
+SPLIT_CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "splits")
+# Bump when the on-disk split layout changes
+SPLIT_LAYOUT = 2
+
+NUMERIC_FEATURES = ["flight", "payload"]
+CATEGORICAL_FEATURES = ["orbit", "site"]
+BOOLEAN_FEATURES = ["gridfins", "reused", "legs"]
+FEATURES = ["flight", "payload", "orbit", "site", "gridfins", "reused", "legs"]
+TARGET = "success"
+
+
+_hashes = {}        # (path, mtime_ns, size) -> sha256
+_hashes_lock = threading.Lock()
+# Next to the splits: {path: {"mtime_ns", "size", "sha256"}}, so a new process
+# finds its split directory without reading the dataset again
+HASH_INDEX = "hashes.json"
+
+
+def _read_hash_index():
+    try:
+        with open(os.path.join(SPLIT_CACHE_DIR, HASH_INDEX), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_hash_index(index):
+    os.makedirs(SPLIT_CACHE_DIR, exist_ok=True)
+    path = os.path.join(SPLIT_CACHE_DIR, HASH_INDEX)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, path)
 
-def load_and_preprocess(test_size=0.2, random_state=42):
-    # 1. Build absolute path to dataset
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    data_path = os.path.join(base_dir, "data", "processed", "clean_dataset.csv")
 
-    # 2. Load dataset
-    df = pd.read_csv(data_path)
+def dataset_hash(csv_path=None, block_size=1 << 20):
+    """SHA-256 of the dataset CSV, re-read only when its mtime or size changes.
+
+    Known hashes live in memory and in the on-disk index, keyed by
+    (path, mtime_ns, size).
+    """
+    path = os.path.abspath(csv_path or DATASETS["clean"]["csv"])
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _hashes_lock:
+        if key in _hashes:
+            return _hashes[key]
+        entry = _read_hash_index().get(path)
+        if entry and (entry["mtime_ns"], entry["size"]) == key[1:]:
+            _hashes[key] = entry["sha256"]
+            return _hashes[key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    with _hashes_lock:
+        _hashes[key] = digest.hexdigest()
+        # Re-read: another process may have added its own datasets meanwhile
+        index = _read_hash_index()
+        index[path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": _hashes[key]}
+        _write_hash_index(index)
+    return _hashes[key]
+
+
+def split_dir(test_size=0.2, random_state=42, csv_path=None):
+    name = f"{dataset_hash(csv_path)[:16]}-ts{test_size}-rs{random_state}-l{SPLIT_LAYOUT}"
+    return os.path.join(SPLIT_CACHE_DIR, name)
+
+
+def _prune_splits(current):
+    """Remove split directories of older dataset versions or layouts.
+
+    Splits of the current dataset with another test_size/random_state are kept.
+    Processes that still map a removed split keep their memmaps until they drop them.
+    """
+    prefix = os.path.basename(current).split("-")[0]
+    for name in os.listdir(SPLIT_CACHE_DIR):
+        path = os.path.join(SPLIT_CACHE_DIR, name)
+        if name.endswith(".tmp") or not os.path.isdir(path):
+            continue
+        if not (name.startswith(f"{prefix}-") and name.endswith(f"-l{SPLIT_LAYOUT}")):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def clean_features():
+    # 1-2. Load dataset (typed columnar copy of data/processed/clean_dataset.csv)
+    df = load_dataset("clean")
 
     # 3. Imputations
     df["payload"] = df["payload"].fillna(df["payload"].median())
     df["flight"] = df["flight"].fillna(df["flight"].median()).astype(int)
-    df[["gridfins", "reused", "legs"]] = (
-        df[["gridfins", "reused", "legs"]].fillna(False).astype(bool)
+    df[BOOLEAN_FEATURES] = (
+        df[BOOLEAN_FEATURES].fillna(False).astype(bool)
     )
-    df["orbit"] = df["orbit"].fillna("Unknown").replace("", "Unknown")
-    df["site"]  = df["site"].fillna("Unknown").replace("", "Unknown")
+    df["orbit"] = df["orbit"].astype(object).fillna("Unknown").replace("", "Unknown")
+    df["site"]  = df["site"].astype(object).fillna("Unknown").replace("", "Unknown")
 
     # 4. Define features & target
-    X = df[["flight", "payload", "orbit", "site", "gridfins", "reused", "legs"]]
-    y = df["success"]   # 👈 asegúrate que tu target se llama "success"
+    X = df[FEATURES]
+    y = df[TARGET]   # 👈 asegúrate que tu target se llama "success"
+    return X, y
 
-    # 5. Preprocessor
-    numeric_features = ["flight", "payload"]
-    categorical_features = ["orbit", "site"]
-    boolean_features = ["gridfins", "reused", "legs"]
 
-    preprocessor = ColumnTransformer(
+def materialize_split(test_size=0.2, random_state=42):
+    """Write features, labels and split indices as .npy files (once per dataset hash).
+
+    Rows are stored train first, then test, so each side is a contiguous
+    slice of the memmaps: train_idx is [0, n_train) and test_idx the rest.
+    """
+    path = split_dir(test_size, random_state)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        return path
+
+    X, y = clean_features()
+    # Split indices, not frames: same rows as splitting X directly
+    train_idx, test_idx = train_test_split(
+        np.arange(len(X)), test_size=test_size, random_state=random_state, stratify=y
+    )
+
+    order = np.concatenate([train_idx, test_idx])
+
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(tmp)
+    categories = {}
+    for col in NUMERIC_FEATURES + BOOLEAN_FEATURES:
+        np.save(os.path.join(tmp, f"{col}.npy"), X[col].to_numpy()[order])
+    for col in CATEGORICAL_FEATURES:
+        # pandas' own code dtype, so Categorical.from_codes can wrap the memmap as is
+        cat = pd.Categorical(X[col])
+        np.save(os.path.join(tmp, f"{col}.npy"), cat.codes[order])
+        categories[col] = cat.categories.tolist()
+    np.save(os.path.join(tmp, "y.npy"), y.to_numpy()[order])
+    np.save(os.path.join(tmp, "train_idx.npy"), np.arange(len(train_idx)))
+    np.save(os.path.join(tmp, "test_idx.npy"), np.arange(len(train_idx), len(X)))
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"rows": len(X), "test_size": test_size, "random_state": random_state,
+                   "categories": categories}, f)
+
+    # Atomic publish: another process may have materialized the same split meanwhile
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    else:
+        _prune_splits(path)
+    return path
+
+
+def open_split(test_size=0.2, random_state=42):
+    """Read-only memmaps of the materialized split: {column: array, ..., "meta": {...}}.
+
+    Categorical columns hold pandas category codes into meta["categories"][column].
+    """
+    names = FEATURES + ["y", "train_idx", "test_idx"]
+    for attempt in range(2):
+        path = materialize_split(test_size, random_state)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            # Plain ndarrays over the mapping (np.memmap as a subclass leaks into results)
+            split = {name: np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+                     for name in names}
+            break
+        except FileNotFoundError:
+            # The dataset changed and another process pruned this split while it was opened
+            if attempt:
+                raise
+    split["meta"] = meta
+    return split
+
+
+def build_preprocessor():
+    # 5. Preprocessor
+    return ColumnTransformer(
         transformers=[
-            ("num", StandardScaler(), numeric_features),
-            ("cat", OneHotEncoder(sparse_output=False, handle_unknown="ignore"), categorical_features),
-            ("bool", "passthrough", boolean_features),
+            ("num", StandardScaler(), NUMERIC_FEATURES),
+            ("cat", OneHotEncoder(sparse_output=False, handle_unknown="ignore"), CATEGORICAL_FEATURES),
+            ("bool", "passthrough", BOOLEAN_FEATURES),
         ]
     )
 
-    # 6. Train/Test Split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state, stratify=y
-    )
 
-    return X_train, X_test, y_train, y_test, preprocessor
+def split_frame(split, rows=slice(None)):
+    """Feature frame and target over `rows` of `open_split`, without copying the memmaps.
+
+    Categorical columns come back as pandas categoricals over the stored codes.
+    """
+    categories = split["meta"]["categories"]
+    X = pd.DataFrame({
+        col: (pd.Categorical.from_codes(split[col][rows], categories=categories[col], validate=False)
+              if col in CATEGORICAL_FEATURES else split[col][rows])
+        for col in FEATURES
+    }, copy=False)
+    return X, pd.Series(split["y"][rows], name=TARGET, copy=False)
+
+
+def load_and_preprocess(test_size=0.2, random_state=42):
+    split = open_split(test_size, random_state)
+
+    # 6. Train/Test Split: contiguous slices of the stored rows (read-only views)
+    n_train = len(split["train_idx"])
+    X_train, y_train = split_frame(split, slice(None, n_train))
+    X_test, y_test = split_frame(split, slice(n_train, None))
+
+    return X_train, X_test, y_train, y_test, build_preprocessor()
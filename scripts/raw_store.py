@@ -0,0 +1,221 @@
+# scripts/raw_store.py
+"""
+Almacén columnar de los datos crudos de la API.
+
+Cada tabla se guarda como un directorio Parquet (`<tabla>.parquet/`) con un
+fichero por página descargada, así la ingesta escribe a medida que llegan las
+páginas y la memoria queda acotada al tamaño de página. Las listas anidadas de
+`launches` no se serializan a texto: `cores` y `payloads` se escriben como
+tablas hijas (`launches_cores`, `launches_payloads`) con el id del lanzamiento
+y la posición en la lista.
+
+Un recurso y sus tablas hijas se publican juntos como una versión:
+
+    data/raw/launches/CURRENT                  -> "v<ns>-<hash>"
+    data/raw/launches/v<ns>-<hash>/launches.parquet/
+    data/raw/launches/v<ns>-<hash>/launches_cores.parquet/
+    data/raw/launches/v<ns>-<hash>/_manifest.json
+
+El único paso visible para los lectores es reemplazar `CURRENT`
+(`os.replace`), así que nunca ven la tabla principal de una descarga con las
+hijas de otra. Quien lea varias tablas debe resolver la versión una vez
+(`current_version`) y pasarla a cada `read_raw`.
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
+
+MANIFEST = "_manifest.json"
+POINTER = "CURRENT"
+# Versiones anteriores que se conservan (lectores que ya resolvieron CURRENT)
+KEEP_VERSIONS = 1
+
+# Listas anidadas que se extraen a tablas hijas: recurso -> {campo: tipo}
+CHILD_TABLES = {
+    "launches": {"cores": "records", "payloads": "ids"},
+}
+
+
+def resource_of(table):
+    """Recurso que publica `table` (las tablas hijas van con su recurso padre)."""
+    for name, children in CHILD_TABLES.items():
+        if table in (f"{name}_{field}" for field in children):
+            return name
+    return table
+
+
+def current_version(name, raw_dir=None):
+    """Directorio de la versión publicada del recurso `name`, o None si no hay ninguna."""
+    root = os.path.join(raw_dir or RAW_DIR, resource_of(name))
+    try:
+        with open(os.path.join(root, POINTER), encoding="utf-8") as f:
+            return os.path.join(root, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def dataset_dir(raw_dir, name, version=None):
+    """Directorio Parquet de la tabla `name` en `version` (por defecto, la publicada)."""
+    version = version or current_version(name, raw_dir)
+    return None if version is None else os.path.join(version, f"{name}.parquet")
+
+
+def has_columnar(name, raw_dir=None, version=None):
+    path = dataset_dir(raw_dir or RAW_DIR, name, version)
+    return path is not None and os.path.isdir(path)
+
+
+def _to_table(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        # Columnas con tipos mezclados dentro de una página -> JSON
+        df = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+                df[col] = df[col].map(lambda v: None if v is None else json.dumps(v, default=str))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _explode(docs, field, kind):
+    rows = []
+    for doc in docs:
+        for i, item in enumerate(doc.get(field) or []):
+            if kind == "records":
+                rows.append({"launch_id": doc.get("id"), f"{field[:-1]}_index": i, **item})
+            else:
+                rows.append({"launch_id": doc.get("id"), f"{field[:-1]}_index": i, f"{field[:-1]}_id": item})
+    return rows
+
+
+class RawDatasetWriter:
+    """Escribe un recurso página a página; `commit()` lo publica de forma atómica.
+
+    Las páginas van a un directorio temporal junto a las versiones; `commit()`
+    lo renombra a una versión nueva y cambia `CURRENT` a ella. Si el contenido
+    (hash de los documentos) coincide con lo ya publicado, no se toca nada y el
+    mtime de los ficheros existentes se conserva.
+    """
+
+    def __init__(self, name, raw_dir=None):
+        self.name = name
+        self.raw_dir = raw_dir or RAW_DIR
+        self.children = CHILD_TABLES.get(name, {})
+        self._tag = uuid.uuid4().hex
+        self._digest = hashlib.sha256()
+        self._part_hashes = []
+        self._part = 0
+        self.rows = 0
+        self._root = os.path.join(self.raw_dir, name)
+        self._version_tmp = os.path.join(self._root, f"{self._tag}.tmp")
+        self._tmp = {t: os.path.join(self._version_tmp, f"{t}.parquet") for t in self._tables()}
+        for path in self._tmp.values():
+            os.makedirs(path)
+
+    def _tables(self):
+        return [self.name] + [f"{self.name}_{field}" for field in self.children]
+
+    def _write_part(self, table_name, records):
+        if not records:
+            return
+        df = pd.json_normalize(records)
+        if df.shape[1] == 0:
+            return
+        pq.write_table(_to_table(df), os.path.join(self._tmp[table_name], f"part-{self._part:05d}.parquet"))
+
+    def write(self, docs):
+        page = json.dumps(docs, sort_keys=True, default=str).encode("utf-8")
+        self._digest.update(page)
+        self._part_hashes.append(hashlib.sha256(page).hexdigest())
+        for field, kind in self.children.items():
+            self._write_part(f"{self.name}_{field}", _explode(docs, field, kind))
+        main = [{k: v for k, v in doc.items() if k not in self.children} for doc in docs]
+        self._write_part(self.name, main)
+        self._part += 1
+        self.rows += len(docs)
+
+    def abort(self):
+        shutil.rmtree(self._version_tmp, ignore_errors=True)
+
+    def commit(self):
+        digest = self._digest.hexdigest()
+        if read_manifest(self.name, self.raw_dir).get("sha256") == digest:
+            self.abort()
+            return False
+
+        with open(os.path.join(self._version_tmp, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump({"sha256": digest, "rows": self.rows, "parts": self._part,
+                       "part_hashes": self._part_hashes}, f)
+        version = f"v{time.time_ns()}-{digest[:12]}"
+        os.rename(self._version_tmp, os.path.join(self._root, version))
+
+        # Publicación: un único reemplazo atómico del puntero
+        pointer_tmp = os.path.join(self._root, f"{POINTER}.{self._tag}.tmp")
+        with open(pointer_tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(self._root, POINTER))
+        self._prune(version)
+        return True
+
+    def _prune(self, current):
+        versions = sorted((v for v in os.listdir(self._root) if v.startswith("v") and v != current),
+                          key=lambda v: int(v[1:].split("-")[0]), reverse=True)
+        for name in versions[KEEP_VERSIONS:]:
+            shutil.rmtree(os.path.join(self._root, name), ignore_errors=True)
+
+
+def read_manifest(name, raw_dir=None, version=None):
+    version = version or current_version(name, raw_dir)
+    if version is None:
+        return {}
+    try:
+        with open(os.path.join(version, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def read_raw(name, raw_dir=None, columns=None, version=None, parts=None):
+    """Tabla cruda como DataFrame: Parquet si existe, si no `<name>_raw.csv`.
+
+    `version` (de `current_version`) fija la versión publicada que se lee y
+    `parts` limita la lectura a esas páginas (índices de `part_hashes`).
+    """
+    raw_dir = raw_dir or RAW_DIR
+    version = version or current_version(name, raw_dir)
+    if has_columnar(name, raw_dir, version):
+        directory = dataset_dir(raw_dir, name, version)
+        if parts is None:
+            files = sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
+        else:
+            files = [f for f in (os.path.join(directory, f"part-{i:05d}.parquet") for i in sorted(parts))
+                     if os.path.exists(f)]
+        frames = [pd.read_parquet(f, columns=columns) for f in files]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+    return pd.read_csv(os.path.join(raw_dir, f"{name}_raw.csv"), usecols=columns)
+
+
+def raw_fingerprint(name, raw_dir=None):
+    """Huella del recurso crudo: hash del manifiesto Parquet o del CSV."""
+    raw_dir = raw_dir or RAW_DIR
+    version = current_version(name, raw_dir)
+    if has_columnar(name, raw_dir, version):
+        return read_manifest(name, raw_dir, version).get("sha256")
+    digest = hashlib.sha256()
+    with open(os.path.join(raw_dir, f"{name}_raw.csv"), "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
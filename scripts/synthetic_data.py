@@ -0,0 +1,440 @@
+# scripts/synthetic_data.py
+"""
+Generador de datos sintéticos de lanzamientos para pruebas de escala.
+
+Ajusta un perfil a los datasets reales de data/processed/ (frecuencias de
+sitios y órbitas, masa de carga log-normal por órbita, tasa de éxito por
+sitio y órbita, tipos de aterrizaje y booleanos según el resultado) y genera
+tantas filas como se pida, por bloques vectorizados que se escriben en disco
+a medida que se generan. Tablas disponibles:
+
+- raw:        launches/rockets/launchpads/payloads_raw.csv (cores anidados como texto)
+- launches:   esquema de dataset_part_2.csv
+- launch_geo: esquema de spacex_launch_geo.csv
+- clean:      esquema de clean_dataset.csv
+
+Cada bloque usa su propio generador derivado de (semilla, tabla, nº de bloque),
+así que la salida es reproducible e independiente del orden de escritura. Las
+tablas `raw` y `launches` describen los mismos lanzamientos: procesar la capa
+cruda con 2_generate_dataset.py da el mismo dataset_part_2.csv.
+
+    python scripts/synthetic_data.py --scale 100 --out data/synthetic/x100
+"""
+import argparse
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+
+SEED = 42
+BLOCK_ROWS = 65_536            # filas por bloque generado (fijo: no cambia la salida)
+
+TABLES = ["raw", "launches", "launch_geo", "clean"]
+_TABLE_CODES = {"launches": 1, "launch_geo": 2, "clean": 3}
+
+FALCON9_ID = "5e9d0d95eda69973a809d1ec"
+# Otros cohetes presentes en la API (no se les asignan lanzamientos)
+OTHER_ROCKETS = [("5e9d0d95eda69955f709d1eb", "Falcon 1"), ("5e9d0d95eda69974db09d1ed", "Falcon Heavy")]
+
+LAUNCH_COLS = ["FlightNumber", "Date", "BoosterVersion", "PayloadMass", "Orbit", "LaunchSite",
+               "Outcome", "Flights", "GridFins", "Reused", "Legs", "LandingPad", "Block",
+               "ReusedCount", "Serial", "Longitude", "Latitude", "Class"]
+GEO_COLS = ["Flight Number", "Date", "Launch Site", "class", "Lat", "Long"]
+CLEAN_COLS = ["flight", "payload", "orbit", "site", "gridfins", "reused", "legs", "success"]
+
+
+# === 1. Ajuste del perfil a los datos reales ===
+def _key(value):
+    # Claves JSON: los nulos se guardan como "" (None al muestrear)
+    return "" if pd.isna(value) else str(value)
+
+
+def _keys(values):
+    """Versión vectorizada de `_key` para un array o serie."""
+    s = pd.Series(values, dtype=object)
+    return s.astype(str).where(s.notna(), "").to_numpy()
+
+
+def _categorical(series):
+    counts = series.map(_key).value_counts(normalize=True, sort=False)
+    return {"values": counts.index.tolist(), "probs": counts.to_numpy().round(12).tolist()}
+
+
+def _conditional(df, by, col):
+    return {_key(k): _categorical(g[col]) for k, g in df.groupby(df[by].map(_key))}
+
+
+def _rates(df, by, target, prior=10.0):
+    """Tasa de éxito por grupo, suavizada hacia la global (beta con `prior` pseudo-observaciones)."""
+    y = pd.to_numeric(df[target], errors="coerce").fillna(0)
+    overall = float(y.mean())
+    key = df[by].map(_key).agg(" | ".join, axis=1)
+    grouped = y.groupby(key).agg(["sum", "count"])
+    rates = ((grouped["sum"] + prior * overall) / (grouped["count"] + prior)).round(6)
+    return {"overall": overall, "by": rates.to_dict()}
+
+
+def _lognormal(df, by, col):
+    mass = pd.to_numeric(df[col], errors="coerce")
+    log_mass = np.log(mass[mass > 0])
+    fit = lambda s: [float(s.mean()), float(s.std(ddof=0)) if len(s) > 1 else 0.0]
+    return {
+        "missing": float(mass.isna().mean()),
+        "min": float(mass.min()), "max": float(mass.max()),
+        "overall": fit(log_mass),
+        "by": {k: fit(g) for k, g in log_mass.groupby(df.loc[log_mass.index, by].map(_key))},
+    }
+
+
+def _bools_by_class(df, cols, target):
+    y = df[target].map(_key)
+    return {col: {k: _categorical(g) for k, g in df[col].map(_key).groupby(y)} for col in cols}
+
+
+def fit_profile(processed_dir=None):
+    """Perfil JSON-serializable con las distribuciones de los tres datasets procesados."""
+    processed_dir = processed_dir or PROCESSED_DIR
+    launches = pd.read_csv(os.path.join(processed_dir, "dataset_part_2.csv"))
+    geo = pd.read_csv(os.path.join(processed_dir, "spacex_launch_geo.csv"))
+    clean = pd.read_csv(os.path.join(processed_dir, "clean_dataset.csv"))
+
+    dates = pd.to_datetime(launches["Date"], errors="coerce")
+    landing = launches["Outcome"].astype(str).str.split(" ", n=1).str[1]
+    launches = launches.assign(LandingType=landing)
+    sites = launches.groupby("LaunchSite")[["Latitude", "Longitude"]].first()
+    geo_sites = geo.groupby("Launch Site")[["Lat", "Long"]].first()
+
+    return {
+        "launches": {
+            "rows": len(launches),
+            "date_min": str(dates.min().date()), "date_max": str(dates.max().date()),
+            "site": _categorical(launches["LaunchSite"]),
+            "site_coords": {s: [float(r.Latitude), float(r.Longitude)] for s, r in sites.iterrows()},
+            "orbit_by_site": _conditional(launches, "LaunchSite", "Orbit"),
+            "payload": _lognormal(launches, "Orbit", "PayloadMass"),
+            "success": _rates(launches, ["LaunchSite", "Orbit"], "Class"),
+            "landing_type_by_class": _conditional(launches, "Class", "LandingType"),
+            "bools_by_class": _bools_by_class(launches, ["GridFins", "Reused", "Legs"], "Class"),
+            "landing_pad": _categorical(launches["LandingPad"]),
+            "block": _categorical(launches["Block"]),
+            "reused_count": _categorical(launches["ReusedCount"]),
+            "serial": _categorical(launches["Serial"]),
+        },
+        "launch_geo": {
+            "rows": len(geo),
+            "site": _categorical(geo["Launch Site"]),
+            "site_coords": {s: [float(r.Lat), float(r.Long)] for s, r in geo_sites.iterrows()},
+            "success": _rates(geo, ["Launch Site"], "class"),
+        },
+        "clean": {
+            "rows": len(clean),
+            "site": _categorical(clean["site"]),
+            "orbit_by_site": _conditional(clean, "site", "orbit"),
+            "payload": _lognormal(clean, "orbit", "payload"),
+            "success": _rates(clean, ["site", "orbit"], "success"),
+            "bools_by_class": _bools_by_class(clean, ["gridfins", "reused", "legs"], "success"),
+            "flight_missing": float(clean["flight"].isna().mean()),
+        },
+    }
+
+
+# === 2. Muestreo vectorizado ===
+def _sample(rng, dist, n):
+    values = np.array([v if v != "" else None for v in dist["values"]], dtype=object)
+    probs = np.asarray(dist["probs"], dtype=float)
+    return values[rng.choice(len(values), size=n, p=probs / probs.sum())]
+
+
+def _sample_by(rng, conditional, keys, fallback=None):
+    """Muestra de la distribución condicionada a cada valor de `keys`."""
+    out = np.empty(len(keys), dtype=object)
+    keys = _keys(keys)
+    for key in np.unique(keys):
+        mask = keys == key
+        dist = conditional.get(key) or fallback or next(iter(conditional.values()))
+        out[mask] = _sample(rng, dist, int(mask.sum()))
+    return out
+
+
+def _payload(rng, spec, groups):
+    keys = _keys(groups)
+    mu = np.full(len(keys), spec["overall"][0])
+    sigma = np.full(len(keys), spec["overall"][1])
+    for key, (m, s) in spec["by"].items():
+        mask = keys == key
+        mu[mask], sigma[mask] = m, s
+    mass = np.clip(rng.lognormal(mu, sigma), spec["min"], spec["max"])
+    mass[rng.random(len(keys)) < spec["missing"]] = np.nan
+    return mass.round(2)
+
+
+def _success(rng, spec, *groups):
+    key = pd.Series(_keys(groups[0]), dtype=object)
+    for g in groups[1:]:
+        key = key + " | " + _keys(g)
+    p = key.map(spec["by"]).fillna(spec["overall"]).to_numpy(dtype=float)
+    return (rng.random(len(p)) < p).astype(int)
+
+
+def _to_bool(values):
+    return pd.Series(values, dtype=object).map({"True": True, "False": False}).to_numpy(dtype=object)
+
+
+def _coords(coords, site):
+    site = pd.Series(site, dtype=object)
+    lat = site.map({k: v[0] for k, v in coords.items()}).to_numpy(dtype=float)
+    lon = site.map({k: v[1] for k, v in coords.items()}).to_numpy(dtype=float)
+    return lat, lon
+
+
+def _block_rng(seed, table, block):
+    return np.random.default_rng([seed, _TABLE_CODES[table], block])
+
+
+def _dates(profile, start, n, total):
+    # Repartidas uniformemente en el rango real: la distribución por año se conserva
+    lo = pd.Timestamp(profile["date_min"]).value
+    hi = pd.Timestamp(profile["date_max"]).value
+    step = (hi - lo) / max(total - 1, 1)
+    return pd.to_datetime(lo + step * np.arange(start, start + n)).normalize()
+
+
+def launches_block(profile, start, n, total, seed=SEED):
+    """Bloque de `n` lanzamientos (esquema dataset_part_2.csv) a partir de la fila `start`."""
+    p = profile["launches"]
+    rng = _block_rng(seed, "launches", start // BLOCK_ROWS)
+    site = _sample(rng, p["site"], n)
+    orbit = _sample_by(rng, p["orbit_by_site"], site)
+    success = _success(rng, p["success"], site, orbit)
+    lat, lon = _coords(p["site_coords"], site)
+    landing_type = _sample_by(rng, p["landing_type_by_class"], success)
+    reused_count = pd.to_numeric(pd.Series(_sample(rng, p["reused_count"], n)), errors="coerce").astype(float)
+    df = pd.DataFrame({
+        "FlightNumber": np.arange(start + 1, start + n + 1),
+        "Date": _dates(p, start, n, total).date,
+        "BoosterVersion": "Falcon 9",
+        "PayloadMass": _payload(rng, p["payload"], orbit),
+        "Orbit": orbit,
+        "LaunchSite": site,
+        "Outcome": np.where(success == 1, "True ", "False ") + landing_type.astype(str),
+        # Igual que 2_generate_dataset.py: vuelos = reutilizaciones + 1
+        "Flights": reused_count.add(1).fillna(1).to_numpy(),
+        "GridFins": _to_bool(_sample_by(rng, p["bools_by_class"]["GridFins"], success)),
+        "Reused": _to_bool(_sample_by(rng, p["bools_by_class"]["Reused"], success)),
+        "Legs": _to_bool(_sample_by(rng, p["bools_by_class"]["Legs"], success)),
+        "LandingPad": _sample(rng, p["landing_pad"], n),
+        "Block": pd.to_numeric(pd.Series(_sample(rng, p["block"], n)), errors="coerce").to_numpy(),
+        "ReusedCount": reused_count.to_numpy(),
+        "Serial": _sample(rng, p["serial"], n),
+        "Longitude": lon,
+        "Latitude": lat,
+        "Class": success,
+    })
+    return df[LAUNCH_COLS]
+
+
+def geo_block(profile, start, n, total, seed=SEED):
+    p = profile["launch_geo"]
+    rng = _block_rng(seed, "launch_geo", start // BLOCK_ROWS)
+    site = _sample(rng, p["site"], n)
+    lat, lon = _coords(p["site_coords"], site)
+    return pd.DataFrame({
+        "Flight Number": np.arange(start + 1, start + n + 1),
+        "Date": _dates(profile["launches"], start, n, total).strftime("%Y-%m-%d"),
+        "Launch Site": site,
+        "class": _success(rng, p["success"], site),
+        "Lat": lat,
+        "Long": lon,
+    })[GEO_COLS]
+
+
+def clean_block(profile, start, n, total, seed=SEED):
+    p = profile["clean"]
+    rng = _block_rng(seed, "clean", start // BLOCK_ROWS)
+    site = _sample(rng, p["site"], n)
+    orbit = _sample_by(rng, p["orbit_by_site"], site)
+    success = _success(rng, p["success"], site, orbit)
+    flight = np.arange(start + 1, start + n + 1, dtype=float)
+    flight[rng.random(n) < p["flight_missing"]] = np.nan
+    return pd.DataFrame({
+        "flight": flight,
+        "payload": _payload(rng, p["payload"], orbit),
+        "orbit": orbit,
+        "site": site,
+        "gridfins": _to_bool(_sample_by(rng, p["bools_by_class"]["gridfins"], success)),
+        "reused": _to_bool(_sample_by(rng, p["bools_by_class"]["reused"], success)),
+        "legs": _to_bool(_sample_by(rng, p["bools_by_class"]["legs"], success)),
+        "success": success,
+    })[CLEAN_COLS]
+
+
+# === 3. Capa cruda de la API a partir de los lanzamientos ===
+def _ids(prefix, start, n):
+    return np.char.add(prefix, np.char.zfill(np.arange(start, start + n).astype(str), 23))
+
+
+def _literal(values, quote=False):
+    """Serie -> texto de literal Python ('x', 1.0, True o None), vectorizado."""
+    s = pd.Series(values, dtype=object)
+    text = s.astype(str)
+    if quote:
+        text = "'" + text + "'"
+    return text.where(s.notna(), "None")
+
+
+def raw_block(launches, pad_ids, start):
+    """launches_raw y payloads_raw de un bloque del esquema dataset_part_2."""
+    n = len(launches)
+    payload_ids = _ids("p", start, n)
+    landing = launches["Outcome"].str.split(" ", n=1)
+    landing_type = landing.str[1].where(landing.str[1] != "None", None)
+    cores = (
+        "[{'core': " + _literal(launches["Serial"], quote=True)
+        + ", 'flight': " + _literal(launches["Flights"].astype(int))
+        + ", 'gridfins': " + _literal(launches["GridFins"])
+        + ", 'legs': " + _literal(launches["Legs"])
+        + ", 'reused': " + _literal(launches["Reused"])
+        + ", 'landing_attempt': True"
+        + ", 'landing_success': " + landing.str[0]
+        + ", 'landing_type': " + _literal(landing_type, quote=True)
+        + ", 'landpad': " + _literal(launches["LandingPad"], quote=True)
+        + ", 'block': " + _literal(launches["Block"].astype("Int64"))
+        + ", 'reuse_count': " + _literal(launches["ReusedCount"].astype("Int64"))
+        + "}]"
+    )
+    raw_launches = pd.DataFrame({
+        "id": _ids("l", start, n),
+        "flight_number": launches["FlightNumber"].to_numpy(),
+        "date_utc": pd.to_datetime(launches["Date"]).dt.strftime("%Y-%m-%dT%H:%M:%S.000Z").to_numpy(),
+        "rocket": FALCON9_ID,
+        "launchpad": launches["LaunchSite"].map(pad_ids).to_numpy(),
+        "payloads": np.char.add(np.char.add("['", payload_ids), "']"),
+        "cores": cores.to_numpy(),
+    })
+    raw_payloads = pd.DataFrame({
+        "id": payload_ids,
+        "mass_kg": launches["PayloadMass"].to_numpy(),
+        "orbit": launches["Orbit"].to_numpy(),
+    })
+    return raw_launches, raw_payloads
+
+
+def raw_dimensions(profile):
+    """rockets y launchpads (tablas pequeñas, se escriben de una vez)."""
+    coords = profile["launches"]["site_coords"]
+    pads = pd.DataFrame({
+        "id": _ids("s", 0, len(coords)),
+        "name": list(coords),
+        "latitude": [c[0] for c in coords.values()],
+        "longitude": [c[1] for c in coords.values()],
+    })
+    rockets = pd.DataFrame([(FALCON9_ID, "Falcon 9")] + OTHER_ROCKETS, columns=["id", "name"])
+    return rockets, pads
+
+
+# === 4. Escritura por bloques ===
+class _CsvStream:
+    """CSV escrito bloque a bloque en un temporal y publicado de forma atómica."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.tmp, mode="w" if self.header else "a", header=self.header, index=False)
+        self.header = False
+
+    def commit(self):
+        os.replace(self.tmp, self.path)
+
+
+def _blocks(total):
+    for start in range(0, total, BLOCK_ROWS):
+        yield start, min(BLOCK_ROWS, total - start)
+
+
+def rows_for(profile, scale):
+    return {t: max(1, int(round(profile[t]["rows"] * scale))) for t in ("launches", "launch_geo", "clean")}
+
+
+def generate(out_dir, scale=1.0, seed=SEED, tables=None, profile=None):
+    """Escribe las tablas pedidas a `scale`× el tamaño real en `out_dir`. Devuelve sus rutas."""
+    tables = tables or TABLES
+    profile = profile or fit_profile()
+    rows = rows_for(profile, scale)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+
+    # --- Lanzamientos: el mismo bloque alimenta dataset_part_2 y la capa cruda ---
+    if "launches" in tables or "raw" in tables:
+        streams = {}
+        if "launches" in tables:
+            paths["launches"] = os.path.join(out_dir, "dataset_part_2.csv")
+            streams["launches"] = _CsvStream(paths["launches"])
+        if "raw" in tables:
+            paths["raw_dir"] = os.path.join(out_dir, "raw")
+            os.makedirs(paths["raw_dir"], exist_ok=True)
+            rockets, pads = raw_dimensions(profile)
+            rockets.to_csv(os.path.join(paths["raw_dir"], "rockets_raw.csv"), index=False)
+            pads.to_csv(os.path.join(paths["raw_dir"], "launchpads_raw.csv"), index=False)
+            pad_ids = dict(zip(pads["name"], pads["id"]))
+            for name in ("launches", "payloads"):
+                streams[f"raw_{name}"] = _CsvStream(os.path.join(paths["raw_dir"], f"{name}_raw.csv"))
+
+        for start, n in _blocks(rows["launches"]):
+            block = launches_block(profile, start, n, rows["launches"], seed)
+            if "launches" in streams:
+                streams["launches"].write(block)
+            if "raw" in tables:
+                raw_launches, raw_payloads = raw_block(block, pad_ids, start)
+                streams["raw_launches"].write(raw_launches)
+                streams["raw_payloads"].write(raw_payloads)
+        for stream in streams.values():
+            stream.commit()
+
+    # --- Tablas independientes ---
+    for table, filename, make_block in (("launch_geo", "spacex_launch_geo.csv", geo_block),
+                                        ("clean", "clean_dataset.csv", clean_block)):
+        if table not in tables:
+            continue
+        paths[table] = os.path.join(out_dir, filename)
+        stream = _CsvStream(paths[table])
+        for start, n in _blocks(rows[table]):
+            stream.write(make_block(profile, start, n, rows[table], seed))
+        stream.commit()
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos de lanzamientos a escala.")
+    parser.add_argument("--scale", type=float, default=10.0, help="Múltiplo del tamaño real de cada dataset")
+    parser.add_argument("--out", default=os.path.join(BASE_DIR, "data", "synthetic"))
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=TABLES)
+    parser.add_argument("--profile", help="Perfil JSON ya ajustado (si no, se ajusta a data/processed/)")
+    parser.add_argument("--save-profile", help="Guarda el perfil ajustado en esta ruta")
+    args = parser.parse_args()
+
+    if args.profile:
+        with open(args.profile, encoding="utf-8") as f:
+            profile = json.load(f)
+    else:
+        profile = fit_profile()
+    if args.save_profile:
+        with open(args.save_profile, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+
+    paths = generate(args.out, args.scale, args.seed, args.tables, profile)
+    rows = rows_for(profile, args.scale)
+    for table, path in paths.items():
+        print(f"✅ {table}: {path} ({rows.get(table, rows['launches']):,} filas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,102 +1,166 @@
+import os
+import threading
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash.dependencies import ClientsideFunction, Input, Output, State
 import plotly.express as px
 import dash_bootstrap_components as dbc
+from scripts.datastore import DATASETS, attach
+from spacexdash.cache import VersionedCache, dataset_version
+from spacexdash.cube import get_cube
+from spacexdash.launch_index import ALL_SITES, LaunchIndex
 
 # === 1. Load data ===
-spacex_df = pd.read_csv("data/processed/dataset_part_2.csv")
+INDEX_COLUMNS = ["LaunchSite", "PayloadMass", "Class", "BoosterVersion"]
+
+# Índice (particiones por sitio ordenadas por carga) y datos del modo
+# clientside, uno por versión del CSV: al publicarse una versión nueva los
+# workers la recogen en la siguiente petición, sin reiniciarse
+index_cache = VersionedCache("dash_launch_index")
+client_cache = VersionedCache("dash_client_payload")
+_figures_lock = threading.Lock()
+_figures_version = None
+
+# Figuras generadas recientemente (LRU acotada)
+FIGURE_CACHE_SIZE = 256
+
+# Modo clientside: los datos viajan una vez al navegador y los filtros se
+# resuelven allí (assets/spacex_clientside.js). SPACEX_DASH_CLIENTSIDE=0 vuelve
+# a los callbacks en servidor.
+CLIENTSIDE = os.environ.get("SPACEX_DASH_CLIENTSIDE", "1") == "1"
+# Por encima de estos puntos el scatter se dibuja con WebGL
+WEBGL_POINTS = 5000
+SCATTER_SIZE_MAX = 20
+
+SCATTER_LAYOUT = dict(
+    template="plotly_white",
+    title="Correlation between payload mass and launch success",
+    title_x=0.5,
+    xaxis_title="Payload mass (kg)",
+    yaxis_title="Outcome (0 = Failure, 1 = Success)",
+    legend_title_text="BoosterVersion",
+)
 
 # === 2. Create the app with a Bootstrap theme ===
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY])
 app.title = "SpaceX Dashboard"
 
 # === 3. Layout with improved header ===
-app.layout = html.Div([
-
-    # Hero section
-    html.Div([
-        html.H1("SpaceX Launch Records Dashboard",
-                style={"textAlign": "center", "color": "white",
-                       "fontWeight": "bold", "marginBottom": "0"}),
-        html.P("Interactive analysis of SpaceX launches",
-               style={"textAlign": "center", "color": "lightgray",
-                      "marginTop": "5px"})
-    ],
-    style={
-        "background": "linear-gradient(90deg, #0f2027, #203a43, #2c5364)",
-        "padding": "40px 20px",
-        "textAlign": "center",
-        "marginBottom": "30px"
-    }),
-
-    # Main content
-    dbc.Container([
-
-        # Row 1: Dropdown and Pie chart
-        dbc.Row([
-            dbc.Col([
-                html.Label("Select a launch site:"),
-                dcc.Dropdown(
-                    id='site-dropdown',
-                    options=[{'label': 'All sites', 'value': 'ALL'}] +
-                            [{'label': site, 'value': site} for site in spacex_df['LaunchSite'].unique()],
-                    value='ALL',
-                    placeholder="Select a launch site",
-                    searchable=True,
-                    style={'marginBottom': '20px'}
-                )
-            ], width=4),
-
-            dbc.Col([
-                dcc.Graph(id='success-pie-chart')
-            ], width=8)
-        ], align="center"),
-
-        html.Hr(),
-
-        # Row 2: RangeSlider and Scatter plot
-        dbc.Row([
-            dbc.Col([
-                html.Label("Payload range (kg):"),
-                dcc.RangeSlider(
-                    id='payload-slider',
-                    min=int(spacex_df['PayloadMass'].min()),
-                    max=int(spacex_df['PayloadMass'].max()),
-                    step=100,
-                    value=[int(spacex_df['PayloadMass'].min()), int(spacex_df['PayloadMass'].max())],
-                    marks={int(x): f"{int(x/1000)}k" for x in range(0, int(spacex_df['PayloadMass'].max())+1, 2000)},
-                    tooltip={"placement": "bottom", "always_visible": True}
-                )
-            ], width=12),
-        ], style={'marginBottom': 30}),
-
-        dbc.Row([
-            dbc.Col([
-                dcc.Graph(id='success-payload-scatter')
-            ], width=12)
-        ])
-
-    ], fluid=True)
-
-])
-
-# === 4. Callbacks ===
-@app.callback(
-    Output('success-pie-chart', 'figure'),
-    Input('site-dropdown', 'value')
-)
-def update_pie_chart(selected_site):
-    if selected_site == 'ALL':
-        fig = px.pie(spacex_df,
-                     names='LaunchSite',
-                     values='Class',
+def serve_layout():
+    """Layout de cada carga de página, con los sitios y el rango de la versión actual."""
+    version, launch_index, launch_cube = current_data()
+    # Modo clientside: los datos viajan en el Store con la página
+    launch_store = dcc.Store(id='launch-data', data=client_cache.get_or_build(
+        DATASETS["launches"]["csv"], version,
+        lambda: client_payload(launch_index, launch_cube)) if CLIENTSIDE else None)
+    return html.Div([
+
+        launch_store,
+
+        # Hero section
+        html.Div([
+            html.H1("SpaceX Launch Records Dashboard",
+                    style={"textAlign": "center", "color": "white",
+                           "fontWeight": "bold", "marginBottom": "0"}),
+            html.P("Interactive analysis of SpaceX launches",
+                   style={"textAlign": "center", "color": "lightgray",
+                          "marginTop": "5px"})
+        ],
+        style={
+            "background": "linear-gradient(90deg, #0f2027, #203a43, #2c5364)",
+            "padding": "40px 20px",
+            "textAlign": "center",
+            "marginBottom": "30px"
+        }),
+
+        # Main content
+        dbc.Container([
+
+            # Row 1: Dropdown and Pie chart
+            dbc.Row([
+                dbc.Col([
+                    html.Label("Select a launch site:"),
+                    dcc.Dropdown(
+                        id='site-dropdown',
+                        options=[{'label': 'All sites', 'value': 'ALL'}] +
+                                [{'label': site, 'value': site} for site in launch_index.sites],
+                        value='ALL',
+                        placeholder="Select a launch site",
+                        searchable=True,
+                        style={'marginBottom': '20px'}
+                    )
+                ], width=4),
+
+                dbc.Col([
+                    dcc.Graph(id='success-pie-chart')
+                ], width=8)
+            ], align="center"),
+
+            html.Hr(),
+
+            # Row 2: RangeSlider and Scatter plot
+            dbc.Row([
+                dbc.Col([
+                    html.Label("Payload range (kg):"),
+                    dcc.RangeSlider(
+                        id='payload-slider',
+                        min=int(launch_index.payload_min),
+                        max=int(launch_index.payload_max),
+                        step=100,
+                        value=[int(launch_index.payload_min), int(launch_index.payload_max)],
+                        marks={int(x): f"{int(x/1000)}k" for x in range(0, int(launch_index.payload_max)+1, 2000)},
+                        tooltip={"placement": "bottom", "always_visible": True},
+                        # En el navegador el arrastre no cuesta peticiones: se actualiza en vivo
+                        updatemode='drag' if CLIENTSIDE else 'mouseup'
+                    )
+                ], width=12),
+            ], style={'marginBottom': 30}),
+
+            dbc.Row([
+                dbc.Col([
+                    dcc.Graph(id='success-payload-scatter')
+                ], width=12)
+            ])
+
+        ], fluid=True)
+
+    ])
+
+
+# === 4. Figures (cached) ===
+def current_data():
+    """(versión, índice, cubo) de la versión publicada del CSV de lanzamientos."""
+    global _figures_version
+    csv_path = DATASETS["launches"]["csv"]
+    version = dataset_version(csv_path)
+    index = index_cache.get_or_build(
+        csv_path, version, lambda: LaunchIndex(attach(csv_path, columns=INDEX_COLUMNS)))
+    with _figures_lock:
+        if version != _figures_version:
+            # Las figuras de la versión anterior ya no se van a pedir: fuera de la LRU
+            pie_figure.cache_clear()
+            scatter_figure.cache_clear()
+            _figures_version = version
+    return version, index, get_cube(csv_path)
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def pie_figure(launch_cube, selected_site):
+    if selected_site == ALL_SITES:
+        success = launch_cube.query(["LaunchSite"])
+        fig = px.pie(names=success["LaunchSite"],
+                     values=success["success"],
                      title='Distribution of successful launches by site')
     else:
-        filtered_df = spacex_df[spacex_df['LaunchSite'] == selected_site]
-        fig = px.pie(filtered_df,
-                     names='Class',
+        totals = launch_cube.query(filters={"LaunchSite": selected_site}).iloc[0]
+        success, total = int(totals["success"]), int(totals["count"])
+        counts = pd.Series({0: total - success, 1: success})
+        counts = counts[counts > 0]
+        fig = px.pie(names=counts.index,
+                     values=counts.values,
                      title=f'Success rate at {selected_site}')
         fig.update_traces(textinfo='percent+label')
 
@@ -106,39 +170,125 @@ def update_pie_chart(selected_site):
     )
     return fig
 
-@app.callback(
-    Output('success-payload-scatter', 'figure'),
-    [Input('site-dropdown', 'value'),
-     Input('payload-slider', 'value')]
-)
-def update_scatter(selected_site, payload_range):
-    low, high = payload_range
-    mask = (spacex_df['PayloadMass'] >= low) & (spacex_df['PayloadMass'] <= high)
 
-    if selected_site == 'ALL':
-        filtered_df = spacex_df[mask]
-    else:
-        filtered_df = spacex_df[(spacex_df['LaunchSite'] == selected_site) & mask]
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def scatter_figure(launch_index, selected_site, lo, hi):
+    # (lo, hi) son posiciones en la partición ordenada: rangos de carga que
+    # seleccionan las mismas filas comparten figura
+    filtered_df = launch_index.rows(selected_site, lo, hi)
 
     fig = px.scatter(
         filtered_df,
         x="PayloadMass",
         y="Class",
         color="BoosterVersion",
-        title="Correlation between payload mass and launch success",
         size="PayloadMass",
+        size_max=SCATTER_SIZE_MAX,
         hover_data=['LaunchSite']
     )
 
-    fig.update_layout(
-        template="plotly_white",
-        title_x=0.5,
-        xaxis_title="Payload mass (kg)",
-        yaxis_title="Outcome (0 = Failure, 1 = Success)"
-    )
+    fig.update_layout(**SCATTER_LAYOUT)
+
+    return fig
 
+
+def empty_pie_figure():
+    """Tarta sin datos: desplegable vacío o sitio que no está en la versión actual."""
+    fig = px.pie(names=[], values=[], title='No launch site selected')
+    fig.update_layout(template="plotly_white", title_x=0.5)
     return fig
 
+
+def empty_scatter_figure():
+    return px.scatter().update_layout(**SCATTER_LAYOUT)
+
+
+def client_payload(index, cube):
+    """Datos del dcc.Store: arrays compactos por sitio y tartas ya construidas.
+
+    Cada partición va ordenada por carga (sin las cargas desconocidas, que
+    nunca entran en un rango) con el booster codificado como entero. Son
+    arrays de NumPy (Dash los serializa como listas): es la única copia de
+    los datos propia de cada worker, y solo con lo que necesita el navegador.
+    """
+    df, payload = index.df, index.payload
+    booster = pd.Categorical(df["BoosterVersion"])
+    boosters = sorted(str(b) for b in booster.categories)
+    position = {b: i for i, b in enumerate(boosters)}
+    remap = np.array([position[str(b)] for b in booster.categories] + [0], dtype=np.int32)
+    booster_codes = remap[booster.codes]            # desconocido (-1) -> 0
+    classes = df["Class"].to_numpy()
+
+    partitions = {}
+    for site in index.sites:
+        order = index.partitions[site][:index.known[site]]
+        partitions[site] = {
+            "payload": payload[order].round(1),
+            "cls": classes[order].astype(np.int8),
+            "booster": booster_codes[order],
+        }
+
+    layout = px.scatter().update_layout(**SCATTER_LAYOUT).to_plotly_json()["layout"]
+    return {
+        "all_sites": ALL_SITES,
+        "sites": list(index.sites),
+        "boosters": boosters,
+        "partitions": partitions,
+        "pies": {site: pie_figure(cube, site).to_plotly_json() for site in [ALL_SITES] + list(index.sites)},
+        "empty_pie": empty_pie_figure().to_plotly_json(),
+        "scatter_layout": layout,
+        "colorway": list(px.colors.qualitative.Plotly),
+        "size_max": SCATTER_SIZE_MAX,
+        "webgl_points": WEBGL_POINTS,
+    }
+
+
+# === 5. Callbacks ===
+def update_pie_chart(selected_site):
+    _, launch_index, launch_cube = current_data()
+    if selected_site not in launch_index.partitions:
+        # None al vaciar el desplegable
+        return empty_pie_figure()
+    return pie_figure(launch_cube, selected_site)
+
+def update_scatter(selected_site, payload_range):
+    _, launch_index, _ = current_data()
+    if selected_site not in launch_index.partitions:
+        return empty_scatter_figure()
+    low, high = payload_range
+    lo, hi = launch_index.range_bounds(selected_site, low, high)
+    return scatter_figure(launch_index, selected_site, lo, hi)
+
+if CLIENTSIDE:
+    # Un solo envío de datos por carga de página (serve_layout); el
+    # desplegable y el slider no vuelven al servidor
+    app.clientside_callback(
+        ClientsideFunction(namespace='spacex', function_name='pie'),
+        Output('success-pie-chart', 'figure'),
+        Input('site-dropdown', 'value'),
+        State('launch-data', 'data')
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='spacex', function_name='scatter'),
+        Output('success-payload-scatter', 'figure'),
+        [Input('site-dropdown', 'value'),
+         Input('payload-slider', 'value')],
+        State('launch-data', 'data')
+    )
+else:
+    app.callback(
+        Output('success-pie-chart', 'figure'),
+        Input('site-dropdown', 'value')
+    )(update_pie_chart)
+    app.callback(
+        Output('success-payload-scatter', 'figure'),
+        [Input('site-dropdown', 'value'),
+         Input('payload-slider', 'value')]
+    )(update_scatter)
+
+# Dash valida el layout al asignarlo: después de definir figuras y callbacks
+app.layout = serve_layout
+
 # === 6. Run server ===
 if __name__ == '__main__':
     app.run(debug=True, port=8050)
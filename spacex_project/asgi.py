@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spacex_project.settings')
 
 application = get_asgi_application()
+
+# Cargar el modelo de predicción al arrancar cada worker
+from spacexdash.views import model_registry  # noqa: E402
+
+model_registry.warm()
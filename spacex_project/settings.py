@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'spacexdash.telemetry.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -130,3 +131,32 @@ import os
 STATICFILES_DIRS = [
     BASE_DIR / 'core' / 'static',
 ]
+
+# collectstatic copia a staticfiles/ con el hash del contenido en el nombre
+# (logo.<hash>.png): esas URL se sirven con caché de un año
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Nombres con hash solo si collectstatic ya generó el manifiesto: sin él,
+# ManifestStaticFilesStorage lanzaría ValueError en cada {% static %} con DEBUG=False
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.storage.ManifestFallbackStorage"},
+}
+
+# whitenoise es opcional: si está instalado sirve staticfiles/ sin DEBUG (los
+# nombres con hash con caché de un año). Si no, lo sirve el servidor web
+# (nginx: /static/ -> staticfiles/) y core.views.static_asset queda de respaldo
+from importlib.util import find_spec
+
+WHITENOISE = find_spec("whitenoise") is not None
+if WHITENOISE:
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+                      'whitenoise.middleware.WhiteNoiseMiddleware')
+
+# Métricas (/metrics): con varios workers, directorio compartido de snapshots por pid
+SPACEX_METRICS_DIR = os.environ.get("SPACEX_METRICS_DIR") or None
+# Cabecera Server-Timing con las fases de cada petición
+SERVER_TIMING = os.environ.get("SPACEX_SERVER_TIMING", "1" if DEBUG else "0") == "1"
+# Vistas async (ASGI): hilos del pool para pandas, folium y plantillas por worker
+OFFLOAD_WORKERS = int(os.environ.get("SPACEX_OFFLOAD_WORKERS", "4"))
+# /api/predict/: peticiones de hasta 128 filas con el bosque compilado a NumPy (~30x en una fila)
+PREDICT_COMPILED = os.environ.get("SPACEX_PREDICT_COMPILED", "0") == "1"
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+from core.views import static_asset
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -7,3 +9,7 @@ urlpatterns = [
     path("", include("spacexdash.urls")),
  
 ]
+
+# Con DEBUG, runserver ya sirve los estáticos desde core/static; con whitenoise, su middleware
+if not settings.DEBUG and not settings.WHITENOISE:
+    urlpatterns += [re_path(r"^static/(?P<path>.*)$", static_asset)]
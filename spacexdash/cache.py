@@ -0,0 +1,122 @@
+# spacexdash/cache.py
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+
+# Registro de todas las cachés del proceso (para inspección y métricas)
+CACHES = {}
+
+
+def dataset_version(*paths):
+    """Identidad de uno o varios ficheros: (ruta, mtime_ns, tamaño).
+
+    Cambia en cuanto el fichero se reescribe, sin tener que leerlo.
+    """
+    version = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            version.append((str(path), st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            version.append((str(path), None, None))
+    return tuple(version)
+
+
+class VersionedCache:
+    """Caché en proceso: una entrada por clave, válida para una versión.
+
+    Compartida entre peticiones e hilos. Si la versión cambia, la entrada
+    se reconstruye; mientras se construye, el resto de hilos que piden la
+    misma clave esperan en lugar de repetir el trabajo.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self._pending = {}          # (clave, versión) -> Future de la construcción async en curso
+        self.hits = 0
+        self.misses = 0
+        CACHES[name] = self
+
+    def get_or_build(self, key, version, builder):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            # Otro hilo pudo haberla construido mientras esperábamos
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == version:
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+
+            value = builder()
+
+            with self._lock:
+                self._entries[key] = (version, value)
+            return value
+
+    async def aget_or_build(self, key, version, builder):
+        """Como `get_or_build` para vistas async: `builder` es una corrutina.
+
+        Las peticiones que llegan mientras otra construye la misma versión
+        esperan su resultado sin bloquear el event loop. Si la construcción
+        falla, cada una lo reintenta por su cuenta (igual que en la versión
+        síncrona).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            # Future de concurrent.futures: válido entre hilos y event loops
+            pending = self._pending.get((key, version))
+            owner = pending is None
+            if owner:
+                pending = self._pending[(key, version)] = Future()
+                self.misses += 1
+
+        if not owner:
+            try:
+                value = await asyncio.wrap_future(pending)
+            except Exception:
+                return await self.aget_or_build(key, version, builder)
+            with self._lock:
+                self.hits += 1
+            return value
+
+        try:
+            value = await builder()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[(key, version)]
+            # Una cancelación (cliente desconectado) no debe cancelar a quienes esperan
+            pending.set_exception(e if isinstance(e, Exception) else RuntimeError("construcción cancelada"))
+            raise
+        with self._lock:
+            self._entries[key] = (version, value)
+            del self._pending[(key, version)]
+        pending.set_result(value)
+        return value
+
+    def clear(self):
+        """Vacía las entradas. hits/misses son acumulados: se exportan como counters."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
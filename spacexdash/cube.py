@@ -0,0 +1,90 @@
+# spacexdash/cube.py
+import pandas as pd
+from scripts.datastore import attach
+from .cache import VersionedCache, dataset_version
+
+# Dimensiones y medidas del cubo
+DIMENSIONS = ["year", "LaunchSite", "Orbit", "Outcome", "payload_bucket"]
+MEASURES = ["count", "success", "payload_sum", "payload_count"]
+INT_DIMENSIONS = {"year", "payload_bucket"}
+
+# Valores centinela: fecha o carga desconocidas, y categorías vacías
+UNKNOWN_YEAR = -1
+UNKNOWN_BUCKET = -1
+UNKNOWN = "Unknown"
+# Ancho de los tramos de carga (payload_bucket = 3 → 3000-3999 kg)
+PAYLOAD_BUCKET_KG = 1000
+
+CUBE_COLUMNS = ["Date", "LaunchSite", "Orbit", "Outcome", "PayloadMass", "Class"]
+
+# Un cubo por CSV y versión del fichero
+cube_cache = VersionedCache("launch_cube")
+
+
+class LaunchCube:
+    """Lanzamientos preagregados por año × sitio × órbita × resultado × tramo de carga.
+
+    Cada celda guarda nº de lanzamientos, éxitos, suma de carga y nº de cargas
+    conocidas. Cualquier corte (`filters`) y agregación (`group_by`) se
+    resuelve sumando celdas: el coste depende del nº de celdas, no de filas.
+    """
+
+    def __init__(self, df):
+        payload = pd.to_numeric(df["PayloadMass"], errors="coerce")
+        cells = pd.DataFrame({
+            "year": pd.to_datetime(df["Date"], errors="coerce").dt.year.fillna(UNKNOWN_YEAR).astype(int),
+            "LaunchSite": df["LaunchSite"].astype(object).fillna(UNKNOWN),
+            "Orbit": df["Orbit"].astype(object).fillna(UNKNOWN),
+            "Outcome": df["Outcome"].astype(object).fillna(UNKNOWN),
+            "payload_bucket": (payload // PAYLOAD_BUCKET_KG).fillna(UNKNOWN_BUCKET).astype(int),
+            "success": pd.to_numeric(df["Class"], errors="coerce").eq(1).astype(int),
+            "payload": payload,
+        })
+        self.rows = len(cells)
+        self.cells = (
+            cells.groupby(DIMENSIONS, sort=True)
+                 .agg(count=("success", "size"), success=("success", "sum"),
+                      payload_sum=("payload", "sum"), payload_count=("payload", "count"))
+                 .reset_index()
+        )
+
+    def values(self, dimension):
+        """Valores distintos de una dimensión, ordenados."""
+        return sorted(self.cells[dimension].unique().tolist())
+
+    def query(self, group_by=(), filters=None):
+        """Medidas sumadas de las celdas que cumplen `filters`, agrupadas por `group_by`.
+
+        `filters` es {dimensión: valor o lista de valores}. Sin `group_by`
+        devuelve una sola fila con los totales.
+        """
+        group_by, filters = list(group_by), filters or {}
+        unknown = (set(group_by) | set(filters)) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Dimensiones desconocidas: {sorted(unknown)}")
+
+        cells = self.cells
+        for dimension, wanted in filters.items():
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            cells = cells[cells[dimension].isin(wanted)]
+
+        if not group_by:
+            return pd.DataFrame([cells[MEASURES].sum()]).astype({"count": int, "success": int,
+                                                                  "payload_count": int})
+        return cells.groupby(group_by, sort=True)[MEASURES].sum().reset_index()
+
+
+def with_rates(result):
+    """Añade success_rate (%) y payload_mean (kg) a un resultado de `query`."""
+    result = result.copy()
+    result["success_rate"] = (result["success"] / result["count"] * 100).round(2)
+    result["payload_mean"] = (result["payload_sum"] / result["payload_count"].where(result["payload_count"] > 0)).round(1)
+    return result
+
+
+def get_cube(csv_path: str):
+    """Cubo de `csv_path`, reconstruido solo cuando cambia el fichero."""
+    return cube_cache.get_or_build(
+        csv_path, dataset_version(csv_path),
+        lambda: LaunchCube(attach(csv_path, columns=CUBE_COLUMNS)),
+    )
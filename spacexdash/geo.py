@@ -0,0 +1,101 @@
+# spacexdash/geo.py
+import os
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371
+# Hasta este nº de elementos la matriz completa sitios×elementos es más barata que un BallTree
+BRUTE_FORCE_MAX = 4096
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Catálogo local de referencia: columnas name, kind (city, coastline, railway, highway...), lat, lon
+REFERENCE_CSV = os.path.join(BASE_DIR, "data", "reference", "reference_features.csv")
+
+
+# --- Función Haversine para calcular distancias ---
+def haversine_matrix(lat1, lon1, lat2, lon2):
+    """Distancias (km) entre cada punto del conjunto 1 y cada punto del 2: matriz n×m."""
+    phi1 = np.radians(np.asarray(lat1, dtype=float))[:, None]
+    phi2 = np.radians(np.asarray(lat2, dtype=float))[None, :]
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.asarray(lon2, dtype=float))[None, :] - np.radians(np.asarray(lon1, dtype=float))[:, None]
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def load_reference_catalog(path=REFERENCE_CSV):
+    df = pd.read_csv(path)
+    missing = {"name", "kind", "lat", "lon"} - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: faltan columnas {sorted(missing)}")
+    return df.dropna(subset=["lat", "lon"]).reset_index(drop=True)
+
+
+class FeatureIndex:
+    """Vecinos más cercanos y consultas por radio (distancia haversine) sobre un conjunto de puntos.
+
+    Con pocos elementos calcula la matriz completa con `haversine_matrix`;
+    a partir de BRUTE_FORCE_MAX usa un BallTree con métrica haversine.
+    """
+
+    def __init__(self, features, brute_force_max=BRUTE_FORCE_MAX):
+        self.features = features.reset_index(drop=True)
+        self.lat = self.features["lat"].to_numpy(dtype=float)
+        self.lon = self.features["lon"].to_numpy(dtype=float)
+        self.tree = None
+        if len(self.features) > brute_force_max:
+            from sklearn.neighbors import BallTree
+
+            self.tree = BallTree(np.radians(np.column_stack([self.lat, self.lon])), metric="haversine")
+
+    def nearest(self, lat, lon, k=1):
+        """k vecinos más cercanos de cada punto: (distancias km, índices), ambos n×k."""
+        k = min(k, len(self.features))
+        lat, lon = np.atleast_1d(lat).astype(float), np.atleast_1d(lon).astype(float)
+        if self.tree is not None:
+            dist, idx = self.tree.query(np.radians(np.column_stack([lat, lon])), k=k)
+            return dist * EARTH_RADIUS_KM, idx
+
+        dist = haversine_matrix(lat, lon, self.lat, self.lon)
+        idx = np.argsort(dist, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(dist, idx, axis=1), idx
+
+    def within(self, lat, lon, radius_km):
+        """Elementos a menos de `radius_km` de cada punto: (distancias km, índices).
+
+        Una lista por punto, ordenada por distancia; cada punto puede tener
+        un número distinto de elementos.
+        """
+        lat, lon = np.atleast_1d(lat).astype(float), np.atleast_1d(lon).astype(float)
+        if self.tree is not None:
+            idx, dist = self.tree.query_radius(np.radians(np.column_stack([lat, lon])),
+                                               r=radius_km / EARTH_RADIUS_KM,
+                                               return_distance=True, sort_results=True)
+            return [d * EARTH_RADIUS_KM for d in dist], list(idx)
+
+        dists, idxs = [], []
+        for row in haversine_matrix(lat, lon, self.lat, self.lon):
+            idx = np.flatnonzero(row <= radius_km)
+            idx = idx[np.argsort(row[idx], kind="stable")]
+            dists.append(row[idx])
+            idxs.append(idx)
+        return dists, idxs
+
+
+def build_indexes(catalog):
+    """Un índice por tipo de elemento del catálogo."""
+    return {kind: FeatureIndex(group) for kind, group in catalog.groupby("kind")}
+
+
+def nearest_features(sites, indexes, k=4):
+    """Tabla sitio → k elementos más cercanos de cada tipo, ordenada por distancia."""
+    rows = []
+    for kind, index in indexes.items():
+        dist, idx = index.nearest(sites["Lat"].to_numpy(), sites["Long"].to_numpy(), k=k)
+        names = index.features["name"].to_numpy()
+        for site, site_dist, site_idx in zip(sites["Launch Site"], dist, idx):
+            for d, i in zip(site_dist, site_idx):
+                rows.append({"site": site, "kind": kind, "name": names[i],
+                             "distance_km": round(float(d), 1)})
+    return rows
@@ -0,0 +1,195 @@
+# spacexdash/http_cache.py
+"""
+GET condicional y compresión para páginas que solo dependen de ficheros.
+
+`@versioned_page(version_func)` deriva ETag y Last-Modified de la versión de
+los ficheros (`dataset_version`): si el navegador ya tiene esa versión se
+responde 304 sin ejecutar la vista. Si no, el cuerpo se renderiza y se
+comprime (gzip y, si está instalado, brotli) una sola vez por versión; el
+resto de peticiones sirven los bytes ya comprimidos.
+"""
+import glob
+import gzip
+import hashlib
+import inspect
+import os
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .cache import VersionedCache, dataset_version
+from .offload import offload
+from .telemetry import span
+
+try:
+    import brotli
+except ImportError:     # brotli es opcional: sin él solo gzip
+    brotli = None
+
+# Cuerpos ya renderizados y comprimidos, por vista y versión
+page_cache = VersionedCache("compressed_pages")
+
+# Por debajo de este tamaño comprimir no compensa
+MIN_COMPRESS_BYTES = 1024
+# Páginas con datos: el navegador guarda la copia pero revalida siempre (304 si no cambió)
+REVALIDATE = "no-cache"
+
+# Todas las páginas extienden la base e incluyen la cabecera
+BASE_TEMPLATES = ("core/base.html", "core/header.html")
+
+# Código que genera las páginas: un despliegue nuevo cambia los ETag aunque
+# los datos sean los mismos (se fija al arrancar el proceso)
+_APPS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODE_VERSION = dataset_version(*sorted(glob.glob(os.path.join(_APPS_DIR, "spacexdash", "*.py"))
+                                       + glob.glob(os.path.join(_APPS_DIR, "core", "*.py"))))
+
+
+@lru_cache(maxsize=None)
+def template_files(*names):
+    """Ficheros de los que depende el HTML de unas plantillas.
+
+    Incluye la base, la cabecera y el manifest de estáticos (las URL con hash
+    de `{% static %}` cambian al hacer collectstatic).
+    """
+    paths = [get_template(name).origin.name for name in (*names, *BASE_TEMPLATES)]
+    paths.append(os.path.join(settings.STATIC_ROOT, "staticfiles.json"))
+    return tuple(paths)
+
+
+def version_etag(version):
+    # Débil: las variantes gzip/br/identity son la misma representación
+    return 'W/"%s"' % hashlib.sha1(repr((CODE_VERSION, version)).encode()).hexdigest()[:20]
+
+
+def version_last_modified(version):
+    mtimes = [mtime_ns for _, mtime_ns, _ in version if mtime_ns is not None]
+    return max(mtimes) // 10**9 if mtimes else None
+
+
+def encode_variants(content):
+    variants = {"identity": content}
+    if len(content) >= MIN_COMPRESS_BYTES:
+        variants["gzip"] = gzip.compress(content, compresslevel=6, mtime=0)
+        if brotli is not None:
+            variants["br"] = brotli.compress(content, quality=5)
+    return variants
+
+
+def accepted_encoding(request, variants):
+    """Mejor codificación disponible según Accept-Encoding (br > gzip > identity)."""
+    accepted = {}
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        if encoding in variants and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+class _Uncacheable(Exception):
+    # La vista no devolvió un 200: se sirve tal cual y no se guarda
+    def __init__(self, response):
+        self.response = response
+
+
+def _validators(etag, last_modified, cache_control):
+    response = HttpResponse()
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = cache_control
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def _conditional(request, version_func, cache_control):
+    """(version, cabeceras de validación, respuesta 304/412 o None)."""
+    version = version_func()
+    etag, last_modified = version_etag(version), version_last_modified(version)
+    headers = _validators(etag, last_modified, cache_control)
+    # 304 (o 412) si las cabeceras condicionales coinciden; si no, devuelve `headers`
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified,
+                                           response=headers)
+    return version, headers, (None if conditional is headers else conditional)
+
+
+def _encoded_response(request, headers, content_type, variants):
+    encoding = accepted_encoding(request, variants)
+    response = HttpResponse(variants[encoding], content_type=content_type)
+    for header in ("ETag", "Last-Modified", "Cache-Control", "Vary"):
+        if header in headers:
+            response[header] = headers[header]
+    if encoding != "identity":
+        response["Content-Encoding"] = encoding
+    return response
+
+
+def versioned_page(version_func, cache_control=REVALIDATE):
+    """Decorador de vistas GET cuyo HTML solo depende de `version_func()`.
+
+    Admite vistas async: la vista se espera y la compresión va al pool de
+    `offload`, sin bloquear el event loop.
+    """
+    def decorator(view):
+        key = f"{view.__module__}.{view.__qualname__}"
+
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view(request, *args, **kwargs)
+
+                # Unos stat() de ficheros: no compensa sacarlos del loop
+                version, headers, conditional = _conditional(request, version_func, cache_control)
+                if conditional is not None:
+                    return conditional
+
+                async def build():
+                    response = await view(request, *args, **kwargs)
+                    if response.status_code != 200 or response.streaming:
+                        raise _Uncacheable(response)
+                    return response["Content-Type"], await offload("compress", encode_variants, response.content)
+
+                try:
+                    content_type, variants = await page_cache.aget_or_build(
+                        (key, args, tuple(sorted(kwargs.items()))), version, build)
+                except _Uncacheable as e:
+                    return e.response
+                return _encoded_response(request, headers, content_type, variants)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            version, headers, conditional = _conditional(request, version_func, cache_control)
+            if conditional is not None:
+                return conditional
+
+            def build():
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    raise _Uncacheable(response)
+                with span("compress"):
+                    return response["Content-Type"], encode_variants(response.content)
+
+            try:
+                content_type, variants = page_cache.get_or_build((key, args, tuple(sorted(kwargs.items()))),
+                                                                 version, build)
+            except _Uncacheable as e:
+                return e.response
+            return _encoded_response(request, headers, content_type, variants)
+        return wrapper
+    return decorator
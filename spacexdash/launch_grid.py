@@ -0,0 +1,148 @@
+# spacexdash/launch_grid.py
+import numpy as np
+
+# Niveles de zoom con clusters precalculados (los de Leaflet: 0 = mundo entero)
+MAX_ZOOM = 18
+# Celdas por tesela de 256 px en cada eje: celdas de 64 px en pantalla
+CELLS_PER_TILE = 4
+# Latitud máxima representable en Web Mercator
+MAX_LAT = 85.05112878
+
+
+def mercator(lat, lon):
+    """Coordenadas Web Mercator normalizadas a [0, 1) (x hacia el este, y hacia el sur)."""
+    lat = np.clip(np.asarray(lat, dtype=float), -MAX_LAT, MAX_LAT)
+    x = (np.asarray(lon, dtype=float) + 180.0) / 360.0
+    sin = np.sin(np.radians(lat))
+    y = 0.5 - np.log((1 + sin) / (1 - sin)) / (4 * np.pi)
+    return np.clip(x, 0.0, np.nextafter(1.0, 0)), np.clip(y, 0.0, np.nextafter(1.0, 0))
+
+
+def normalize_bbox(west, south, east, north):
+    """Bbox de Leaflet a longitudes en [-180, 180) (las copias del mapa dan p. ej. east=200)."""
+    if not all(np.isfinite([west, south, east, north])) or south > north:
+        raise ValueError("bbox inválido")
+    if east - west >= 360:
+        return -180.0, south, 180.0, north
+    wrap = lambda lon: (lon + 180.0) % 360.0 - 180.0
+    return wrap(west), south, wrap(east), north
+
+
+def normalize_zoom(value):
+    """Zoom de Leaflet (puede ser fraccionario) al nivel entero de la rejilla, en [0, MAX_ZOOM]."""
+    try:
+        zoom = float(value)
+    except (TypeError, ValueError):
+        zoom = np.nan
+    if not np.isfinite(zoom):
+        raise ValueError(f"zoom inválido: {value!r}")
+    return int(min(max(np.floor(zoom), 0), MAX_ZOOM))
+
+
+def _spread_bits(v):
+    # Intercala ceros entre los bits (hasta 32 bits de entrada)
+    v = v.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def morton(cx, cy):
+    """Clave Z-order de una celda: la celda padre (zoom - 1) es `clave >> 2`."""
+    return _spread_bits(np.asarray(cx)) | (_spread_bits(np.asarray(cy)) << np.uint64(1))
+
+
+class LaunchGrid:
+    """Quadtree implícito de lanzamientos sobre una rejilla Web Mercator.
+
+    Se construye una vez por versión del CSV: los lanzamientos se ordenan por
+    clave Z-order de su celda en el zoom máximo y cada zoom inferior se obtiene
+    agregando los clusters del siguiente (`clave >> 2`), con sus recuentos de
+    éxitos y fallos. Un bbox se resuelve con dos búsquedas binarias sobre las
+    claves por franja de columnas y un filtro de los clusters de ese tramo.
+    """
+
+    def __init__(self, df):
+        df = df.dropna(subset=["Lat", "Long"])
+        lat = df["Lat"].to_numpy(dtype=float)
+        lon = df["Long"].to_numpy(dtype=float)
+        site_codes, self.sites = df["Launch Site"].astype(str).factorize()
+        self.total = len(df)
+
+        cells = (1 << MAX_ZOOM) * CELLS_PER_TILE
+        x, y = mercator(lat, lon)
+        cx, cy = (x * cells).astype(np.int64), (y * cells).astype(np.int64)
+        order = np.argsort(morton(cx, cy), kind="stable")
+        points = {
+            "key": morton(cx, cy)[order], "cx": cx[order], "cy": cy[order],
+            "lat": lat[order], "lon": lon[order],
+            "count": np.ones(len(order), dtype=np.int64),
+            "success": (df["class"] == 1).to_numpy()[order].astype(np.int64),
+            "site_min": site_codes[order], "site_max": site_codes[order],
+        }
+
+        # Del zoom máximo al 0: cada nivel agrupa los clusters del anterior
+        self.levels = [None] * (MAX_ZOOM + 1)
+        level = self._aggregate(points)
+        for zoom in range(MAX_ZOOM, -1, -1):
+            self.levels[zoom] = level
+            if zoom:
+                level = self._aggregate({**level, "key": level["key"] >> np.uint64(2),
+                                         "cx": level["cx"] >> 1, "cy": level["cy"] >> 1})
+
+    @staticmethod
+    def _aggregate(items):
+        """Reduce los tramos con la misma clave (ya ordenada) a un cluster cada uno."""
+        key = items["key"]
+        if len(key) == 0:
+            return items
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(key)) + 1])
+        return {
+            "key": key[starts],
+            "cx": items["cx"][starts],
+            "cy": items["cy"][starts],
+            # Sumas: el centroide es lat / count
+            "lat": np.add.reduceat(items["lat"], starts),
+            "lon": np.add.reduceat(items["lon"], starts),
+            "count": np.add.reduceat(items["count"], starts),
+            "success": np.add.reduceat(items["success"], starts),
+            "site_min": np.minimum.reduceat(items["site_min"], starts),
+            "site_max": np.maximum.reduceat(items["site_max"], starts),
+        }
+
+    @staticmethod
+    def _cell_ranges(west, south, east, north, cells):
+        """Rangos de columnas y filas del bbox; dos franjas si cruza el antimeridiano."""
+        (x_west, x_east), (y_north, y_south) = mercator([north, south], [west, east])
+        col_west, col_east = int(x_west * cells), int(x_east * cells)
+        rows = int(y_north * cells), int(y_south * cells)
+        if west <= east:
+            return [((col_west, col_east), rows)]
+        return [((col_west, cells - 1), rows), ((0, col_east), rows)]
+
+    def query(self, west, south, east, north, zoom):
+        """Clusters visibles en el bbox (grados) al nivel de zoom dado."""
+        zoom = normalize_zoom(zoom)
+        level = self.levels[zoom]
+        cells = (1 << zoom) * CELLS_PER_TILE
+
+        clusters = []
+        for (first_col, last_col), (first_row, last_row) in self._cell_ranges(west, south, east, north, cells):
+            # Todas las celdas del rectángulo están entre las claves de sus esquinas
+            lo = int(np.searchsorted(level["key"], morton(first_col, first_row), side="left"))
+            hi = int(np.searchsorted(level["key"], morton(last_col, last_row), side="right"))
+            cx, cy = level["cx"][lo:hi], level["cy"][lo:hi]
+            inside = (cx >= first_col) & (cx <= last_col) & (cy >= first_row) & (cy <= last_row)
+            for i in lo + np.flatnonzero(inside):
+                count, success = int(level["count"][i]), int(level["success"][i])
+                site = int(level["site_min"][i])
+                clusters.append({
+                    "lat": round(float(level["lat"][i]) / count, 6),
+                    "lon": round(float(level["lon"][i]) / count, 6),
+                    "count": count,
+                    "success": success,
+                    "failure": count - success,
+                    "site": self.sites[site] if site == level["site_max"][i] else None,
+                })
+        return clusters
@@ -0,0 +1,60 @@
+# spacexdash/launch_index.py
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+ALL_SITES = "ALL"
+
+
+class LaunchIndex:
+    """Posiciones de cada sitio ordenadas por PayloadMass, calculadas una vez.
+
+    Solo guarda permutaciones (argsort) sobre las columnas del DataFrame
+    recibido, sin copiarlo: con `attach` siguen siendo los memmaps
+    compartidos entre workers. Un rango de carga se resuelve con dos
+    búsquedas binarias sobre la permutación. Los agregados de las tartas
+    salen del cubo (`spacexdash.cube`).
+    """
+
+    def __init__(self, df):
+        self.df = df
+        # Ya numérica en el datastore (sin copia); to_numeric solo convierte si no lo es
+        self.payload = pd.to_numeric(df["PayloadMass"], errors="coerce").to_numpy(dtype=float)
+        self.sites = list(df["LaunchSite"].dropna().unique())
+
+        # Permutación global + una por sitio; los NaN quedan al final y nunca entran en un rango
+        order = np.argsort(self.payload, kind="stable").astype(np.int32 if len(df) < 2**31 else np.int64)
+        codes = pd.Categorical(df["LaunchSite"], categories=self.sites).codes
+        missing = np.isnan(self.payload)
+        by_site = order[np.argsort(codes[order], kind="stable")]
+        sizes = np.bincount(codes[codes >= 0], minlength=len(self.sites))
+        missing_by_site = np.bincount(codes[(codes >= 0) & missing], minlength=len(self.sites))
+
+        self.partitions = {ALL_SITES: order}
+        # Filas con carga conocida al principio de cada permutación
+        self.known = {ALL_SITES: len(order) - int(missing.sum())}
+        start = int((codes < 0).sum())        # filas sin sitio: primeras tras ordenar por código
+        for site, size, n_missing in zip(self.sites, sizes, missing_by_site):
+            self.partitions[site] = by_site[start:start + size]
+            self.known[site] = int(size - n_missing)
+            start += size
+
+        known = self.known[ALL_SITES]
+        self.payload_min = float(self.payload[order[0]]) if known else 0.0
+        self.payload_max = float(self.payload[order[known - 1]]) if known else 0.0
+
+    def range_bounds(self, site, low, high):
+        """Posiciones [lo, hi) de la partición con low <= PayloadMass <= high."""
+        order, payload = self.partitions[site], self.payload
+        positions = range(self.known[site])
+        lo = bisect_left(positions, low, key=lambda i: payload[order[i]])
+        hi = bisect_right(positions, high, key=lambda i: payload[order[i]])
+        return lo, max(lo, hi)
+
+    def rows(self, site, lo, hi):
+        """Filas [lo, hi) de la partición de `site`, en orden de carga (solo se copian esas)."""
+        return self.df.iloc[self.partitions[site][lo:hi]].reset_index(drop=True)
+
+    def payload_range(self, site, low, high):
+        return self.rows(site, *self.range_bounds(site, low, high))
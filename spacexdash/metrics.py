@@ -1,50 +1,65 @@
 # spacexdash/metrics.py
-import pandas as pd
+import json
+from .cache import VersionedCache, dataset_version
+from .cube import UNKNOWN_YEAR, get_cube
+from .telemetry import span
 
-def load_metrics(csv_path: str):
-    df = pd.read_csv(csv_path)
-
-    # Convertir fecha y extraer año
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df["year"] = df["Date"].dt.year
+# Contexto ya serializado a JSON, por CSV y versión del fichero
+metrics_cache = VersionedCache("metrics")
 
-    # Definir éxito (Class: 1 = éxito, 0 = fallo)
-    df["is_success"] = df["Class"].astype(bool)
+def load_metrics(csv_path: str):
+    # Todas las series salen del cubo preagregado (una pasada por las filas por versión)
+    with span("cube"):
+        cube = get_cube(csv_path)
 
-    # Renombrar masa para mantener compatibilidad
-    df["payload_total_mass_kg"] = pd.to_numeric(df["PayloadMass"], errors="coerce")
+    with span("aggregate"):
+        by_year = cube.query(["year"])
+        by_year = by_year[by_year["year"] != UNKNOWN_YEAR]
 
-    # 1) lanzamientos/año
-    launches_per_year = df.groupby("year")["FlightNumber"].count().sort_index()
+        # 1) lanzamientos/año
+        launches_per_year = by_year["count"]
 
-    # 2) éxito/año (%)
-    success_rate = (df.groupby("year")["is_success"].mean() * 100).round(2).sort_index()
+        # 2) éxito/año (%) (Class: 1 = éxito, 0 = fallo)
+        success_rate = (by_year["success"] / by_year["count"] * 100).round(2)
 
-    # 3) masa total por año
-    mass_per_year = (
-        df.groupby("year")["payload_total_mass_kg"]
-          .sum(min_count=1).fillna(0).sort_index()
-    )
+        # 3) masa total por año
+        mass_per_year = by_year["payload_sum"]
 
-    # 4) top sitios de lanzamiento
-    top_sites = df["LaunchSite"].fillna("Unknown").value_counts().head(10)
+        # 4) top sitios de lanzamiento
+        top_sites = top_values(cube, "LaunchSite")
 
-    # 5) top resultados Outcome
-    top_outcomes = df["Outcome"].fillna("Unknown").value_counts().head(10)
+        # 5) top resultados Outcome
+        top_outcomes = top_values(cube, "Outcome")
 
     return {
-        "launches_year_labels": launches_per_year.index.dropna().astype(int).tolist(),
+        "launches_year_labels": by_year["year"].astype(int).tolist(),
         "launches_year_values": launches_per_year.astype(int).tolist(),
 
-        "success_year_labels": success_rate.index.dropna().astype(int).tolist(),
+        "success_year_labels": by_year["year"].astype(int).tolist(),
         "success_year_values": success_rate.astype(float).tolist(),
 
-        "mass_year_labels": mass_per_year.index.dropna().astype(int).tolist(),
+        "mass_year_labels": by_year["year"].astype(int).tolist(),
         "mass_year_values": mass_per_year.astype(float).tolist(),
 
-        "pads_labels": top_sites.index.astype(str).tolist(),
-        "pads_values": top_sites.astype(int).tolist(),
+        "pads_labels": top_sites["LaunchSite"].astype(str).tolist(),
+        "pads_values": top_sites["count"].astype(int).tolist(),
 
-        "outcome_labels": top_outcomes.index.astype(str).tolist(),
-        "outcome_values": top_outcomes.astype(int).tolist(),
+        "outcome_labels": top_outcomes["Outcome"].astype(str).tolist(),
+        "outcome_values": top_outcomes["count"].astype(int).tolist(),
     }
+
+
+def top_values(cube, dimension, n=10):
+    """Los `n` valores de `dimension` con más lanzamientos."""
+    counts = cube.query([dimension])
+    return counts.sort_values("count", ascending=False, kind="stable").head(n)
+
+
+def get_metrics_context(csv_path: str):
+    """Contexto del dashboard (valores ya en JSON), cacheado por versión del CSV."""
+    def build():
+        data = load_metrics(csv_path)
+        with span("serialize"):
+            return {k: json.dumps(v) for k, v in data.items()}
+
+    return metrics_cache.get_or_build(csv_path, dataset_version(csv_path), build)
@@ -0,0 +1,201 @@
+# spacexdash/model_registry.py
+import logging
+import threading
+import time
+
+import joblib
+import pandas as pd
+
+from .cache import dataset_version
+
+logger = logging.getLogger(__name__)
+
+# Esquema de entrada del modelo (mismo orden que en el entrenamiento)
+FEATURES = ["flight", "payload", "orbit", "site", "gridfins", "reused", "legs"]
+BOOL_FEATURES = ["gridfins", "reused", "legs"]
+
+# Booleanos aceptados en el JSON (también como texto: "true", "0"...)
+_BOOL_VALUES = {"true": True, "1": True, "false": False, "0": False}
+# Cuántas instancias con error se citan por campo
+MAX_REPORTED = 10
+
+
+def load_model(path, compiled=False):
+    """joblib del pipeline sklearn.
+
+    Con `compiled`, las peticiones pequeñas se resuelven con el bosque
+    compilado a NumPy (pipeline/compiled_forest.py) y los lotes grandes
+    siguen en sklearn, que es más rápido a partir de unos cientos de filas.
+    """
+    model = joblib.load(path)
+    if compiled:
+        from pipeline.compiled_forest import GatedForest
+        return GatedForest(model)
+    return model
+
+
+class ModelRegistry:
+    """Modelo sklearn cargado una vez por worker y recargado en caliente.
+
+    Cada `check_interval` segundos se mira el mtime/tamaño del joblib; si
+    cambió, se carga el nuevo modelo y se sustituye la referencia de forma
+    atómica. Las peticiones en curso siguen usando el modelo que obtuvieron.
+    """
+
+    def __init__(self, path, check_interval=2.0, compiled=False):
+        self.path = path
+        self.compiled = compiled
+        self.check_interval = check_interval
+        self._current = None          # (modelo, versión)
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+
+    def warm(self):
+        """Carga el modelo por adelantado (al arrancar el worker)."""
+        try:
+            self.get()
+        except FileNotFoundError:
+            logger.warning("Modelo no encontrado en %s; se cargará al primer uso", self.path)
+
+    def get(self):
+        now = time.monotonic()
+        current = self._current
+        if current is not None and now - self._last_check < self.check_interval:
+            return current
+
+        with self._reload_lock:
+            self._last_check = now
+            version = dataset_version(self.path)
+            current = self._current
+            if current is not None and current[1] == version:
+                return current
+            if version[0][1] is None:
+                if current is not None:
+                    return current      # el fichero desapareció: seguimos con el anterior
+                raise FileNotFoundError(self.path)
+            try:
+                model = load_model(self.path, self.compiled)
+            except Exception:
+                if current is None:
+                    raise
+                # Fichero a medio escribir: se reintenta en la próxima comprobación
+                logger.exception("No se pudo recargar %s; se mantiene el modelo anterior", self.path)
+                return current
+            self._current = (model, version)
+            logger.info("Modelo cargado desde %s", self.path)
+            return self._current
+
+    def version_id(self, version):
+        _, mtime_ns, size = version[0]
+        return f"{mtime_ns}-{size}"
+
+
+class InvalidInstances(ValueError):
+    """Valores inválidos en las instancias; `errors` es {campo: mensaje}."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("Valores inválidos en " + ", ".join(errors))
+
+
+def _bool_value(value):
+    # bool es subclase de int: True/False, 0/1 y sus formas de texto
+    if isinstance(value, (bool, int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        return _BOOL_VALUES.get(value.strip().lower())
+    return None
+
+
+def _instances(mask):
+    positions = [int(i) for i in mask.to_numpy().nonzero()[0][:MAX_REPORTED]]
+    return f"instancias {positions}" + (" ..." if mask.sum() > MAX_REPORTED else "")
+
+
+def _not_number(value):
+    # Un booleano del JSON no cuenta como número; null sí (valor ausente)
+    if isinstance(value, bool):
+        return True
+    try:
+        pd.to_numeric([value], errors="raise")
+    except (TypeError, ValueError):
+        return True
+    return False
+
+
+def _numeric(series):
+    """(valores float, None) o (None, máscara de las instancias no numéricas)."""
+    try:
+        if series.map(lambda v: isinstance(v, bool)).any():
+            raise ValueError("booleano en un campo numérico")
+        return pd.to_numeric(series, errors="raise").astype(float), None
+    except (TypeError, ValueError):
+        return None, series.map(_not_number)
+
+
+def parse_instances(payload):
+    """Acepta un objeto, una lista de objetos o {"instances": [...]}."""
+    if isinstance(payload, dict) and "instances" in payload:
+        payload = payload["instances"]
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not payload:
+        raise ValueError("Se esperaba un objeto o una lista no vacía de objetos")
+
+    for i, row in enumerate(payload):
+        if not isinstance(row, dict):
+            raise ValueError(f"Instancia {i}: se esperaba un objeto")
+        missing = [f for f in FEATURES if f not in row]
+        if missing:
+            raise ValueError(f"Instancia {i}: faltan campos {missing}")
+
+    df = pd.DataFrame.from_records(payload, columns=FEATURES)
+    errors = {}
+    for field in ("flight", "payload"):
+        values, bad = _numeric(df[field])
+        if bad is not None:
+            errors[field] = f"debe ser numérico ({_instances(bad)})"
+        else:
+            df[field] = values
+    if "payload" not in errors:
+        # El entrenamiento imputa la mediana del dataset, que aquí no se conoce
+        bad = df["payload"].isna()
+        if bad.any():
+            errors["payload"] = f"no puede ser null ({_instances(bad)})"
+    if "flight" not in errors:
+        bad = df["flight"].isna() | (df["flight"] % 1 != 0)
+        if bad.any():
+            errors["flight"] = f"debe ser un entero ({_instances(bad)})"
+        else:
+            df["flight"] = df["flight"].astype(int)
+
+    for field in BOOL_FEATURES:
+        values = df[field].map(_bool_value)
+        bad = values.isna()
+        if bad.any():
+            errors[field] = f"debe ser true/false, 0/1 o su texto ({_instances(bad)})"
+        else:
+            df[field] = values.astype(bool)
+
+    if errors:
+        raise InvalidInstances(errors)
+    # Misma imputación que en el entrenamiento (scripts/preprocessing.clean_features)
+    for field in ("orbit", "site"):
+        df[field] = df[field].astype(object).fillna("Unknown").replace("", "Unknown").astype(str)
+    return df
+
+
+def predict(registry, df):
+    model, version = registry.get()
+    result = {"model_version": registry.version_id(version)}
+    if hasattr(model, "predict_proba"):
+        # Una sola pasada por el bosque: la predicción sale de las probabilidades
+        proba = model.predict_proba(df)
+        classes = model.classes_
+        result["predictions"] = [int(p) for p in classes[proba.argmax(axis=1)]]
+        if 1 in classes:
+            col = list(classes).index(1)
+            result["success_probability"] = [round(float(p), 4) for p in proba[:, col]]
+    else:
+        result["predictions"] = [int(p) for p in model.predict(df)]
+    return result
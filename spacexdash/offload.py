@@ -0,0 +1,44 @@
+# spacexdash/offload.py
+"""
+Trabajo bloqueante fuera del event loop para las vistas async (ASGI).
+
+`await offload("fase", fn, *args)` ejecuta `fn` en un pool de hilos acotado
+(`OFFLOAD_WORKERS` en settings) y la mide como `span("fase")` de la petición
+que la lanzó: el contexto (vista y spans) viaja con la tarea al hilo.
+Mientras tanto el event loop sigue atendiendo otras peticiones; si el pool
+está lleno, las tareas esperan turno en su cola sin bloquear el loop.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .telemetry import span
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    """Pool compartido por el proceso (se crea al primer uso, ya dentro de cada worker)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, "OFFLOAD_WORKERS", None) or min(4, os.cpu_count() or 1)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="spacex-offload")
+        return _executor
+
+
+def _timed(phase, fn, args, kwargs):
+    with span(phase):
+        return fn(*args, **kwargs)
+
+
+async def offload(phase, fn, *args, **kwargs):
+    """Ejecuta `fn(*args, **kwargs)` en el pool y devuelve su resultado."""
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor(), context.run, _timed, phase, fn, args, kwargs)
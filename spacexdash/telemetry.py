@@ -0,0 +1,368 @@
+# spacexdash/telemetry.py
+"""
+Métricas de latencia en proceso para las vistas de Django.
+
+- `TimingMiddleware`: nº de peticiones por vista/método/estado, peticiones en
+  curso por vista e histograma de latencia total por vista.
+- `span("fase")`: mide una fase dentro de la petición actual (carga del CSV,
+  agregación, folium, render...) en un histograma por vista y fase.
+- `metrics_view`: todo lo anterior más las estadísticas de `CACHES` en formato
+  de texto de Prometheus.
+
+Con varios workers, `SPACEX_METRICS_DIR` activa un directorio de snapshots: cada
+proceso vuelca sus contadores (como mucho una vez por segundo) en
+`<pid>-<token>.json` y `/metrics` suma los de todos los procesos. Los snapshots
+de procesos muertos se pliegan en `_retired.json` y se borran, así que los
+counters no bajan al reiniciarse un worker y el directorio no crece sin límite.
+Con `SERVER_TIMING` activado, las respuestas llevan la cabecera Server-Timing
+con las fases medidas.
+"""
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+from .cache import CACHES
+
+try:
+    import fcntl
+except ImportError:         # Windows: sin varios workers, los snapshots no se podan
+    fcntl = None
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SNAPSHOT_INTERVAL = 1.0        # segundos entre volcados al directorio compartido
+RETIRED = "_retired.json"      # counters acumulados de procesos ya terminados
+
+# Vista y fases de la petición en curso (por hilo / tarea)
+_current_view = contextvars.ContextVar("spacex_view", default="-")
+_current_spans = contextvars.ContextVar("spacex_spans", default=None)
+
+
+class Telemetry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}          # "vista|método|estado" -> nº
+        self.in_flight = {}         # vista -> nº
+        self.histograms = {}        # "métrica|vista|fase" -> [cubetas..., suma, nº]
+        self._last_snapshot = 0.0
+        self._token = (None, None)  # (pid, token): un pid reutilizado no pisa el snapshot anterior
+
+    def observe(self, metric, view, phase, seconds):
+        key = f"{metric}|{view}|{phase}"
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+                    break
+            hist[-2] += seconds
+            hist[-1] += 1
+
+    def count_request(self, view, method, status):
+        key = f"{view}|{method}|{status}"
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def add_in_flight(self, view, delta):
+        with self._lock:
+            self.in_flight[view] = self.in_flight.get(view, 0) + delta
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "requests": dict(self.requests),
+                "in_flight": dict(self.in_flight),
+                "histograms": {k: list(v) for k, v in self.histograms.items()},
+                "caches": {name: cache.stats() for name, cache in CACHES.items()},
+            }
+
+    # --- Varios workers: snapshots por proceso en un directorio compartido ---
+    def snapshot_name(self):
+        pid = os.getpid()
+        if self._token[0] != pid:       # primer volcado o proceso hijo tras fork
+            self._token = (pid, uuid.uuid4().hex[:8])
+        return f"{pid}-{self._token[1]}.json"
+
+    def maybe_dump(self, directory, force=False):
+        now = time.monotonic()
+        if not directory or (not force and now - self._last_snapshot < SNAPSHOT_INTERVAL):
+            return
+        self._last_snapshot = now
+        os.makedirs(directory, exist_ok=True)
+        _write_json(os.path.join(directory, self.snapshot_name()), self.snapshot())
+
+
+telemetry = Telemetry()
+
+
+def _write_json(path, data):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _empty_snapshot(pid=None):
+    return {"pid": pid, "requests": {}, "in_flight": {}, "histograms": {}, "caches": {}}
+
+
+def _add_counters(total, snap):
+    """Suma a `total` los counters de `snap` (peticiones, histogramas, hits/misses)."""
+    for key, value in snap["requests"].items():
+        total["requests"][key] = total["requests"].get(key, 0) + value
+    for name, stats in snap.get("caches", {}).items():
+        cache = total["caches"].setdefault(name, {"name": name, "hits": 0, "misses": 0, "entries": 0})
+        cache["hits"] += stats["hits"]
+        cache["misses"] += stats["misses"]
+    for key, hist in snap["histograms"].items():
+        current = total["histograms"].get(key)
+        total["histograms"][key] = list(hist) if current is None else [a + b for a, b in zip(current, hist)]
+
+
+def merge_snapshots(snapshots):
+    """Suma contadores e histogramas; los gauges solo de procesos vivos."""
+    merged = _empty_snapshot()
+    for snap in snapshots:
+        _add_counters(merged, snap)
+        pid = snap.get("pid")
+        if pid is None or not (pid == os.getpid() or _pid_alive(pid)):
+            continue
+        for key, value in snap["in_flight"].items():
+            merged["in_flight"][key] = merged["in_flight"].get(key, 0) + value
+        for name, stats in snap.get("caches", {}).items():
+            merged["caches"][name]["entries"] += stats["entries"]
+    del merged["pid"]
+    return merged
+
+
+def retire_dead_snapshots(directory):
+    """Pliega en RETIRED los counters de los procesos muertos y borra sus snapshots.
+
+    Cada snapshot muerto se reclama con un rename (solo un worker lo consigue)
+    y se suma bajo un flock, así que nunca se cuenta dos veces. Un pid
+    reutilizado por otro proceso vivo retrasa la poda de su snapshot anterior,
+    pero sus counters siguen sumándose.
+    """
+    if fcntl is None:
+        return
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        if os.path.basename(path) == RETIRED:
+            continue
+        try:
+            pid = _read_json(path)["pid"]
+        except (OSError, ValueError, KeyError):
+            continue
+        if pid != os.getpid() and not _pid_alive(pid):
+            try:
+                os.rename(path, f"{path}.{uuid.uuid4().hex}.retiring")
+            except FileNotFoundError:
+                continue    # otro worker lo reclamó antes
+
+    if not glob.glob(os.path.join(directory, "*.retiring")):
+        return
+    with open(os.path.join(directory, "_retired.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        # También los que dejó a medias un worker que murió tras reclamarlos
+        retiring = glob.glob(os.path.join(directory, "*.retiring"))
+        if not retiring:
+            return
+        try:
+            retired = _read_json(os.path.join(directory, RETIRED))
+        except FileNotFoundError:
+            retired = _empty_snapshot()
+        for path in retiring:
+            try:
+                _add_counters(retired, _read_json(path))
+            except ValueError:
+                pass        # volcado corrupto: se descarta
+        _write_json(os.path.join(directory, RETIRED), retired)
+        for path in retiring:
+            os.remove(path)
+
+
+def collect(directory=None):
+    own = telemetry.snapshot()
+    if not directory:
+        return merge_snapshots([own])
+    retire_dead_snapshots(directory)
+    snapshots = [own]
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        if os.path.basename(path) == telemetry.snapshot_name():
+            continue
+        try:
+            snapshots.append(_read_json(path))
+        except (OSError, ValueError):
+            continue        # volcado a medio escribir o proceso eliminado
+    return merge_snapshots(snapshots)
+
+
+# === Spans ===
+@contextmanager
+def span(phase):
+    """Mide una fase de la petición actual: `with span("folium"): ...`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        telemetry.observe("spacex_phase_seconds", _current_view.get(), phase, elapsed)
+        spans = _current_spans.get()
+        if spans is not None:
+            spans.append((phase, elapsed))
+
+
+def server_timing(spans, total):
+    durations = {}
+    for phase, elapsed in spans:
+        durations[phase] = durations.get(phase, 0.0) + elapsed
+    parts = [f"{phase.replace(' ', '_')};dur={elapsed * 1000:.1f}" for phase, elapsed in durations.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+# === Middleware ===
+class TimingMiddleware:
+    """Funciona en WSGI y en ASGI: con vistas async no añade saltos a hilos."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.metrics_dir = getattr(settings, "SPACEX_METRICS_DIR", None)
+        self.server_timing = getattr(settings, "SERVER_TIMING", False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django envolvería un process_view síncrono en sync_to_async
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start, tokens = self._begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            view, spans = self._end(request, tokens)
+        return self._finish(request, response, view, spans, start)
+
+    async def __acall__(self, request):
+        start, tokens = self._begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            view, spans = self._end(request, tokens)
+        return self._finish(request, response, view, spans, start)
+
+    def _begin(self):
+        return time.perf_counter(), (_current_spans.set([]), _current_view.set("-"))
+
+    def _end(self, request, tokens):
+        spans_token, view_token = tokens
+        view = _current_view.get()
+        spans = _current_spans.get()
+        if getattr(request, "_telemetry_in_flight", False):
+            telemetry.add_in_flight(view, -1)
+        _current_view.reset(view_token)
+        _current_spans.reset(spans_token)
+        return view, spans
+
+    def _finish(self, request, response, view, spans, start):
+        total = time.perf_counter() - start
+        telemetry.observe("spacex_request_seconds", view, "total", total)
+        telemetry.count_request(view, request.method, response.status_code)
+        if self.server_timing:
+            response["Server-Timing"] = server_timing(spans, total)
+        telemetry.maybe_dump(self.metrics_dir)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        view = (match.url_name if match and match.url_name else None) or view_func.__name__
+        _current_view.set(view)
+        telemetry.add_in_flight(view, 1)
+        request._telemetry_in_flight = True
+        return None
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return TimingMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+
+# === /metrics (formato de texto de Prometheus) ===
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def render_prometheus(data):
+    lines = [
+        "# HELP spacex_requests_total Peticiones atendidas por vista, método y estado.",
+        "# TYPE spacex_requests_total counter",
+    ]
+    for key, value in sorted(data["requests"].items()):
+        view, method, status = key.split("|")
+        lines.append(f"spacex_requests_total{_labels(view=view, method=method, status=status)} {value}")
+
+    lines += ["# HELP spacex_requests_in_flight Peticiones en curso por vista.",
+              "# TYPE spacex_requests_in_flight gauge"]
+    for view, value in sorted(data["in_flight"].items()):
+        lines.append(f"spacex_requests_in_flight{_labels(view=view)} {value}")
+
+    by_metric = {}
+    for key, hist in data["histograms"].items():
+        metric, view, phase = key.split("|")
+        by_metric.setdefault(metric, []).append((view, phase, hist))
+    helps = {"spacex_request_seconds": "Latencia total por vista.",
+             "spacex_phase_seconds": "Latencia por vista y fase (spans)."}
+    for metric, series in sorted(by_metric.items()):
+        lines += [f"# HELP {metric} {helps.get(metric, metric)}", f"# TYPE {metric} histogram"]
+        for view, phase, hist in sorted(series):
+            base = {"view": view} if metric == "spacex_request_seconds" else {"view": view, "phase": phase}
+            cumulative = 0
+            for bound, count in zip(BUCKETS, hist):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_labels(**base, le=bound)} {cumulative}")
+            lines.append(f"{metric}_bucket{_labels(**base, le='+Inf')} {hist[-1]}")
+            lines.append(f"{metric}_sum{_labels(**base)} {hist[-2]:.6f}")
+            lines.append(f"{metric}_count{_labels(**base)} {hist[-1]}")
+
+    # Cachés en proceso (VersionedCache), sumadas entre workers
+    stats = sorted(data["caches"].values(), key=lambda s: s["name"])
+    for name, kind in (("hits", "counter"), ("misses", "counter"), ("entries", "gauge")):
+        metric = f"spacex_cache_{name}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {metric} {name} de las cachés en proceso.", f"# TYPE {metric} {kind}"]
+        for s in stats:
+            lines.append(f"{metric}{_labels(cache=s['name'])} {s[name]}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    directory = getattr(settings, "SPACEX_METRICS_DIR", None)
+    telemetry.maybe_dump(directory, force=True)
+    return HttpResponse(render_prometheus(collect(directory)),
+                        content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,3 +1,201 @@
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from . import telemetry, views
+from .cache import CACHES, VersionedCache
+from .geo import FeatureIndex, haversine_matrix
+from .launch_grid import MAX_ZOOM, LaunchGrid
+from .model_registry import InvalidInstances, parse_instances
+
+LAUNCH = {"flight": 130, "payload": 5500, "orbit": "LEO", "site": "KSC LC-39A",
+          "gridfins": True, "reused": True, "legs": True}
+
+
+class ParseInstancesTests(SimpleTestCase):
+    def test_string_booleans(self):
+        rows = [{**LAUNCH, "gridfins": "false", "reused": "0", "legs": "true"},
+                {**LAUNCH, "gridfins": " TRUE ", "reused": 1, "legs": 0}]
+        df = parse_instances(rows)
+        self.assertEqual(df["gridfins"].tolist(), [False, True])
+        self.assertEqual(df["reused"].tolist(), [False, True])
+        self.assertEqual(df["legs"].tolist(), [True, False])
+        self.assertEqual(df["gridfins"].dtype, bool)
+
+    def test_invalid_booleans(self):
+        with self.assertRaises(InvalidInstances) as ctx:
+            parse_instances([LAUNCH, {**LAUNCH, "legs": "yes"}, {**LAUNCH, "legs": 2}])
+        self.assertEqual(list(ctx.exception.errors), ["legs"])
+        self.assertIn("[1, 2]", ctx.exception.errors["legs"])
+
+    def test_non_integer_flight(self):
+        with self.assertRaises(InvalidInstances) as ctx:
+            parse_instances({**LAUNCH, "flight": 12.7})
+        self.assertIn("flight", ctx.exception.errors)
+
+    def test_numeric_strings(self):
+        df = parse_instances({**LAUNCH, "flight": "12", "payload": "5500.5"})
+        self.assertEqual(df["flight"].tolist(), [12])
+        self.assertEqual(df["payload"].tolist(), [5500.5])
+
+    def test_non_numeric_fields(self):
+        with self.assertRaises(InvalidInstances) as ctx:
+            parse_instances([{**LAUNCH, "flight": "abc"}, {**LAUNCH, "payload": True}])
+        self.assertEqual(sorted(ctx.exception.errors), ["flight", "payload"])
+        self.assertIn("[0]", ctx.exception.errors["flight"])
+        self.assertIn("[1]", ctx.exception.errors["payload"])
+
+    def test_nulls_match_training(self):
+        # Como en el entrenamiento: órbita/sitio vacíos o null pasan a "Unknown"
+        df = parse_instances([{**LAUNCH, "orbit": None, "site": ""}, LAUNCH])
+        self.assertEqual(df["orbit"].tolist(), ["Unknown", LAUNCH["orbit"]])
+        self.assertEqual(df["site"].tolist(), ["Unknown", LAUNCH["site"]])
+        # La mediana de la carga no se conoce en la API: null es un error de campo
+        with self.assertRaises(InvalidInstances) as ctx:
+            parse_instances([LAUNCH, {**LAUNCH, "payload": None}])
+        self.assertEqual(list(ctx.exception.errors), ["payload"])
+        self.assertIn("[1]", ctx.exception.errors["payload"])
+
+
+class PredictApiTests(SimpleTestCase):
+    def post(self, payload):
+        return self.client.post("/api/predict/", data=json.dumps(payload), content_type="application/json")
+
+    def test_field_errors_are_400(self):
+        response = self.post({**LAUNCH, "flight": 12.7, "gridfins": "no"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.json()["fields"]), ["flight", "gridfins"])
+
+    def test_malformed_json_is_400(self):
+        response = self.client.post("/api/predict/", data="{bad", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+
+class GeoTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.features = pd.DataFrame({"name": [f"f{i}" for i in range(300)],
+                                      "lat": rng.uniform(-60, 60, 300), "lon": rng.uniform(-180, 180, 300)})
+        self.sites = (np.array([28.56, 34.63, 28.61]), np.array([-80.58, -120.61, -80.60]))
+
+    def test_haversine_matrix(self):
+        degree = 2 * np.pi * 6371 / 360     # un grado de latitud sobre el meridiano
+        dist = haversine_matrix([0, 10], [0, 0], [1, 0], [0, 0])
+        np.testing.assert_allclose(dist, [[degree, 0], [9 * degree, 10 * degree]], atol=1e-9)
+
+    def test_matrix_and_balltree_agree(self):
+        brute = FeatureIndex(self.features)
+        tree = FeatureIndex(self.features, brute_force_max=0)
+        self.assertIsNone(brute.tree)
+        self.assertIsNotNone(tree.tree)
+        dist_brute, idx_brute = brute.nearest(*self.sites, k=4)
+        dist_tree, idx_tree = tree.nearest(*self.sites, k=4)
+        np.testing.assert_array_equal(idx_brute, idx_tree)
+        np.testing.assert_allclose(dist_brute, dist_tree, rtol=1e-9)
+
+    def test_radius_matrix_and_balltree_agree(self):
+        brute = FeatureIndex(self.features)
+        tree = FeatureIndex(self.features, brute_force_max=0)
+        dist_brute, idx_brute = brute.within(*self.sites, radius_km=2500)
+        dist_tree, idx_tree = tree.within(*self.sites, radius_km=2500)
+        self.assertEqual(len(idx_brute), len(self.sites[0]))
+        self.assertTrue(any(len(idx) for idx in idx_brute))
+        for db, ib, dt, it in zip(dist_brute, idx_brute, dist_tree, idx_tree):
+            np.testing.assert_array_equal(ib, it)
+            np.testing.assert_allclose(db, dt, rtol=1e-9)
+            self.assertTrue((db <= 2500).all())
+            self.assertTrue((np.diff(db) >= 0).all())
+
+    def test_missing_catalog_is_logged(self):
+        sites = pd.DataFrame({"Launch Site": ["CCAFS LC-40"], "Lat": [28.56], "Long": [-80.58]})
+        missing = os.path.join(os.path.dirname(views.REFERENCE_CSV), "missing.csv")
+        views.reference_cache.clear()
+        self.addCleanup(views.reference_cache.clear)
+        with mock.patch.object(views, "REFERENCE_CSV", missing), self.assertLogs(views.logger, "WARNING") as logs:
+            self.assertEqual(views.site_distances(sites), [])
+        self.assertIn(missing, logs.output[0])
+
+
+class LaunchesApiTests(SimpleTestCase):
+    def setUp(self):
+        launches = pd.DataFrame({"Launch Site": ["CCAFS LC-40"] * 3 + ["VAFB SLC-4E"],
+                                 "class": [1, 0, 1, 1], "Lat": [28.56, 28.56, 28.57, 34.63],
+                                 "Long": [-80.58, -80.58, -80.59, -120.61]})
+        patcher = mock.patch.object(views, "load_launch_grid", return_value=LaunchGrid(launches))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, **params):
+        return self.client.get("/api/launches/", {"bbox": "-130,20,-70,40", **params})
+
+    def test_zoom_is_clamped_to_the_grid(self):
+        for zoom, expected in [("99", MAX_ZOOM), ("-3", 0), ("7.6", 7), ("1e9", MAX_ZOOM)]:
+            response = self.get(zoom=zoom)
+            self.assertEqual(response.status_code, 200, zoom)
+            self.assertEqual(response.json()["zoom"], expected, zoom)
+        self.assertEqual(sum(c["count"] for c in self.get(zoom="99").json()["clusters"]), 4)
+
+    def test_bad_parameters_are_400(self):
+        for params in [{"zoom": "abc"}, {"zoom": "nan"}, {"zoom": "inf"},
+                       {"bbox": "-130,20,-70"}, {"bbox": "a,20,-70,40"}, {"bbox": "-130,40,-70,20"}]:
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("error", response.json())
+        self.assertEqual(self.client.get("/api/launches/", {"zoom": 3}).status_code, 400)
+
+
+class TelemetryTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def dead_pid(self):
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        return process.pid
+
+    def write_snapshot(self, pid, requests, hits):
+        snap = {"pid": pid, "requests": {"dashboard|GET|200": requests}, "in_flight": {"dashboard": 1},
+                "histograms": {}, "caches": {"cube": {"name": "cube", "hits": hits, "misses": 1, "entries": 2}}}
+        with open(os.path.join(self.dir, f"{pid}-dead.json"), "w") as f:
+            json.dump(snap, f)
+
+    def requests(self, data):
+        return data["requests"].get("dashboard|GET|200", 0)
+
+    def test_dead_snapshots_are_folded_into_retired(self):
+        own = self.requests(telemetry.collect())
+        self.write_snapshot(self.dead_pid(), requests=5, hits=3)
+        self.write_snapshot(self.dead_pid(), requests=2, hits=1)
+
+        data = telemetry.collect(self.dir)
+        self.assertEqual(self.requests(data), own + 7)
+        self.assertEqual(data["caches"]["cube"]["hits"], 4)
+        self.assertEqual(data["caches"]["cube"]["entries"], 0)   # gauge: solo procesos vivos
+        self.assertNotIn("dashboard", data["in_flight"])
+        self.assertEqual(sorted(os.listdir(self.dir)), ["_retired.json", "_retired.lock"])
+
+        # Una segunda recogida no vuelve a sumarlos
+        self.assertEqual(self.requests(telemetry.collect(self.dir)), own + 7)
+
+    def test_live_snapshots_are_kept(self):
+        own = telemetry.collect()["in_flight"].get("dashboard", 0)
+        self.write_snapshot(os.getppid(), requests=4, hits=0)
+        self.assertEqual(telemetry.collect(self.dir)["in_flight"]["dashboard"], own + 1)
+        self.assertIn(f"{os.getppid()}-dead.json", os.listdir(self.dir))
+
+    def test_cache_clear_keeps_counters(self):
+        cache = VersionedCache("telemetry_test")
+        self.addCleanup(CACHES.pop, "telemetry_test")
+        cache.get_or_build("k", 1, lambda: "v")
+        cache.get_or_build("k", 1, lambda: "v")
+        cache.clear()
+        self.assertEqual(cache.stats(), {"name": "telemetry_test", "hits": 1, "misses": 1, "entries": 0})
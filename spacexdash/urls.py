@@ -1,8 +1,13 @@
 from django.urls import path
-from .views import dashboard, launch_sites_map, dashboard_dash
+from .telemetry import metrics_view
+from .views import dashboard, launch_sites_map, dashboard_dash, cube_api, launches_api, predict_api
 
 urlpatterns = [
     path("dashboard/", dashboard, name="spacex_dashboard"),
     path("map/", launch_sites_map, name="launch-sites-map"),
     path("dashboard-dash/", dashboard_dash, name="spacex_dashboard_dash"),
+    path("api/predict/", predict_api, name="predict-api"),
+    path("api/launches/", launches_api, name="launches-api"),
+    path("api/cube/", cube_api, name="cube-api"),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -1,110 +1,282 @@
+import asyncio
+import logging
 import os
 import json
 import pandas as pd
 import folium
+from branca.element import MacroElement
+from jinja2 import Template
 from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render
-from .metrics import load_metrics
-from folium.plugins import MarkerCluster
-import math
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from .cache import VersionedCache, dataset_version
+from .cube import DIMENSIONS, INT_DIMENSIONS, MEASURES, get_cube, with_rates
+from .http_cache import template_files, versioned_page
+from .launch_grid import LaunchGrid, normalize_bbox, normalize_zoom
+from .geo import REFERENCE_CSV, build_indexes, load_reference_catalog, nearest_features
+from .metrics import get_metrics_context
+from .model_registry import InvalidInstances, ModelRegistry, parse_instances, predict
+from .offload import offload
+from .telemetry import span
+from scripts.datastore import attach
+
+logger = logging.getLogger(__name__)
 
 # === Rutas de los CSV ===
 CSV_METRICS = os.path.join(settings.BASE_DIR, "data", "processed", "dataset_part_2.csv")
 CSV_MAP = os.path.join(settings.BASE_DIR, "data", "processed", "spacex_launch_geo.csv")
+MODEL_PATH = getattr(settings, "PREDICT_MODEL_PATH",
+                     os.path.join(settings.BASE_DIR, "models", "random_forest_model.joblib"))
+# PREDICT_COMPILED: peticiones de pocas filas con el bosque compilado a NumPy
+PREDICT_COMPILED = getattr(settings, "PREDICT_COMPILED", False)
+
+# Un registro por worker: el modelo se deserializa una vez y se recarga si cambia
+model_registry = ModelRegistry(MODEL_PATH, compiled=PREDICT_COMPILED)
+
+# HTML del mapa + tablas de análisis, por versión de spacex_launch_geo.csv
+map_cache = VersionedCache("launch_sites_map")
+reference_cache = VersionedCache("reference_indexes")
+# Clusters por zoom de la API del visor, por versión de spacex_launch_geo.csv
+grid_cache = VersionedCache("launch_grid")
+
+# Elementos de referencia más cercanos que se muestran por sitio y tipo
+NEAREST_K = 4
 
 
 # === Dashboard (no lo tocamos) ===
-def dashboard(request):
-    data = load_metrics(CSV_METRICS)
-    context = {k: json.dumps(v) for k, v in data.items()}
-    return render(request, "spacexdash/dashboard.html", context)
+def dashboard_version():
+    return dataset_version(CSV_METRICS, *template_files("spacexdash/dashboard.html"))
+
+
+@versioned_page(dashboard_version)
+async def dashboard(request):
+    # El contexto se cachea hasta que cambie el CSV; pandas y la plantilla van al pool
+    context = await offload("metrics", get_metrics_context, CSV_METRICS)
+    return await offload("render", render, request, "spacexdash/dashboard.html", context)
 
 
 # === Mapa de sitios y lanzamientos ===
-# --- Función Haversine para calcular distancias ---
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371  # Radio de la Tierra en km
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
-    return R * (2 * math.atan2(math.sqrt(a), math.sqrt(1-a)))
+class ViewportLaunches(MacroElement):
+    """Capa de lanzamientos que se pide a la API al mover el mapa (solo lo visible)."""
 
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function () {
+            var map = {{ this._parent.get_name() }};
+            var layer = L.layerGroup().addTo(map);
+            var controller = null;
 
-def launch_sites_map(request):
-    # Cargar dataset
-    df = pd.read_csv(CSV_MAP)
-    df["class"] = pd.to_numeric(df["class"], errors="coerce")
+            function marker(c) {
+                var color = c.success >= c.failure ? "green" : "red";
+                var radius = c.count === 1 ? 5 : Math.min(8 + 3 * Math.log2(c.count), 24);
+                var label = c.count === 1
+                    ? c.site + "<br>Outcome: " + (c.success ? "Success" : "Failure")
+                    : (c.site || "Several sites") + "<br>" + c.count + " launches: "
+                      + c.success + " success / " + c.failure + " failure";
+                return L.circleMarker([c.lat, c.lon], {
+                    radius: radius, color: color, fillColor: color, fill: true, fillOpacity: 0.7
+                }).bindPopup(label);
+            }
+
+            function load() {
+                var b = map.getBounds();
+                var params = new URLSearchParams({
+                    bbox: [b.getWest(), b.getSouth(), b.getEast(), b.getNorth()].join(","),
+                    zoom: map.getZoom()
+                });
+                if (controller) { controller.abort(); }
+                controller = new AbortController();
+                fetch({{ this.api_url|tojson }} + "?" + params, {signal: controller.signal})
+                    .then(function (r) { return r.json(); })
+                    .then(function (data) {
+                        layer.clearLayers();
+                        data.clusters.forEach(function (c) { marker(c).addTo(layer); });
+                    })
+                    .catch(function (e) { if (e.name !== "AbortError") { console.error(e); } });
+            }
+
+            map.on("moveend", load);
+            load();
+        })();
+        {% endmacro %}
+    """)
 
+    def __init__(self, api_url):
+        super().__init__()
+        self._name = "ViewportLaunches"
+        self.api_url = api_url
+
+
+def build_launch_map(df, sites):
+    """HTML del mapa folium: sitios + capa de lanzamientos servida por /api/launches/."""
     # Crear mapa centrado
     avg_lat, avg_lon = df["Lat"].mean(), df["Long"].mean()
     m = folium.Map(location=[avg_lat, avg_lon], zoom_start=3)
 
     # --- Marcadores de sitios (azules) ---
-    sites = df.groupby("Launch Site")[["Lat", "Long"]].first().reset_index()
-    for _, row in sites.iterrows():
+    for name, lat, lon in zip(sites["Launch Site"], sites["Lat"], sites["Long"]):
         folium.Marker(
-            location=[row["Lat"], row["Long"]],
-            popup=f"Launch Site: {row['Launch Site']}",
+            location=[lat, lon],
+            popup=f"Launch Site: {name}",
             icon=folium.Icon(color="blue", icon="info-sign")
         ).add_to(m)
 
-    # --- Cluster de lanzamientos (verde/rojo) ---
-    marker_cluster = MarkerCluster().add_to(m)
-    for _, row in df.iterrows():
-        color = "green" if row["class"] == 1 else "red"
-        folium.CircleMarker(
-            location=[row["Lat"], row["Long"]],
-            radius=5,
-            color=color,
-            fill=True,
-            fill_opacity=0.7,
-            popup=f"{row['Launch Site']}<br>Outcome: {'Success' if row['class']==1 else 'Failure'}"
-        ).add_to(marker_cluster)
-
-    # --- Análisis por sitio ---
-    analysis = []
-    for site, group in df.groupby("Launch Site"):
-        total = len(group)
-        success = int(group["class"].sum())
-        failure = total - success
-        success_rate = round((success / total) * 100, 1)
-        analysis.append({
-            "name": site,
-            "total": total,
-            "success": success,
-            "failure": failure,
-            "success_rate": success_rate,
-        })
-
-    # --- Distancias a ciudades cercanas ---
-    cities = {
-        "Orlando": (28.5383, -81.3792),
-        "Los Angeles": (34.0522, -118.2437),
-        "New York": (40.7128, -74.0060),
-        "Houston": (29.7604, -95.3698),
-    }
+    # --- Lanzamientos (verde/rojo) ---
+    # El navegador pide solo los clusters del área visible al zoom actual
+    ViewportLaunches(reverse("launches-api")).add_to(m)
 
-    distances = []
-    for _, site in sites.iterrows():
-        site_name, site_lat, site_lon = site["Launch Site"], site["Lat"], site["Long"]
-        for city, (city_lat, city_lon) in cities.items():
-            d = round(haversine(site_lat, site_lon, city_lat, city_lon), 1)
-            distances.append({
-                "site": site_name,
-                "city": city,
-                "distance_km": d
-            })
-
-    # Renderizar
-    return render(request, "spacexdash/launch_sites_map.html", {
-        "map_html": m._repr_html_(),
+    return m._repr_html_()
+
+
+def site_analysis(df):
+    """Totales, éxitos y tasa de éxito por sitio, en una sola agregación."""
+    grouped = df.groupby("Launch Site", observed=True)["class"].agg(total="size", success="sum")
+    grouped["success"] = grouped["success"].astype(int)
+    grouped["failure"] = grouped["total"] - grouped["success"]
+    grouped["success_rate"] = (grouped["success"] / grouped["total"] * 100).round(1)
+    grouped.index = grouped.index.astype(str)
+    return grouped.rename_axis("name").reset_index().to_dict("records")
+
+
+def load_reference_indexes():
+    # Los BallTree se construyen una vez por versión del catálogo
+    return reference_cache.get_or_build(
+        "indexes", dataset_version(REFERENCE_CSV),
+        lambda: build_indexes(load_reference_catalog(REFERENCE_CSV)),
+    )
+
+
+def load_map_frame():
+    df = attach(CSV_MAP, columns=["Launch Site", "class", "Lat", "Long"])
+    sites = df.groupby("Launch Site", observed=True)[["Lat", "Long"]].first().reset_index()
+    return df, sites
+
+
+def site_distances(sites):
+    """Distancias a los elementos de referencia más cercanos (ciudades, costa...)."""
+    try:
+        return nearest_features(sites, load_reference_indexes(), k=NEAREST_K)
+    except FileNotFoundError:
+        # El mapa se sirve igual; la tabla muestra "No distances available"
+        logger.warning("Catálogo de referencia no encontrado en %s; sin tabla de distancias", REFERENCE_CSV)
+        return []
+
+
+async def build_map_context():
+    # Cargar dataset
+    df, sites = await offload("load_csv", load_map_frame)
+
+    # Mapa, análisis por sitio y distancias son independientes: en paralelo en el pool
+    map_html, analysis, distances = await asyncio.gather(
+        offload("folium", build_launch_map, df, sites),
+        offload("aggregate", site_analysis, df),
+        offload("nearest", site_distances, sites),
+    )
+
+    return {
+        "map_html": map_html,
         "analysis": analysis,
         "distances": distances
-    })
+    }
+
+
+def map_version():
+    return dataset_version(CSV_MAP, REFERENCE_CSV, *template_files("spacexdash/launch_sites_map.html"))
+
+
+@versioned_page(map_version)
+async def launch_sites_map(request):
+    # El HTML del mapa y las tablas solo dependen del CSV: se cachean por versión
+    version = dataset_version(CSV_MAP, REFERENCE_CSV)
+    with span("context"):
+        context = await map_cache.aget_or_build("map", version, build_map_context)
+    return await offload("render", render, request, "spacexdash/launch_sites_map.html", context)
+
+
+def load_launch_grid():
+    # Los clusters de todos los zooms se calculan una vez por versión del CSV
+    return grid_cache.get_or_build(
+        "grid", dataset_version(CSV_MAP),
+        lambda: LaunchGrid(attach(CSV_MAP, columns=["Launch Site", "class", "Lat", "Long"])),
+    )
+
 
+def launches_api(request):
+    """GET /api/launches/?bbox=oeste,sur,este,norte&zoom=N → clusters visibles.
+
+    El zoom se lleva al rango de la rejilla (0..MAX_ZOOM); uno no numérico es un 400.
+    """
+    if "bbox" not in request.GET:
+        return JsonResponse({"error": "Parámetros: bbox=oeste,sur,este,norte y zoom"}, status=400)
+    try:
+        values = pd.to_numeric(request.GET["bbox"].split(","), errors="coerce")
+        if len(values) != 4:
+            raise ValueError("bbox debe tener 4 valores: oeste,sur,este,norte")
+        bbox = normalize_bbox(*values)      # NaN (no numérico) o sur > norte -> "bbox inválido"
+        zoom = normalize_zoom(request.GET.get("zoom", 0))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    with span("grid"):
+        grid = load_launch_grid()
+    with span("query"):
+        clusters = grid.query(*bbox, zoom)
+    return JsonResponse({"zoom": zoom, "total": grid.total, "clusters": clusters})
+
+
+def cube_api(request):
+    """GET /api/cube/?group_by=year,LaunchSite&Orbit=LEO&Orbit=GTO → medidas por grupo.
+
+    Cada dimensión puede repetirse como filtro; `year` y `payload_bucket` son enteros.
+    """
+    try:
+        group_by = [d for d in request.GET.get("group_by", "").split(",") if d]
+        filters = {
+            dim: [int(v) if dim in INT_DIMENSIONS else v for v in request.GET.getlist(dim)]
+            for dim in DIMENSIONS if dim in request.GET
+        }
+        with span("cube"):
+            cube = get_cube(CSV_METRICS)
+        with span("query"):
+            result = with_rates(cube.query(group_by, filters))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # NaN (sin cargas conocidas) → null
+    rows = result.astype(object).where(result.notna(), None).to_dict("records")
+    return JsonResponse({
+        "group_by": group_by,
+        "filters": filters,
+        "measures": MEASURES + ["success_rate", "payload_mean"],
+        "cells": len(cube.cells),
+        "rows": rows,
+    })
 
 
 def dashboard_dash(request):
     return render(request, "spacexdash/dashboard-dash.html")
 
+
+# === API de predicción ===
+def parse_body(body):
+    return parse_instances(json.loads(body))
+
+
+@csrf_exempt
+@require_POST
+async def predict_api(request):
+    try:
+        df = await offload("parse", parse_body, request.body)
+    except InvalidInstances as e:
+        return JsonResponse({"error": str(e), "fields": e.errors}, status=400)
+    except ValueError as e:     # incluye JSON mal formado
+        return JsonResponse({"error": str(e)}, status=400)
+
+    try:
+        result = await offload("predict", predict, model_registry, df)
+    except FileNotFoundError:
+        return JsonResponse({"error": "Modelo no disponible"}, status=503)
+    return JsonResponse(result)
@@ -0,0 +1,86 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pipeline import train_model
+from pipeline.compiled_forest import CompiledForest, GatedForest
+from scripts.preprocessing import FEATURES, build_preprocessor
+
+
+def launches(n, seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "flight": rng.integers(1, 120, n).astype(float),
+        "payload": rng.lognormal(8, 0.6, n),
+        "orbit": rng.choice(["LEO", "GTO", "ISS", "PO"], n),
+        "site": rng.choice(["CCSFS SLC 40", "KSC LC 39A", "VAFB SLC 4E"], n),
+        "gridfins": rng.random(n) < 0.7,
+        "reused": rng.random(n) < 0.4,
+        "legs": rng.random(n) < 0.8,
+    })[FEATURES]
+    y = ((X["payload"] < 4000) & X["legs"] | (rng.random(n) < 0.2)).astype(int)
+    return X, y
+
+
+class CompiledForestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        X, y = launches(600, seed=1)
+        # Missing payloads in training: sklearn learns where NaN goes at each split
+        X.loc[X.sample(frac=0.1, random_state=1).index, "payload"] = np.nan
+        X_train, X_test, y_train, y_test = X.iloc[:480], X.iloc[480:], y.iloc[:480], y.iloc[480:]
+        cls.tmp = tempfile.TemporaryDirectory()
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.pipeline = train_model.train(
+                X_train, X_test, y_train, y_test, build_preprocessor(),
+                params={"n_estimators": 25, "max_depth": 8, "class_weight": "balanced"},
+                model_path=os.path.join(cls.tmp.name, "model.joblib"),
+            )
+        cls.X_test = X_test
+        cls.compiled = CompiledForest.from_pipeline(cls.pipeline)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def assert_same_proba(self, compiled, X):
+        np.testing.assert_allclose(compiled.predict_proba(X), self.pipeline.predict_proba(X), rtol=0, atol=1e-12)
+
+    def test_matches_sklearn(self):
+        self.assert_same_proba(self.compiled, self.X_test)
+        np.testing.assert_array_equal(self.compiled.predict(self.X_test), self.pipeline.predict(self.X_test))
+
+    def test_missing_values_follow_sklearn(self):
+        X = self.X_test.copy()
+        X["payload"] = np.nan                   # missing values seen in training
+        X.loc[X.index[::2], "flight"] = np.nan  # never missing in training
+        X["gridfins"] = X["gridfins"].astype(float)
+        X.loc[X.index[::3], "gridfins"] = np.nan
+        self.assert_same_proba(self.compiled, X)
+
+    def test_single_row_and_records(self):
+        row = self.X_test.iloc[[0]]
+        self.assert_same_proba(self.compiled, row)
+        np.testing.assert_allclose(self.compiled.predict_proba(row.to_dict("records")),
+                                   self.pipeline.predict_proba(row), rtol=0, atol=1e-12)
+
+    def test_save_load_round_trip(self):
+        path = os.path.join(self.tmp.name, "compiled.npz")
+        self.compiled.save(path)
+        self.assert_same_proba(CompiledForest.load(path), self.X_test)
+
+    def test_gated_forest_keeps_batches_on_sklearn(self):
+        gated = GatedForest(self.pipeline, max_rows=10)
+        self.assertIsInstance(gated._model(self.X_test.iloc[:10]), CompiledForest)
+        self.assertIs(gated._model(self.X_test), self.pipeline)
+        self.assert_same_proba(gated, self.X_test.iloc[:10])
+        self.assert_same_proba(gated, self.X_test)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import importlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from scripts import datastore
+from spacexdash.launch_index import ALL_SITES
+
+
+def write_launches(path, sites, n, seed):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "FlightNumber": np.arange(1, n + 1),
+        "Date": pd.date_range("2015-01-01", periods=n, freq="30D").strftime("%Y-%m-%d"),
+        "BoosterVersion": rng.choice(["F9 FT", "F9 B5"], n),
+        "PayloadMass": rng.uniform(500, 9000, n).round(1),
+        "Orbit": rng.choice(["LEO", "GTO"], n),
+        "LaunchSite": rng.choice(sites, n),
+        "Outcome": rng.choice(["True ASDS", "False Ocean"], n),
+        "Class": rng.integers(0, 2, n),
+    }).to_csv(path, index=False)
+    # Versión nueva aunque se reescriba en el mismo instante
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9 * seed))
+
+
+class DashVersionTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.csv = os.path.join(tmp.name, "dataset_part_2.csv")
+        write_launches(self.csv, ["CCSFS SLC 40", "KSC LC 39A"], 60, seed=1)
+        for patcher in (
+            mock.patch.object(datastore, "CACHE_DIR", os.path.join(tmp.name, "columnar")),
+            mock.patch.object(datastore, "SHARED_DIR", os.path.join(tmp.name, "shared")),
+            mock.patch.object(datastore, "SHARED_ENABLED", True),
+            mock.patch.dict(datastore.DATASETS["launches"], {"csv": self.csv}),
+            mock.patch.dict(datastore._segments, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Se importa con el dataset temporal: Dash construye el layout al importar
+        self.app = importlib.import_module("spacex_dash_app")
+
+    def site_options(self, layout):
+        dropdown, = [c for c in layout._traverse() if getattr(c, "id", None) == "site-dropdown"]
+        return [option["value"] for option in dropdown.options]
+
+    def test_callbacks_see_a_new_version(self):
+        app = self.app
+        self.assertEqual(self.site_options(app.serve_layout()), [ALL_SITES, "CCSFS SLC 40", "KSC LC 39A"])
+        before = app.update_scatter(ALL_SITES, [0, 10000])
+        self.assertEqual(sum(len(trace.x) for trace in before.data), 60)
+        app.update_pie_chart("KSC LC 39A")
+
+        write_launches(self.csv, ["VAFB SLC 4E"], 25, seed=2)
+        self.assertEqual(self.site_options(app.serve_layout()), [ALL_SITES, "VAFB SLC 4E"])
+        after = app.update_scatter(ALL_SITES, [0, 10000])
+        self.assertEqual(sum(len(trace.x) for trace in after.data), 25)
+        pie = app.update_pie_chart(ALL_SITES)
+        self.assertEqual(list(pie.data[0].labels), ["VAFB SLC 4E"])
+        # Las tartas de la versión anterior salen de la LRU: solo quedan las de la nueva
+        self.assertLessEqual(app.pie_figure.cache_info().currsize, len([ALL_SITES, "VAFB SLC 4E"]))
+
+    def test_client_payload_follows_the_version(self):
+        with mock.patch.object(self.app, "CLIENTSIDE", True):
+            store = self.app.serve_layout().children[0]
+            self.assertEqual(store.data["sites"], ["CCSFS SLC 40", "KSC LC 39A"])
+            write_launches(self.csv, ["VAFB SLC 4E"], 25, seed=2)
+            store = self.app.serve_layout().children[0]
+        self.assertEqual(store.data["sites"], ["VAFB SLC 4E"])
+        self.assertEqual(len(store.data["partitions"]["VAFB SLC 4E"]["payload"]), 25)
+        # Lo que devuelve assets/spacex_clientside.js al vaciar el desplegable
+        self.assertEqual(len(store.data["empty_pie"]["data"][0]["values"]), 0)
+
+    def test_cleared_or_unknown_site_is_an_empty_figure(self):
+        for site in [None, "Boca Chica"]:
+            self.assertEqual(len(self.app.update_pie_chart(site).data[0].values), 0, site)
+            scatter = self.app.update_scatter(site, [0, 10000])
+            self.assertEqual(sum(len(trace.x or ()) for trace in scatter.data), 0, site)
+            self.assertEqual(scatter.layout.xaxis.title.text, "Payload mass (kg)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from scripts import datastore
+from spacexdash.launch_index import ALL_SITES, LaunchIndex
+
+COLUMNS = ["LaunchSite", "PayloadMass", "Class", "BoosterVersion"]
+
+
+def write_launches(path, n, seed=0):
+    rng = np.random.default_rng(seed)
+    payload = rng.uniform(300, 15000, n).round(1)
+    payload[rng.random(n) < 0.1] = np.nan
+    pd.DataFrame({
+        "FlightNumber": np.arange(1, n + 1),
+        "LaunchSite": rng.choice(["CCSFS SLC 40", "KSC LC 39A", "VAFB SLC 4E"], n),
+        "PayloadMass": payload,
+        "Class": rng.integers(0, 2, n),
+        "BoosterVersion": rng.choice(["F9 v1.0", "F9 FT", "F9 B5"], n),
+    }).to_csv(path, index=False)
+
+
+class SharedDatasetTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.csv = os.path.join(tmp.name, "dataset_part_2.csv")
+        write_launches(self.csv, 500)
+        for patcher in (
+            mock.patch.object(datastore, "CACHE_DIR", os.path.join(tmp.name, "columnar")),
+            mock.patch.object(datastore, "SHARED_DIR", os.path.join(tmp.name, "shared")),
+            mock.patch.object(datastore, "SHARED_ENABLED", True),
+            mock.patch.dict(datastore.DATASETS["launches"], {"csv": self.csv}),
+            mock.patch.dict(datastore._segments, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def segment(self):
+        (_, arrays), = datastore._segments.values()
+        return arrays
+
+    def test_columns_are_the_shared_memmap(self):
+        df = datastore.attach_dataset("launches", columns=COLUMNS)
+        arrays = self.segment()
+        self.assertTrue(np.shares_memory(df["PayloadMass"].to_numpy(), arrays["PayloadMass"]))
+        self.assertTrue(np.shares_memory(df["Class"].to_numpy(), arrays["Class"]))
+        self.assertTrue(np.shares_memory(df["LaunchSite"].cat.codes.to_numpy(), arrays["LaunchSite"].codes))
+        self.assertFalse(df["PayloadMass"].to_numpy().flags.writeable)
+        pd.testing.assert_frame_equal(df, datastore.load_table(self.csv, columns=COLUMNS))
+
+    def test_launch_index_keeps_the_memmap(self):
+        df = datastore.attach_dataset("launches", columns=COLUMNS)
+        index = LaunchIndex(df)
+        self.assertIs(index.df, df)
+        self.assertTrue(np.shares_memory(index.payload, self.segment()["PayloadMass"]))
+
+        # Mismas filas que filtrar y ordenar el DataFrame directamente
+        for site in [ALL_SITES] + index.sites:
+            part = df if site == ALL_SITES else df[df["LaunchSite"] == site]
+            for low, high in [(index.payload_min, index.payload_max), (2000, 6000), (0, 100)]:
+                expected = part[part["PayloadMass"].between(low, high)].sort_values("PayloadMass", kind="stable")
+                pd.testing.assert_frame_equal(index.payload_range(site, low, high),
+                                              expected.reset_index(drop=True))
+
+    def rewrite(self, n, seed):
+        write_launches(self.csv, n, seed=seed)
+        st = os.stat(self.csv)
+        os.utime(self.csv, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9 * seed))
+
+    def versions(self):
+        root = os.path.join(datastore.SHARED_DIR, datastore._dataset_key(self.csv))
+        return sorted(name for name in os.listdir(root) if not name.endswith(".tmp"))
+
+    def test_new_version_prunes_older_ones(self):
+        first = datastore.publish(self.csv)
+        self.rewrite(400, seed=1)
+        second = datastore.publish(self.csv)
+        self.rewrite(300, seed=2)
+        third = datastore.publish(self.csv)
+        self.assertEqual(len({first, second, third}), 3)
+        # La nueva y las KEEP_VERSIONS anteriores; sin enlace `current`
+        self.assertEqual(self.versions(), sorted(os.path.basename(p) for p in (second, third)))
+        self.assertEqual(len(datastore.attach_dataset("launches", columns=COLUMNS)), 300)
+
+    def test_attach_retries_when_version_is_pruned(self):
+        open_segment = datastore._open_segment
+        calls = []
+
+        def pruned_once(path):
+            calls.append(path)
+            if len(calls) == 1:
+                raise FileNotFoundError(path)
+            return open_segment(path)
+
+        with mock.patch.object(datastore, "_open_segment", side_effect=pruned_once):
+            df = datastore.attach_dataset("launches", columns=COLUMNS)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(df), 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
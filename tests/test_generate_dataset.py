@@ -0,0 +1,122 @@
+import contextlib
+import importlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from scripts.raw_store import RawDatasetWriter
+
+generate = importlib.import_module("scripts.2_generate_dataset")
+
+PAGE = 4
+
+
+def launch(n, landed=True):
+    return {
+        "id": f"launch{n}", "flight_number": n, "date_utc": f"2020-01-{n:02d}T00:00:00.000Z",
+        "rocket": "falcon9", "launchpad": "slc40", "payloads": [f"payload{n}"],
+        "cores": [{"core": f"core{n}", "gridfins": True, "legs": True, "reused": n > 3,
+                   "landpad": "ocisly", "block": 5, "reuse_count": n // 3,
+                   "landing_success": landed, "landing_type": "ASDS"}],
+    }
+
+
+class IncrementalBuildTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.raw_dir = os.path.join(tmp.name, "raw")
+        self.output = os.path.join(tmp.name, "dataset_part_2.csv")
+        for patcher in (
+            mock.patch.object(generate, "RAW_DIR", self.raw_dir),
+            mock.patch.object(generate, "WATERMARK_PATH", os.path.join(tmp.name, "watermark.json")),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.publish("rockets", [{"id": "falcon9", "name": "Falcon 9"}])
+        self.publish("launchpads", [{"id": "slc40", "name": "CCSFS SLC 40", "latitude": 28.56,
+                                     "longitude": -80.57}])
+        self.publish("payloads", [{"id": f"payload{n}", "mass_kg": 1000.0 * n, "orbit": "LEO"}
+                                  for n in range(1, 30)])
+        self.launches = [launch(n) for n in range(1, 11)]
+        self.publish("launches", self.launches)
+        self.quiet(generate.full_build, self.output)
+
+    def publish(self, name, docs):
+        writer = RawDatasetWriter(name, self.raw_dir)
+        for start in range(0, len(docs), PAGE):
+            writer.write(docs[start:start + PAGE])
+        writer.commit()
+
+    def quiet(self, fn, *args):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            fn(*args)
+        return out.getvalue()
+
+    def incremental(self):
+        """Ejecuta incremental_build; devuelve las páginas cargadas y si leyó el dataset."""
+        read_raw, read_csv = generate.read_raw, generate.pd.read_csv
+        loaded, read_output = [], []
+
+        def spy_read_raw(name, *args, **kwargs):
+            if name == "launches":
+                loaded.append(kwargs.get("parts"))
+            return read_raw(name, *args, **kwargs)
+
+        def spy_read_csv(path, *args, **kwargs):
+            read_output.append(path == self.output)
+            return read_csv(path, *args, **kwargs)
+
+        with mock.patch.object(generate, "read_raw", spy_read_raw), \
+                mock.patch.object(generate.pd, "read_csv", spy_read_csv):
+            self.quiet(generate.incremental_build, self.output)
+        return loaded, any(read_output)
+
+    def assert_same_as_full_build(self):
+        with open(self.output) as f:
+            incremental = f.read()
+        full = self.output + ".full"
+        self.quiet(generate.full_build, full)
+        with open(full) as f:
+            self.assertEqual(incremental, f.read())
+
+    def test_new_launches_load_only_changed_pages_and_append(self):
+        self.publish("launches", self.launches + [launch(n) for n in range(11, 15)])
+        loaded, read_output = self.incremental()
+        # Páginas 0-1 iguales; la 2 (9-10 -> 9-12) cambia y la 3 (13-14) es nueva
+        self.assertEqual(loaded, [[2, 3]])
+        self.assertFalse(read_output)
+        watermark = generate.load_watermark()
+        self.assertEqual(watermark["flight_number"], 14)
+        self.assertEqual(len(watermark["row_hashes"]), 14)
+        self.assert_same_as_full_build()
+
+    def test_modified_launch_is_upserted(self):
+        self.launches[1] = launch(2, landed=False)
+        self.publish("launches", self.launches)
+        loaded, read_output = self.incremental()
+        self.assertEqual(loaded, [[0]])
+        self.assertTrue(read_output)
+        self.assert_same_as_full_build()
+
+    def test_unchanged_launches_do_nothing(self):
+        with open(self.output) as f:
+            before = f.read()
+        loaded, read_output = self.incremental()
+        self.assertEqual((loaded, read_output), ([], False))
+        with open(self.output) as f:
+            self.assertEqual(f.read(), before)
+
+    def test_watermark_without_pages_triggers_full_build(self):
+        # Formato anterior: hashes por lanzamiento, sin hashes por página
+        with open(generate.WATERMARK_PATH, "w") as f:
+            json.dump({"flight_number": 10, "launch_hashes": {}, "dimensions": {}}, f)
+        self.assertIn("reconstrucción completa", self.quiet(generate.incremental_build, self.output))
+        self.assertEqual(len(generate.load_watermark()["row_hashes"]), 10)
+
+if __name__ == "__main__":
+    unittest.main()
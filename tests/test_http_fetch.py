@@ -0,0 +1,124 @@
+import asyncio
+import importlib
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from scripts.http_fetch import FetchError, Fetcher
+
+download_raw = importlib.import_module("scripts.1_download_raw")
+
+LAUNCHPADS = [{"id": "5e9e4501f5090910d4566f83", "name": "VAFB SLC 4E"}]
+LAUNCHES = [{"id": f"l{i}", "flight_number": i, "cores": [], "payloads": []} for i in range(1, 24)]
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """API v4 mínima: /launchpads con ETag, /launches/query paginado y /flaky (503 x2)."""
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, doc, headers=None):
+        body = json.dumps(doc).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.log.append(("GET", self.path, self.headers.get("If-None-Match")))
+        if self.path == "/launchpads":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self.send_json(200, LAUNCHPADS, {"ETag": '"v1"'})
+        elif self.path == "/flaky":
+            self.server.flaky += 1
+            if self.server.flaky <= 2:
+                self.send_json(503, {}, {"Retry-After": "0"})
+            else:
+                self.send_json(200, {"ok": True})
+        else:
+            self.send_json(404, {})
+
+    def do_POST(self):
+        options = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["options"]
+        self.server.log.append(("POST", self.path, options["page"]))
+        page, limit = options["page"], options["limit"]
+        docs = LAUNCHES[(page - 1) * limit:page * limit]
+        self.send_json(200, {"docs": docs, "totalPages": -(-len(LAUNCHES) // limit), "page": page})
+
+
+class FetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPI)
+        self.server.log, self.server.flaky = [], 0
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.api = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.validators = os.path.join(tmp.name, "validators.json")
+
+    def run_fetcher(self, work, **kwargs):
+        async def main():
+            async with Fetcher(validators_path=self.validators, backoff=0, **kwargs) as fetcher:
+                result = await work(fetcher)
+            fetcher.save_validators()
+            return result
+        return asyncio.run(main())
+
+    def test_not_modified_is_reused_across_runs(self):
+        first = self.run_fetcher(lambda f: f.get(f"{self.api}/launchpads"))
+        self.assertEqual(json.loads(first), LAUNCHPADS)
+        # Nueva ejecución: los validadores se leen del disco
+        self.assertIsNone(self.run_fetcher(lambda f: f.get(f"{self.api}/launchpads")))
+        self.assertEqual(self.server.log, [("GET", "/launchpads", None), ("GET", "/launchpads", '"v1"')])
+
+    def test_retries_server_errors(self):
+        body = self.run_fetcher(lambda f: f.get(f"{self.api}/flaky"))
+        self.assertEqual(json.loads(body), {"ok": True})
+        self.assertEqual(self.server.flaky, 3)
+
+    def test_gives_up_after_retries(self):
+        with self.assertRaises(FetchError):
+            self.run_fetcher(lambda f: f.get(f"{self.api}/flaky"), retries=1)
+        self.assertEqual(self.server.flaky, 2)
+
+    def test_client_errors_are_not_retried(self):
+        with self.assertRaises(FetchError):
+            self.run_fetcher(lambda f: f.get(f"{self.api}/missing"))
+        self.assertEqual(len(self.server.log), 1)
+
+    def test_pages_come_back_in_order(self):
+        docs = self.run_fetcher(lambda f: f.query_all(f"{self.api}/launches/query", limit=5, workers=2))
+        self.assertEqual(docs, LAUNCHES)
+        self.assertEqual(sorted(page for _, _, page in self.server.log), [1, 2, 3, 4, 5])
+
+    def test_download_raw_skips_unchanged_endpoints(self):
+        raw_dir = os.path.join(self.tmp, "raw")
+        endpoints = ["launches", "launchpads"]
+        with mock.patch.object(download_raw, "Fetcher", lambda **kw: Fetcher(validators_path=self.validators, **kw)):
+            first = dict(asyncio.run(download_raw.download_all(self.api, raw_dir, endpoints)))
+            second = dict(asyncio.run(download_raw.download_all(self.api, raw_dir, endpoints)))
+        self.assertEqual(first, {"launches": f"{len(LAUNCHES)} registros", "launchpads": "1 registros"})
+        self.assertEqual(second["launchpads"], "sin cambios (304)")
+        # /query no es condicional: se vuelve a pedir, pero no se reescribe
+        self.assertIn("idéntico", second["launches"])
+
+
+if __name__ == "__main__":
+    unittest.main()
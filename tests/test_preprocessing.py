@@ -0,0 +1,105 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from scripts import datastore, preprocessing
+
+
+def write_clean(path, n, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "flight": np.arange(1, n + 1),
+        "payload": rng.uniform(300, 15000, n).round(1),
+        "orbit": rng.choice(["LEO", "GTO", "ISS", ""], n),
+        "site": rng.choice(["CCSFS SLC 40", "KSC LC 39A", "VAFB SLC 4E"], n),
+        "gridfins": rng.random(n) < 0.7,
+        "reused": rng.random(n) < 0.4,
+        "legs": rng.random(n) < 0.8,
+        "success": rng.integers(0, 2, n),
+    }).to_csv(path, index=False)
+
+
+class SplitCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.csv = os.path.join(tmp.name, "clean_dataset.csv")
+        write_clean(self.csv, 200)
+        for patcher in (
+            mock.patch.object(datastore, "CACHE_DIR", os.path.join(tmp.name, "columnar")),
+            mock.patch.object(preprocessing, "SPLIT_CACHE_DIR", os.path.join(tmp.name, "splits")),
+            mock.patch.dict(datastore.DATASETS["clean"], {"csv": self.csv}),
+            mock.patch.dict(preprocessing._hashes, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_hash_is_read_once_per_file_version(self):
+        with mock.patch.object(preprocessing.hashlib, "sha256", wraps=hashlib.sha256) as sha256:
+            first = preprocessing.dataset_hash()
+            self.assertEqual(preprocessing.dataset_hash(), first)
+            self.assertEqual(sha256.call_count, 1)
+
+            write_clean(self.csv, 150, seed=1)
+            self.assertNotEqual(preprocessing.dataset_hash(), first)
+            self.assertEqual(sha256.call_count, 2)
+
+    def test_new_process_reads_the_hash_from_the_index(self):
+        split = preprocessing.split_dir()
+        preprocessing._hashes.clear()           # como un proceso nuevo
+        with mock.patch.object(preprocessing.hashlib, "sha256", wraps=hashlib.sha256) as sha256:
+            self.assertEqual(preprocessing.split_dir(), split)
+            self.assertEqual(sha256.call_count, 0)
+
+            # El índice se invalida con el mtime/tamaño, no se fía de la ruta
+            write_clean(self.csv, 150, seed=1)
+            preprocessing._hashes.clear()
+            self.assertNotEqual(preprocessing.split_dir(), split)
+            self.assertEqual(sha256.call_count, 1)
+
+    def splits(self):
+        return sorted(name for name in os.listdir(preprocessing.SPLIT_CACHE_DIR)
+                      if name != preprocessing.HASH_INDEX)
+
+    def test_old_dataset_splits_are_pruned(self):
+        first = os.path.basename(preprocessing.materialize_split())
+        other = os.path.basename(preprocessing.materialize_split(test_size=0.3))
+        self.assertEqual(self.splits(), sorted([first, other]))
+
+        write_clean(self.csv, 150, seed=1)
+        current = os.path.basename(preprocessing.materialize_split())
+        self.assertEqual(self.splits(), [current])
+        X_train, X_test, _, _, _ = preprocessing.load_and_preprocess()
+        self.assertEqual(len(X_train) + len(X_test), 150)
+
+    def test_split_is_the_memmap(self):
+        split = preprocessing.open_split()
+        with mock.patch.object(preprocessing, "open_split", return_value=split):
+            X_train, X_test, y_train, y_test, _ = preprocessing.load_and_preprocess()
+        for X in (X_train, X_test):
+            for col in preprocessing.NUMERIC_FEATURES + preprocessing.BOOLEAN_FEATURES:
+                self.assertTrue(np.shares_memory(X[col].to_numpy(), split[col]))
+            for col in preprocessing.CATEGORICAL_FEATURES:
+                self.assertTrue(np.shares_memory(X[col].cat.codes.to_numpy(), split[col]))
+        self.assertTrue(np.shares_memory(y_test.to_numpy(), split["y"]))
+
+    def test_same_rows_as_splitting_the_features(self):
+        X_train, X_test, y_train, y_test, _ = preprocessing.load_and_preprocess()
+        X, y = preprocessing.clean_features()
+        train_idx, test_idx = preprocessing.train_test_split(
+            np.arange(len(X)), test_size=0.2, random_state=42, stratify=y
+        )
+        for got, idx in ((X_train, train_idx), (X_test, test_idx)):
+            pd.testing.assert_frame_equal(got.astype({c: object for c in preprocessing.CATEGORICAL_FEATURES}),
+                                          X.iloc[idx].reset_index(drop=True), check_dtype=False)
+        np.testing.assert_array_equal(y_train, y.iloc[train_idx])
+        np.testing.assert_array_equal(y_test, y.iloc[test_idx])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from scripts import raw_store
+from scripts.raw_store import RawDatasetWriter, current_version, read_raw
+
+
+def launches(n, tag):
+    return [{"id": f"{tag}{i}", "flight_number": i,
+             "cores": [{"core": f"c{i}", "landing_success": True}],
+             "payloads": [f"p{i}", f"q{i}"]} for i in range(n)]
+
+
+class RawStoreTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.raw_dir = tmp.name
+
+    def publish(self, docs, page_size=2):
+        writer = RawDatasetWriter("launches", self.raw_dir)
+        for start in range(0, len(docs), page_size):
+            writer.write(docs[start:start + page_size])
+        return writer.commit()
+
+    def read(self, name, version=None):
+        return read_raw(name, self.raw_dir, version=version)
+
+    def versions(self):
+        root = os.path.join(self.raw_dir, "launches")
+        return sorted(v for v in os.listdir(root) if v.startswith("v"))
+
+    def test_tables_are_published_together(self):
+        self.assertTrue(self.publish(launches(5, "a")))
+        self.assertEqual(self.read("launches")["id"].tolist(), [f"a{i}" for i in range(5)])
+        self.assertEqual(len(self.read("launches_cores")), 5)
+        self.assertEqual(len(self.read("launches_payloads")), 10)
+        self.assertEqual(raw_store.read_manifest("launches", self.raw_dir)["rows"], 5)
+
+    def test_identical_content_keeps_the_version(self):
+        self.publish(launches(5, "a"))
+        version = current_version("launches", self.raw_dir)
+        self.assertFalse(self.publish(launches(5, "a")))
+        self.assertEqual(current_version("launches", self.raw_dir), version)
+        self.assertEqual(len(self.versions()), 1)
+
+    def test_reader_keeps_its_version(self):
+        self.publish(launches(5, "a"))
+        version = current_version("launches", self.raw_dir)
+        self.publish(launches(3, "b"))
+        # Tablas principal e hijas de la versión que se resolvió, no una mezcla
+        self.assertEqual(self.read("launches", version)["id"].tolist(), [f"a{i}" for i in range(5)])
+        self.assertEqual(set(self.read("launches_cores", version)["launch_id"]), {f"a{i}" for i in range(5)})
+        self.assertEqual(set(self.read("launches_cores")["launch_id"]), {f"b{i}" for i in range(3)})
+
+    def test_failed_publish_leaves_previous_version(self):
+        self.publish(launches(5, "a"))
+        with mock.patch.object(raw_store.os, "replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.publish(launches(3, "b"))
+        self.assertEqual(len(self.read("launches")), 5)
+        self.assertEqual(set(self.read("launches_payloads")["launch_id"]), {f"a{i}" for i in range(5)})
+
+    def test_old_versions_are_pruned(self):
+        for tag in "abcd":
+            self.publish(launches(2, tag))
+        self.assertEqual(len(self.versions()), 1 + raw_store.KEEP_VERSIONS)
+        self.assertIn(os.path.basename(current_version("launches", self.raw_dir)), self.versions())
+
+    def test_missing_resource_falls_back_to_csv(self):
+        self.assertIsNone(current_version("rockets", self.raw_dir))
+        with open(os.path.join(self.raw_dir, "rockets_raw.csv"), "w") as f:
+            f.write("id,name\nr1,Falcon 9\n")
+        self.assertEqual(self.read("rockets")["name"].tolist(), ["Falcon 9"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from pipeline import run_pipeline
+from pipeline.run_pipeline import STAGES, PipelineRunner
+
+
+class PipelineRunnerTest(unittest.TestCase):
+    """Skip logic over a small train -> {evaluate, predict} graph of files."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.state_path = self.path("state.json")
+        for name in ("data.csv", "evaluate.py", "predict.py"):
+            self.write(name, name)
+        self.calls = []
+
+        def stage(name, source, output):
+            def run(ctx):
+                self.calls.append(name)
+                with open(source) as f:
+                    self.write(output, f"{name}:{f.read()}")
+            return run
+
+        self.stages = {
+            "train": {"after": [], "inputs": [self.path("data.csv")], "outputs": [self.path("model")],
+                      "run": stage("train", self.path("data.csv"), "model")},
+            "evaluate": {"after": ["train"], "inputs": [self.path("model"), self.path("evaluate.py")],
+                         "outputs": [self.path("report")], "run": stage("evaluate", self.path("model"), "report")},
+            "predict": {"after": ["train"], "inputs": [self.path("model"), self.path("predict.py")],
+                        "outputs": [self.path("predictions")],
+                        "run": stage("predict", self.path("model"), "predictions")},
+        }
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def write(self, name, content):
+        with open(self.path(name), "w") as f:
+            f.write(content)
+
+    def run_pipeline(self, force=False):
+        self.calls = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = PipelineRunner(self.stages, self.state_path, force=force).run()
+        return {name: status for name, (status, _) in results.items()}
+
+    def test_unchanged_inputs_are_skipped(self):
+        self.assertEqual(set(self.run_pipeline().values()), {"ran"})
+        self.assertEqual(set(self.run_pipeline().values()), {"skipped"})
+        self.assertEqual(self.calls, [])
+
+    def test_touched_input_reruns_only_its_dependents(self):
+        self.run_pipeline()
+        self.write("predict.py", "changed")
+        self.assertEqual(self.run_pipeline(), {"train": "skipped", "evaluate": "skipped", "predict": "ran"})
+
+        self.write("data.csv", "new rows")
+        self.assertEqual(set(self.run_pipeline().values()), {"ran"})
+
+    def test_same_content_with_new_mtime_is_skipped(self):
+        self.run_pipeline()
+        st = os.stat(self.path("data.csv"))
+        os.utime(self.path("data.csv"), ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertEqual(set(self.run_pipeline().values()), {"skipped"})
+
+    def test_missing_output_reruns_the_stage(self):
+        self.run_pipeline()
+        os.remove(self.path("report"))
+        self.assertEqual(self.run_pipeline(), {"train": "skipped", "evaluate": "ran", "predict": "skipped"})
+
+    def test_force_runs_everything(self):
+        self.run_pipeline()
+        self.assertEqual(set(self.run_pipeline(force=True).values()), {"ran"})
+        self.assertEqual(sorted(self.calls), ["evaluate", "predict", "train"])
+
+    def test_stage_paths_do_not_depend_on_the_cwd(self):
+        for name, stage in STAGES.items():
+            for path in stage["inputs"] + stage["outputs"]:
+                self.assertTrue(os.path.isabs(path), f"{name}: {path}")
+                self.assertTrue(path.startswith(run_pipeline.BASE_DIR), f"{name}: {path}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import ParameterGrid
+from sklearn.preprocessing import StandardScaler
+
+from pipeline import train_model
+
+GRID = {
+    "n_estimators": [5, 10, 15],
+    "max_depth": [None, 3],
+    "min_samples_split": [2, 4],
+    "class_weight": [None, "balanced"],
+}
+
+
+class SearchBudgetTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = pd.DataFrame(rng.normal(size=(60, 3)), columns=["a", "b", "c"])
+        self.y = (self.X["a"] + rng.normal(scale=0.5, size=60) > 0).astype(int)
+
+    def count_fits(self, **kwargs):
+        fit = RandomForestClassifier.fit
+        calls = []
+
+        def counted(clf, *args, **kw):
+            calls.append(clf.n_estimators)
+            return fit(clf, *args, **kw)
+
+        with mock.patch.object(RandomForestClassifier, "fit", counted), \
+                mock.patch("builtins.print"):
+            ranking = train_model.search(self.X, self.y, StandardScaler(), param_grid=GRID,
+                                         cv=2, n_jobs=1, **kwargs)
+        return ranking, calls
+
+    def test_n_iter_counts_warm_start_steps(self):
+        ranking, calls = self.count_fits(n_iter=5)
+        self.assertEqual(len(ranking), 5)
+        self.assertEqual(len(calls), 5 * 2)
+
+    def test_groups_cover_the_sampled_candidates(self):
+        groups = train_model.candidate_groups(GRID, n_iter=7)
+        self.assertEqual(sum(len(steps) for _, steps in groups), 7)
+        for params, steps in groups:
+            self.assertNotIn("n_estimators", params)
+            self.assertEqual(steps, sorted(set(steps)))
+        # El presupuesto nunca supera el grid completo
+        full = train_model.candidate_groups(GRID, n_iter=1000)
+        self.assertEqual(sum(len(steps) for _, steps in full), len(ParameterGrid(GRID)))
+
+    def test_full_grid_without_n_iter(self):
+        ranking, calls = self.count_fits()
+        self.assertEqual(len(ranking), len(ParameterGrid(GRID)))
+        self.assertEqual(len(calls), len(ParameterGrid(GRID)) * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()